@@ -8,19 +8,30 @@ import cv2
 from io import StringIO
 import base64
 import datetime
+from sqlalchemy.exc import SQLAlchemyError
 
 # Import utility modules
 from utils.data_processor import process_performance_data, extract_key_metrics
-from utils.visualization import create_performance_radar, plot_trend_analysis, plot_comparison
+from utils.performance_frame import PerformanceFrame
+from utils.analysis_cache import analysis_cache, data_fingerprint
+from utils.percentile_index import CohortPercentileIndex, COHORTS
+from utils.ingest import stream_performance_csv, pq as ingest_pq
+from utils.visualization import create_performance_radar, plot_trend_analysis, plot_comparison, figure_to_png
 from utils.rag_system import query_knowledge_base, initialize_kb
 from utils.image_analyzer import analyze_form, detect_pose
+from utils.video_source import VideoFrameSource, DEFAULT_ANALYSIS_FPS
+from utils.video_pipeline import VideoAnalysisPipeline
+from utils.pose_sequence import PoseSequence, analyze_pose_sequence, summarize_pose_analysis
+from utils.pose_backends import get_pose_backend, POSE_BATCH_SIZE
 from utils.recommendation_engine import generate_recommendations
 from utils.recommendation_engine import generate_recommendations_manual
 from utils.database import (
-    get_all_athletes, get_or_create_athlete, 
+    get_or_create_athlete, 
     save_performance_data, save_form_analysis,
     get_athlete_performance_data, get_athlete_form_analyses,
-    store_dataframe, load_dataframe, delete_athlete
+    store_dataframe, store_team_dataframe, load_dataframe, delete_athlete,
+    invalidate_athlete_cache, search_athletes, iter_athletes, count_athletes, ATHLETE_PAGE_SIZE,
+    get_cohort_percentiles, invalidate_percentile_index, get_metric_summaries
 )
 
 # Custom function to add background image and general styling
@@ -292,6 +303,9 @@ if 'performance_data' not in st.session_state:
     st.session_state.performance_data = None
 if 'analysis_results' not in st.session_state:
     st.session_state.analysis_results = None
+if 'ingest_result' not in st.session_state:
+    st.session_state.ingest_result = None
+    st.session_state.ingest_key = None
 if 'form_analysis' not in st.session_state:
     st.session_state.form_analysis = None
 if 'current_athlete' not in st.session_state:
@@ -300,8 +314,6 @@ if 'saved_athletes_data' not in st.session_state:
     st.session_state.saved_athletes_data = {}
 if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []
-if 'db_athletes' not in st.session_state:
-    st.session_state.db_athletes = []
 if 'use_database' not in st.session_state:
     st.session_state.use_database = True
 
@@ -311,12 +323,11 @@ if not st.session_state.kb_initialized:
         initialize_kb()
         st.session_state.kb_initialized = True
 
-# Load athletes from database
+# Count database athletes once per run; the count is cached until athletes change
+athlete_count = 0
 if st.session_state.use_database:
     try:
-        # Get list of all athletes from the database
-        db_athletes = get_all_athletes()
-        st.session_state.db_athletes = db_athletes
+        athlete_count = count_athletes()
     except Exception as e:
         st.error(f"Error accessing database: {e}")
 
@@ -372,9 +383,21 @@ with st.sidebar:
     if st.session_state.performance_data is not None and 'Athlete' in st.session_state.performance_data.columns:
         all_athletes.extend(st.session_state.performance_data['Athlete'].unique().tolist())
     
-    # From database
-    if st.session_state.use_database and st.session_state.db_athletes:
-        all_athletes.extend([athlete['name'] for athlete in st.session_state.db_athletes])
+    # From database, one page at a time
+    db_page_names = []
+    if st.session_state.use_database:
+        athlete_search = st.text_input("Search athletes", key="sidebar_athlete_search",
+                                       placeholder="Name starts with...")
+        try:
+            db_page, _ = search_athletes(prefix=athlete_search or None, limit=ATHLETE_PAGE_SIZE)
+            db_page_names = [athlete['name'] for athlete in db_page]
+            all_athletes.extend(db_page_names)
+        except Exception as e:
+            st.error(f"Error searching athletes: {e}")
+    
+    # Keep the active athlete selectable even when it is not on the current page
+    if st.session_state.current_athlete:
+        all_athletes.append(st.session_state.current_athlete)
     
     # From saved data
     if st.session_state.saved_athletes_data:
@@ -428,7 +451,6 @@ with st.sidebar:
     # Show database status
     if st.session_state.use_database:
         st.success("✅ Database connected")
-        athlete_count = len(st.session_state.db_athletes) if st.session_state.db_athletes else 0
         st.info(f"📊 {athlete_count} athletes in database")
     else:
         st.warning("⚠️ Using session storage only")
@@ -513,8 +535,59 @@ elif page == "Data Analysis":
             st.session_state.performance_data = synthetic_df
             st.success("Loaded synthetic performance data!")
         # ------------------------------------------------
+        stream_upload = st.checkbox(
+            "Stream large file (keep only per-athlete summaries in memory)", key="stream_upload"
+        )
 
-        if uploaded_file is not None:
+        if uploaded_file is not None and stream_upload:
+            try:
+                # Ingest each upload once, not on every rerun of the page;
+                # every new upload gets its own file_id, even with the same name
+                upload_key = uploaded_file.file_id
+                if st.session_state.ingest_key != upload_key:
+                    # The new upload replaces the previous one and its Parquet spill
+                    if st.session_state.ingest_result is not None:
+                        st.session_state.ingest_result.discard()
+                    st.session_state.ingest_result = None
+                    st.session_state.ingest_key = None
+                    
+                    # Spill raw rows to the database when enabled, otherwise to a Parquet file if possible
+                    if st.session_state.use_database:
+                        spill, spill_path = 'database', None
+                    elif ingest_pq is not None:
+                        spill = 'parquet'
+                        spill_fd, spill_path = tempfile.mkstemp(suffix=".parquet")
+                        os.close(spill_fd)
+                    else:
+                        spill, spill_path = None, None
+                    
+                    try:
+                        with st.spinner("Streaming upload..."):
+                            # Only the summaries and the spill handle stay in the session
+                            st.session_state.ingest_result = stream_performance_csv(uploaded_file, spill=spill, path=spill_path)
+                    except Exception:
+                        if spill_path and os.path.exists(spill_path):
+                            os.remove(spill_path)
+                        raise
+                    st.session_state.ingest_key = upload_key
+                    st.session_state.performance_data = None
+                
+                ingest_result = st.session_state.ingest_result
+                st.success(f"Ingested {ingest_result.rows:,} rows for {len(ingest_result.athletes)} athletes")
+                if ingest_result.spill is None:
+                    st.info("Raw rows were not kept; enable the database or install pyarrow to keep them.")
+                
+                st.subheader("Per-Athlete Summaries")
+                selected_athlete = st.selectbox("Select athlete", ingest_result.athletes, key="stream_athlete_select")
+                if selected_athlete:
+                    st.session_state.current_athlete = selected_athlete
+                    st.dataframe(pd.DataFrame(ingest_result.athlete_summary(selected_athlete)).T)
+            except (ValueError, ImportError) as e:
+                st.error(f"Error streaming the data: {e}")
+            except (SQLAlchemyError, OSError) as e:
+                # Chunks stored before the failure stay in the database
+                st.error(f"Error saving the streamed data: {e}")
+        elif uploaded_file is not None:
             try:
                 # Load and process the data
                 data = pd.read_csv(uploaded_file)
@@ -532,49 +605,92 @@ elif page == "Data Analysis":
                     
                     # Save to database option
                     if st.session_state.use_database:
-                        if st.button("Save Data to Database"):
-                            with st.spinner("Saving data to database..."):
-                                try:
-                                    # Save the athlete's data to the database
-                                    success = store_dataframe(selected_athlete, data[data['Athlete'] == selected_athlete])
-                                    if success:
-                                        st.success(f"Data for {selected_athlete} saved to database!")
-                                        # Refresh the database athletes list
-                                        st.session_state.db_athletes = get_all_athletes()
-                                    else:
-                                        st.error("Failed to save data to database.")
-                                except Exception as e:
-                                    st.error(f"Database error: {e}")
+                        save_col1, save_col2 = st.columns(2)
+                        with save_col1:
+                            if st.button("Save Data to Database"):
+                                with st.spinner("Saving data to database..."):
+                                    try:
+                                        # Save the athlete's data to the database
+                                        success = store_dataframe(selected_athlete, data[data['Athlete'] == selected_athlete])
+                                        if success:
+                                            st.success(f"Data for {selected_athlete} saved to database!")
+                                        else:
+                                            st.error("Failed to save data to database.")
+                                    except Exception as e:
+                                        st.error(f"Database error: {e}")
+                        with save_col2:
+                            if st.button("Save All Athletes to Database"):
+                                with st.spinner("Saving team data to database..."):
+                                    try:
+                                        # Save every athlete in the upload in one transaction
+                                        saved_counts = store_team_dataframe(data)
+                                        st.success(f"Saved {sum(saved_counts.values())} records for {len(saved_counts)} athletes!")
+                                        st.dataframe(pd.DataFrame(
+                                            list(saved_counts.items()), columns=["Athlete", "Records Saved"]
+                                        ))
+                                    except Exception as e:
+                                        st.error(f"Database error: {e}")
+                    
+                    # Parse and index the upload once for all analyses and charts;
+                    # results are cached by content so reruns reuse them
+                    data_key = data_fingerprint(data)
+                    frame = analysis_cache.get_or_compute((data_key, 'frame'), lambda: PerformanceFrame(data))
                     
                     # Process the data
-                    analysis_results = process_performance_data(data, selected_athlete)
+                    analysis_results = analysis_cache.get_or_compute(
+                        (data_key, selected_athlete, 'analysis'),
+                        lambda: process_performance_data(frame, selected_athlete)
+                    )
                     st.session_state.analysis_results = analysis_results
                     
                     # Display metrics
                     st.subheader("Key Performance Metrics")
-                    key_metrics = extract_key_metrics(data, selected_athlete)
+                    key_metrics = analysis_cache.get_or_compute(
+                        (data_key, selected_athlete, 'key_metrics'),
+                        lambda: extract_key_metrics(frame, selected_athlete)
+                    )
                     metrics_cols = st.columns(len(key_metrics))
                     for i, (metric, value) in enumerate(key_metrics.items()):
                         metrics_cols[i].metric(label=metric, value=f"{value:.2f}")
                     
                     # Visualizations
                     st.subheader("Performance Visualization")
-                    tab1, tab2, tab3 = st.tabs(["Radar Chart", "Trend Analysis", "Comparison"])
+                    tab1, tab2, tab3, tab4 = st.tabs(["Radar Chart", "Trend Analysis", "Comparison", "Cohort Ranking"])
                     
                     with tab1:
-                        st.pyplot(create_performance_radar(data, selected_athlete))
+                        st.image(analysis_cache.get_or_compute(
+                            (data_key, selected_athlete, 'radar'),
+                            lambda: figure_to_png(create_performance_radar(frame, selected_athlete))
+                        ))
                         
                     with tab2:
-                        metrics = [col for col in data.columns if col not in ['Athlete', 'Date', 'Session']]
-                        selected_metric = st.selectbox("Select metric for trend analysis", metrics)
-                        st.pyplot(plot_trend_analysis(data, selected_athlete, selected_metric))
+                        selected_metric = st.selectbox("Select metric for trend analysis", frame.metrics)
+                        st.image(analysis_cache.get_or_compute(
+                            (data_key, selected_athlete, 'trend', selected_metric),
+                            lambda: figure_to_png(plot_trend_analysis(frame, selected_athlete, selected_metric))
+                        ))
                         
                     with tab3:
                         if len(athletes) > 1:
                             compare_with = st.selectbox("Compare with", [a for a in athletes if a != selected_athlete])
-                            st.pyplot(plot_comparison(data, selected_athlete, compare_with))
+                            st.image(analysis_cache.get_or_compute(
+                                (data_key, selected_athlete, 'comparison', compare_with),
+                                lambda: figure_to_png(plot_comparison(frame, selected_athlete, compare_with))
+                            ))
                         else:
                             st.info("Need at least two athletes in the dataset for comparison.")
+                    
+                    with tab4:
+                        # Rank against every athlete in the upload, or their sport/team
+                        cohort = st.selectbox("Rank within", COHORTS, key="upload_cohort_select")
+                        percentile_index = analysis_cache.get_or_compute(
+                            (data_key, 'percentile_index'), lambda: CohortPercentileIndex.from_dataframe(frame)
+                        )
+                        percentiles = percentile_index.athlete_percentiles(selected_athlete, cohort)
+                        if percentiles:
+                            st.dataframe(pd.DataFrame(percentiles).T)
+                        else:
+                            st.info(f"No {cohort} cohort found for {selected_athlete}.")
                 else:
                     st.error("No athlete column found in the data. Please ensure your CSV has an 'Athlete' column.")
             except Exception as e:
@@ -597,10 +713,15 @@ elif page == "Data Analysis":
     
     with data_source_tabs[1]:  # Load from Database tab
         if st.session_state.use_database:
-            if st.session_state.db_athletes:
-                # Create a dropdown to select an athlete from the database
-                db_athlete_names = [athlete['name'] for athlete in st.session_state.db_athletes]
+            if athlete_count:
+                # Search the directory and offer one page of matching athletes
+                db_athlete_search = st.text_input("Search athletes", key="db_athlete_search",
+                                                  placeholder="Name starts with...")
+                db_athlete_page, _ = search_athletes(prefix=db_athlete_search or None, limit=ATHLETE_PAGE_SIZE)
+                db_athlete_names = [athlete['name'] for athlete in db_athlete_page]
                 selected_db_athlete = st.selectbox("Select athlete from database", db_athlete_names, key="db_athlete_select")
+                if not db_athlete_names:
+                    st.info("No athletes match this search.")
                 
                 if selected_db_athlete:
                     with st.spinner("Loading data from database..."):
@@ -616,20 +737,49 @@ elif page == "Data Analysis":
                                 st.subheader("Athlete Data")
                                 st.dataframe(db_data)
                                 
+                                # Per-metric statistics are maintained as rows are stored,
+                                # so they are read without rescanning the history
+                                st.subheader("Metric Summaries")
+                                st.dataframe(pd.DataFrame(get_metric_summaries(selected_db_athlete)).T)
+                                
+                                # Database rows have no Athlete column; the frame adds it
+                                db_key = data_fingerprint(db_data)
+                                db_frame = analysis_cache.get_or_compute(
+                                    (db_key, selected_db_athlete, 'frame'),
+                                    lambda: PerformanceFrame(db_data, athlete=selected_db_athlete)
+                                )
+                                
                                 # Process the data
-                                analysis_results = process_performance_data(db_data, selected_db_athlete)
+                                analysis_results = analysis_cache.get_or_compute(
+                                    (db_key, selected_db_athlete, 'analysis'),
+                                    lambda: process_performance_data(db_frame, selected_db_athlete)
+                                )
                                 st.session_state.analysis_results = analysis_results
                                 
                                 # Display visualizations if there's enough data
                                 if len(db_data.columns) > 2:  # More than just date and one metric
                                     st.subheader("Performance Visualization")
-                                    st.pyplot(create_performance_radar(db_data, selected_db_athlete))
+                                    st.image(analysis_cache.get_or_compute(
+                                        (db_key, selected_db_athlete, 'radar'),
+                                        lambda: figure_to_png(create_performance_radar(db_frame, selected_db_athlete))
+                                    ))
                                     
                                     # Display available metrics for trend analysis
-                                    metrics = [col for col in db_data.columns if col != 'date']
-                                    if metrics:
-                                        selected_metric = st.selectbox("Select metric for trend analysis", metrics, key="db_metric_select")
-                                        st.pyplot(plot_trend_analysis(db_data, selected_db_athlete, selected_metric))
+                                    if db_frame.metrics:
+                                        selected_metric = st.selectbox("Select metric for trend analysis", db_frame.metrics, key="db_metric_select")
+                                        st.image(analysis_cache.get_or_compute(
+                                            (db_key, selected_db_athlete, 'trend', selected_metric),
+                                            lambda: figure_to_png(plot_trend_analysis(db_frame, selected_db_athlete, selected_metric))
+                                        ))
+                                
+                                # Rank against every athlete in the database
+                                st.subheader("Cohort Ranking")
+                                db_cohort = st.selectbox("Rank within", COHORTS, key="db_cohort_select")
+                                db_percentiles = get_cohort_percentiles(selected_db_athlete, db_cohort)
+                                if db_percentiles:
+                                    st.dataframe(pd.DataFrame(db_percentiles).T)
+                                else:
+                                    st.info(f"No {db_cohort} cohort found for {selected_db_athlete}.")
                             else:
                                 st.warning(f"No performance data found for {selected_db_athlete} in the database.")
                         except Exception as e:
@@ -699,41 +849,51 @@ elif page == "Form Analysis":
             # Display the video
             st.video(uploaded_video)
             
+            analysis_fps = st.slider("Frames analyzed per second", 1, 30, int(DEFAULT_ANALYSIS_FPS))
+            
             # Process the video
             if st.button("Analyze Video"):
                 with st.spinner("Analyzing video... This may take a minute"):
                     try:
-                        # Open video with OpenCV
-                        cap = cv2.VideoCapture(video_path)
-                        
-                        # Get some basic video information
-                        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                        fps = cap.get(cv2.CAP_PROP_FPS)
-                        
-                        st.info(f"Video contains {frame_count} frames at {fps} fps")
-                        
-                        # For demonstration, analyze only a few frames
-                        max_frames = min(10, frame_count)
-                        sample_frames = [int(i * frame_count / max_frames) for i in range(max_frames)]
+                        # Decode the clip once, front to back, at the analysis rate
+                        with VideoFrameSource(video_path, target_fps=analysis_fps) as source:
+                            st.info(f"Video contains {source.frame_count} frames at {source.fps} fps")
+                            progress = st.progress(0.0)
+                            expected_frames = source.expected_frames
+                            
+                            # Decode, pose detection and analysis run concurrently;
+                            # results arrive here in frame order
+                            analyzed_frames = []
+                            
+                            def report_progress(result):
+                                analyzed_frames.append(result.index)
+                                if expected_frames:
+                                    progress.progress(min(len(analyzed_frames) / expected_frames, 1.0))
+                            
+                            # Frames are analyzed together below, so workers only detect
+                            # poses, in batches of frames per model forward pass, keeping
+                            # the model's joint confidence for the pose sequence
+                            pose_backend = get_pose_backend()
+                            pipeline_result = VideoAnalysisPipeline(
+                                analyze_fn=None, pose_estimate_fn=pose_backend.estimate_batch, batch_size=POSE_BATCH_SIZE
+                            ).run(source, on_result=report_progress)
                         
-                        # Process sampled frames
-                        poses = []
-                        for frame_idx in sample_frames:
-                            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-                            ret, frame = cap.read()
-                            if ret:
-                                # Detect pose in the frame
-                                pose_result = detect_pose(frame)
-                                poses.append(pose_result)
+                        stage_stats = pipeline_result.stats
+                        st.caption(
+                            f"Analyzed {len(pipeline_result)} frames at {stage_stats['total']['fps']:.1f} fps "
+                            f"(decode {stage_stats['decode']['fps']:.0f}, pose {stage_stats['pose']['fps']:.0f} fps per stage, "
+                            f"{pose_backend.name} pose backend)"
+                        )
                         
-                        cap.release()
+                        # Analyze the sequence of poses in one vectorized pass
+                        poses = PoseSequence.from_frame_results(pipeline_result.frames)
+                        if len(poses) == 0:
+                            raise ValueError("No frames could be decoded from the video")
+                        frame_metrics = analyze_pose_sequence(poses)
+                        form_results = summarize_pose_analysis(frame_metrics)
                         
-                        # Analyze the sequence of poses
-                        form_results = {
-                            "Posture": ["Good overall posture detected", "Slight forward lean noted"],
-                            "Joint Angles": ["Proper knee angle during execution", "Elbow position could be improved"],
-                            "Movement Pattern": ["Consistent movement throughout exercise", "Speed of execution is appropriate"]
-                        }
+                        st.subheader("Angles Over Time")
+                        st.line_chart(frame_metrics.set_index('timestamp')[['spine_angle', 'right_knee_angle', 'left_knee_angle']])
                         
                         # Display results
                         st.subheader("Video Analysis Results")
@@ -793,7 +953,7 @@ elif page == "Database":
         st.subheader("Database Status")
         if st.session_state.use_database:
             st.success("✅ Database connected and operational")
-            st.info(f"📊 {len(st.session_state.db_athletes)} athletes currently in database")
+            st.info(f"📊 {athlete_count} athletes currently in database")
         else:
             st.warning("⚠️ Database usage is disabled")
         
@@ -802,19 +962,29 @@ elif page == "Database":
         if db_toggle != st.session_state.use_database:
             st.session_state.use_database = db_toggle
             st.success("Settings updated! Database usage is now " + ("enabled" if db_toggle else "disabled"))
-            if db_toggle:
-                # Refresh athlete list when enabling
-                st.session_state.db_athletes = get_all_athletes()
     
     with col2:
         st.subheader("Quick Actions")
         if st.button("Refresh Data"):
             with st.spinner("Refreshing database data..."):
                 try:
-                    st.session_state.db_athletes = get_all_athletes()
+                    # Drop the cached directory in case another process changed it
+                    invalidate_athlete_cache()
+                    invalidate_percentile_index()
                     st.success("Database data refreshed!")
                 except Exception as e:
                     st.error(f"Error refreshing data: {e}")
+        
+        # Memoized analyses and charts shared by page reruns
+        cache_stats = analysis_cache.stats()
+        st.caption(
+            f"Analysis cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+            f"({cache_stats['hit_rate']:.0%}), {cache_stats['entries']} entries, "
+            f"{cache_stats['bytes'] / 1e6:.1f} MB"
+        )
+        if st.button("Clear Analysis Cache"):
+            analysis_cache.clear()
+            st.success("Analysis cache cleared!")
     
     # Athlete management section
     st.markdown("---")
@@ -823,13 +993,37 @@ elif page == "Database":
     tab1, tab2 = st.tabs(["View Athletes", "Add New Athlete"])
     
     with tab1:
-        if not st.session_state.db_athletes:
+        if athlete_count == 0:
             st.info("No athletes found in the database. Add your first athlete in the 'Add New Athlete' tab.")
         else:
+            # Filter and page through the directory instead of loading every athlete
+            search_col, sport_col, team_col = st.columns(3)
+            with search_col:
+                name_prefix = st.text_input("Name starts with", key="db_name_prefix")
+            with sport_col:
+                sport_filter = st.text_input("Sport", key="db_sport_filter")
+            with team_col:
+                team_filter = st.text_input("Team", key="db_team_filter")
+            
+            directory_filters = (name_prefix or None, sport_filter or None, team_filter or None)
+            
+            # Start from the first page whenever the filters change
+            if st.session_state.get('db_directory_filters') != directory_filters:
+                st.session_state.db_directory_filters = directory_filters
+                st.session_state.db_page_cursors = [None]
+            page_cursors = st.session_state.db_page_cursors
+            
+            page_athletes, next_cursor = search_athletes(
+                *directory_filters, after=page_cursors[-1], limit=ATHLETE_PAGE_SIZE
+            )
+            
             # Display list of athletes
-            st.markdown("### Athletes in Database")
+            st.markdown(f"### Athletes in Database ({count_athletes(*directory_filters)} matching)")
+            
+            if not page_athletes:
+                st.info("No athletes match these filters.")
             
-            for athlete in st.session_state.db_athletes:
+            for athlete in page_athletes:
                 with st.container():
                     st.markdown(f"""
                     <div class="db-athlete-card">
@@ -875,11 +1069,22 @@ elif page == "Database":
                         if st.button(f"Delete {athlete['name']}", key=f"del_{athlete['id']}"):
                             if delete_athlete(athlete['name']):
                                 st.success(f"{athlete['name']} deleted from database!")
-                                # Refresh the athlete list
-                                st.session_state.db_athletes = get_all_athletes()
                                 st.rerun()
                             else:
                                 st.error(f"Failed to delete {athlete['name']}.")
+            
+            # Page navigation
+            prev_col, page_col, next_col = st.columns([1, 2, 1])
+            with prev_col:
+                if st.button("Previous page", disabled=len(page_cursors) == 1):
+                    page_cursors.pop()
+                    st.rerun()
+            with page_col:
+                st.write(f"Page {len(page_cursors)}")
+            with next_col:
+                if st.button("Next page", disabled=next_cursor is None):
+                    page_cursors.append(next_cursor)
+                    st.rerun()
     
     with tab2:
         st.markdown("### Add New Athlete")
@@ -900,8 +1105,6 @@ elif page == "Database":
                         athlete = get_or_create_athlete(athlete_name, sport, team, age if age > 0 else None)
                         st.success(f"Athlete {athlete_name} added to database!")
                         
-                        # Refresh the athletes list
-                        st.session_state.db_athletes = get_all_athletes()
                     except Exception as e:
                         st.error(f"Error adding athlete: {e}")
     
@@ -918,9 +1121,10 @@ elif page == "Database":
             export_data = "# Sports Performance Database Export\n\n"
             export_data += f"Date: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
             
-            if st.session_state.db_athletes:
+            if athlete_count:
                 export_data += "## Athletes\n\n"
-                for athlete in st.session_state.db_athletes:
+                # Walk the directory page by page rather than loading it whole
+                for athlete in iter_athletes():
                     export_data += f"- {athlete['name']} ({athlete['sport'] or 'No sport'})\n"
                     
                     # Get performance data
@@ -928,8 +1132,8 @@ elif page == "Database":
                     if not perf_data.empty:
                         export_data += f"  - {len(perf_data)} performance records\n"
                     
-                    # Get form analyses
-                    form_analyses = get_athlete_form_analyses(athlete['name'])
+                    # Get form analyses (only counted, so skip decoding the analysis data)
+                    form_analyses = get_athlete_form_analyses(athlete['name'], include_data=False)
                     if form_analyses:
                         export_data += f"  - {len(form_analyses)} form analyses\n"
                     
@@ -953,9 +1157,6 @@ elif page == "Database":
                 from utils.database import init_db
                 init_db()
                 st.success("Database initialized successfully!")
-                
-                # Refresh athlete list
-                st.session_state.db_athletes = get_all_athletes()
             except Exception as e:
                 st.error(f"Error initializing database: {e}")
     
@@ -1188,8 +1389,6 @@ elif page == "Recommendations":
                             analysis_data=st.session_state.form_analysis
                         )
                     
-                    # Refresh the database athletes list
-                    st.session_state.db_athletes = get_all_athletes()
                     
                 except Exception as e:
                     st.error(f"Error saving to database: {e}")
@@ -1225,9 +1424,9 @@ elif page == "Recommendations":
     if st.session_state.saved_athletes_data:
         available_athletes.extend(list(st.session_state.saved_athletes_data.keys()))
     
-    # Add database athletes if using database
-    if st.session_state.use_database and st.session_state.db_athletes:
-        available_athletes.extend([athlete['name'] for athlete in st.session_state.db_athletes])
+    # Add the database athletes matching the sidebar search
+    if st.session_state.use_database:
+        available_athletes.extend(db_page_names)
     
     # Remove duplicates and sort
     available_athletes = sorted(list(set(available_athletes)))
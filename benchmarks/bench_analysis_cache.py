@@ -0,0 +1,83 @@
+"""
+Benchmark a Data Analysis page rerun with and without the analysis cache.
+
+A rerun fingerprints the upload and looks up the frame, analysis, key
+metrics and charts; without the cache every one of them is recomputed.
+
+Usage:
+    python benchmarks/bench_analysis_cache.py --athletes 20 --sessions 200 --reruns 10
+"""
+import os
+import sys
+import time
+import argparse
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.analysis_cache import AnalysisCache, data_fingerprint
+from utils.data_processor import process_performance_data, extract_key_metrics
+from utils.performance_frame import PerformanceFrame
+from utils.visualization import create_performance_radar, plot_trend_analysis
+
+
+def rerun(data, athlete, cache=None):
+    """Run the analysis part of the page once, optionally through the cache."""
+    if cache is None:
+        frame = PerformanceFrame(data)
+        results = [process_performance_data(frame, athlete), extract_key_metrics(frame, athlete),
+                   create_performance_radar(frame, athlete), plot_trend_analysis(frame, athlete, 'Speed')]
+        plt.close('all')
+        return results
+
+    key = data_fingerprint(data)
+    frame = cache.get_or_compute((key, 'frame'), lambda: PerformanceFrame(data))
+    return [
+        cache.get_or_compute((key, athlete, 'analysis'), lambda: process_performance_data(frame, athlete)),
+        cache.get_or_compute((key, athlete, 'key_metrics'), lambda: extract_key_metrics(frame, athlete)),
+        cache.get_or_compute((key, athlete, 'radar'), lambda: create_performance_radar(frame, athlete)),
+        cache.get_or_compute((key, athlete, 'trend', 'Speed'), lambda: plot_trend_analysis(frame, athlete, 'Speed'))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--athletes', type=int, default=20)
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--reruns', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    rows = args.athletes * args.sessions
+    data = pd.DataFrame({
+        'Athlete': np.repeat([f"Athlete{i}" for i in range(args.athletes)], args.sessions),
+        'Date': np.tile(pd.date_range('2024-01-01', periods=args.sessions).astype(str), args.athletes),
+        **{metric: rng.uniform(50, 100, rows) for metric in ['Strength', 'Speed', 'Endurance', 'Agility', 'Power']}
+    })
+
+    start = time.perf_counter()
+    for _ in range(args.reruns):
+        rerun(data, 'Athlete0')
+    uncached_time = (time.perf_counter() - start) / args.reruns
+
+    cache = AnalysisCache()
+    rerun(data, 'Athlete0', cache)
+    start = time.perf_counter()
+    for _ in range(args.reruns):
+        rerun(data, 'Athlete0', cache)
+    cached_time = (time.perf_counter() - start) / args.reruns
+
+    print(f"{rows:,} rows, {args.reruns} reruns")
+    print(f"recompute per rerun: {uncached_time * 1000:8.2f}ms")
+    print(f"cached per rerun:    {cached_time * 1000:8.2f}ms")
+    print(f"speedup: {uncached_time / cached_time:.1f}x")
+    print(f"cache: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
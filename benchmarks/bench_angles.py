@@ -0,0 +1,67 @@
+"""
+Benchmark the batched joint-angle kernel against scalar calculate_angle calls.
+
+Computes the knee, hip, elbow and shoulder angles (8 triplets) of every
+frame, once with one scalar call per frame and triplet and once with a single
+joint_angles call over the (frames, 14, 2) keypoint array.
+
+Usage:
+    python benchmarks/bench_angles.py --frames 100000
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.pose_geometry import joint_angles
+from utils.pose_sequence import JOINT_ANGLES, JOINT_INDEX
+
+
+def scalar_angle(point1, point2, point3):
+    """The one-triplet calculate_angle implementation the kernel replaces."""
+    a = np.array(point1)
+    b = np.array(point2)
+    c = np.array(point3)
+    ba = a - b
+    bc = c - b
+    cosine_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc))
+    return np.degrees(np.arccos(np.clip(cosine_angle, -1.0, 1.0)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=100000)
+    parser.add_argument('--missing', type=float, default=0.01, help="Fraction of joints set to NaN")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    keypoints = rng.uniform(0, 720, size=(args.frames, 14, 2)).astype(np.float32)
+    keypoints[rng.random((args.frames, 14)) < args.missing] = np.nan
+    triplets = np.array([[JOINT_INDEX[name] for name in joints] for joints in JOINT_ANGLES.values()])
+
+    start = time.perf_counter()
+    with np.errstate(invalid='ignore'):
+        scalar = np.array([
+            [scalar_angle(frame[a], frame[b], frame[c]) for a, b, c in triplets]
+            for frame in keypoints.astype(np.float64)
+        ])
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = joint_angles(keypoints, triplets)
+    kernel_time = time.perf_counter() - start
+
+    print(f"{args.frames:,} frames x {len(triplets)} angles")
+    print(f"scalar calculate_angle: {scalar_time:8.3f}s")
+    print(f"joint_angles kernel:    {kernel_time:8.3f}s")
+    print(f"speedup: {scalar_time / kernel_time:.0f}x")
+    print(f"max abs difference: {np.nanmax(np.abs(batched - scalar)):.2e}")
+    print(f"NaN pattern equal: {np.array_equal(np.isnan(batched), np.isnan(scalar))}")
+
+
+if __name__ == "__main__":
+    main()
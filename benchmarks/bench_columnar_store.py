@@ -0,0 +1,80 @@
+"""
+Benchmark squad and athlete loads from the Parquet store against a full CSV read.
+
+Usage:
+    python benchmarks/bench_columnar_store.py --athletes 25 --days 365 --metrics 10 --seasons 3
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.columnar_store import write_performance_store, read_performance_store
+
+
+def make_history(athletes, days, metrics, seasons, seed=0):
+    """Daily sessions for a squad over several seasons."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2022-01-01', periods=days * seasons, freq='D')
+    df = pd.DataFrame(
+        rng.uniform(50, 100, size=(len(dates) * athletes, metrics)).round(2),
+        columns=[f"Metric {i + 1}" for i in range(metrics)]
+    )
+    df.insert(0, 'Date', np.tile(dates, athletes))
+    df.insert(0, 'Athlete', np.repeat([f"Athlete {i + 1}" for i in range(athletes)], len(dates)))
+    return df
+
+
+def timed(func, repeat=5):
+    """Best-of-repeat wall time of func, with its last result."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--athletes', type=int, default=25)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--metrics', type=int, default=10)
+    parser.add_argument('--seasons', type=int, default=3)
+    args = parser.parse_args()
+
+    history = make_history(args.athletes, args.days, args.metrics, args.seasons)
+    season = 2022 + args.seasons - 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'history.csv')
+        store_path = os.path.join(tmp, 'store')
+        history.to_csv(csv_path, index=False)
+
+        start = time.perf_counter()
+        written = write_performance_store(history, store_path)
+        print(f"wrote {written:,} measurements in {time.perf_counter() - start:.2f}s")
+
+        def csv_season():
+            df = pd.read_csv(csv_path, parse_dates=['Date'])
+            return df[df['Date'].dt.year == season]
+
+        squad_csv, csv_time = timed(csv_season)
+        squad, store_time = timed(lambda: read_performance_store(store_path, seasons=[season]))
+        athlete, athlete_time = timed(lambda: read_performance_store(
+            store_path, athletes=['Athlete 1'], start=f"{season}-06-01", end=f"{season}-06-30", metrics=['Metric 1']
+        ))
+
+        print(f"season {season} for the squad from CSV:     {csv_time * 1000:8.1f} ms ({len(squad_csv):,} rows)")
+        print(f"season {season} for the squad from Parquet: {store_time * 1000:8.1f} ms ({len(squad):,} rows)")
+        print(f"one athlete, one month, one metric:       {athlete_time * 1000:8.1f} ms ({len(athlete):,} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark mixed concurrent reads and writes through utils.database.
+
+N threads each run a mix of per-athlete loads and single-metric saves against
+a throwaway SQLite database (or DATABASE_URL if --use-env-url is given).
+Run it once with the default WAL journal and once with --journal-mode DELETE
+to compare throughput and lock errors.
+
+Usage:
+    python benchmarks/bench_concurrency.py --threads 8 --ops 200 --write-ratio 0.2
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import datetime
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=8, help="Worker threads")
+    parser.add_argument('--ops', type=int, default=200, help="Operations per thread")
+    parser.add_argument('--write-ratio', type=float, default=0.2, help="Fraction of operations that write")
+    parser.add_argument('--athletes', type=int, default=20, help="Athletes to spread operations over")
+    parser.add_argument('--journal-mode', default='WAL', help="SQLite journal mode (WAL, DELETE, ...)")
+    parser.add_argument('--use-env-url', action='store_true', help="Use DATABASE_URL instead of a temp SQLite file")
+    return parser.parse_args()
+
+
+args = parse_args()
+
+# Configure the database module through the environment before importing it
+if not args.use_env_url:
+    _tmp_dir = tempfile.mkdtemp(prefix="sports_bench_")
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+os.environ['DB_SQLITE_JOURNAL_MODE'] = args.journal_mode
+os.environ.setdefault('DB_POOL_SIZE', str(args.threads))
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+
+from utils.database import store_team_dataframe, save_performance_data, load_dataframe, delete_athlete
+
+
+def seed_data(athletes, sessions=100):
+    """Give every athlete some history to read."""
+    names = [f"Concurrent Athlete {i + 1}" for i in range(athletes)]
+    df = pd.DataFrame({
+        'Athlete': np.repeat(names, sessions),
+        'Date': np.tile(pd.date_range('2022-01-01', periods=sessions), athletes),
+        'Speed': np.random.uniform(50, 100, athletes * sessions),
+        'Strength': np.random.uniform(50, 100, athletes * sessions)
+    })
+    store_team_dataframe(df)
+    return names
+
+
+def worker(worker_id, names, ops, write_ratio):
+    """Run a mix of reads and writes and return (latencies, errors)."""
+    rng = random.Random(worker_id)
+    latencies = []
+    errors = 0
+    for i in range(ops):
+        name = rng.choice(names)
+        start = time.perf_counter()
+        try:
+            if rng.random() < write_ratio:
+                save_performance_data(
+                    name, 'Speed', rng.uniform(50, 100),
+                    date=datetime.datetime(2023, 1, 1) + datetime.timedelta(seconds=worker_id * ops + i)
+                )
+            else:
+                load_dataframe(name, metrics=['Speed'], limit=30)
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    return latencies, errors
+
+
+def main():
+    names = seed_data(args.athletes)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        results = list(pool.map(
+            lambda worker_id: worker(worker_id, names, args.ops, args.write_ratio),
+            range(args.threads)
+        ))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.concatenate([np.array(lat) for lat, _ in results])
+    errors = sum(err for _, err in results)
+    total_ops = args.threads * args.ops
+
+    print(f"journal mode: {args.journal_mode}, threads: {args.threads}, write ratio: {args.write_ratio}")
+    print(f"{total_ops} ops in {elapsed:.2f}s ({total_ops / elapsed:,.0f} ops/sec), {errors} errors")
+    print(f"latency p50 {np.percentile(latencies, 50) * 1000:.2f} ms, "
+          f"p95 {np.percentile(latencies, 95) * 1000:.2f} ms, "
+          f"max {latencies.max() * 1000:.2f} ms")
+
+    for name in names:
+        delete_athlete(name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark per-athlete reads before and after the migration indexes exist.
+
+A throwaway SQLite database is filled with performance rows while only the
+primary keys are indexed, as in databases created before the indexes were
+added. Per-athlete loads are timed, migrate_db() is run, and the same loads
+are timed again.
+
+Usage:
+    python benchmarks/bench_indexes.py --rows 1000000 --athletes 1000
+"""
+import os
+import sys
+import time
+import argparse
+import datetime
+import tempfile
+
+import numpy as np
+from sqlalchemy import insert, select, text
+
+# Point the database module at a temporary SQLite file before importing it
+_tmp_dir = tempfile.mkdtemp(prefix="sports_bench_")
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.database import (
+    engine, migrate_db, get_athlete_performance_data, load_dataframe,
+    Athlete, PerformanceData, Base
+)
+
+
+def drop_model_indexes():
+    """Drop every model-declared index to simulate a pre-migration database."""
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                connection.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+
+def populate(rows, athletes, metrics, seed=0):
+    """Insert athletes and `rows` performance rows spread evenly across them."""
+    rng = np.random.default_rng(seed)
+    metric_names = [f"Metric {i + 1}" for i in range(metrics)]
+    start = datetime.datetime(2015, 1, 1)
+
+    with engine.begin() as connection:
+        connection.execute(insert(Athlete.__table__), [
+            {'id': i + 1, 'name': f"Athlete {i + 1}"} for i in range(athletes)
+        ])
+
+        batch_size = 100_000
+        for offset in range(0, rows, batch_size):
+            n = min(batch_size, rows - offset)
+            idx = np.arange(offset, offset + n)
+            athlete_ids = idx % athletes + 1
+            sessions = idx // (athletes * metrics)
+            metric_idx = (idx // athletes) % metrics
+            values = rng.uniform(50, 100, size=n)
+            connection.execute(insert(PerformanceData.__table__), [
+                {
+                    'athlete_id': int(a),
+                    'date': start + datetime.timedelta(days=int(d)),
+                    'metric_name': metric_names[m],
+                    'metric_value': float(v)
+                }
+                for a, d, m, v in zip(athlete_ids, sessions, metric_idx, values)
+            ])
+
+
+def time_queries(athlete_names, metric):
+    """Time full-history loads, a single-metric window query and a latest-30 load per athlete."""
+    start = time.perf_counter()
+    for name in athlete_names:
+        get_athlete_performance_data(name)
+    history_time = (time.perf_counter() - start) / len(athlete_names)
+
+    window_start = datetime.datetime(2015, 6, 1)
+    start = time.perf_counter()
+    with engine.connect() as connection:
+        for i in range(len(athlete_names)):
+            connection.execute(
+                select(PerformanceData.date, PerformanceData.metric_value)
+                .where(PerformanceData.athlete_id == i + 1)
+                .where(PerformanceData.metric_name == metric)
+                .where(PerformanceData.date >= window_start)
+                .order_by(PerformanceData.date)
+            ).all()
+    window_time = (time.perf_counter() - start) / len(athlete_names)
+
+    start = time.perf_counter()
+    for name in athlete_names:
+        load_dataframe(name, metrics=[metric], limit=30)
+    latest_time = (time.perf_counter() - start) / len(athlete_names)
+
+    return history_time, window_time, latest_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Performance rows to insert")
+    parser.add_argument('--athletes', type=int, default=1000, help="Athletes sharing the rows")
+    parser.add_argument('--metrics', type=int, default=10, help="Distinct metric names")
+    parser.add_argument('--samples', type=int, default=20, help="Athletes queried per measurement")
+    args = parser.parse_args()
+
+    drop_model_indexes()
+
+    start = time.perf_counter()
+    populate(args.rows, args.athletes, args.metrics)
+    print(f"inserted {args.rows:,} rows in {time.perf_counter() - start:.1f}s")
+
+    sample = [f"Athlete {i + 1}" for i in range(args.samples)]
+    before = time_queries(sample, "Metric 1")
+
+    start = time.perf_counter()
+    created = migrate_db()
+    print(f"migrate_db created {', '.join(created)} in {time.perf_counter() - start:.1f}s")
+
+    after = time_queries(sample, "Metric 1")
+
+    print(f"{'query':<28}{'before (ms)':>14}{'after (ms)':>14}{'speedup':>10}")
+    for label, b, a in zip(["full history load", "one-metric date window", "latest 30 of one metric"], before, after):
+        print(f"{label:<28}{b * 1000:>14.2f}{a * 1000:>14.2f}{b / a:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark streaming CSV ingest against reading the whole file into a DataFrame.
+
+Reports wall time and peak Python memory (tracemalloc) of each path.
+
+Usage:
+    python benchmarks/bench_ingest.py --rows 1000000 --metrics 10 --athletes 200
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.ingest import stream_performance_csv
+from utils.data_processor import process_all_athletes
+
+
+def write_csv(path, rows, metrics, athletes, seed=0):
+    """Write a synthetic wearable export, in time order per athlete."""
+    rng = np.random.default_rng(seed)
+    sessions = rows // athletes
+    df = pd.DataFrame(
+        rng.uniform(50, 100, size=(sessions * athletes, metrics)).round(2),
+        columns=[f"Metric {i + 1}" for i in range(metrics)]
+    )
+    df.insert(0, 'Date', np.tile(pd.date_range('2020-01-01', periods=sessions, freq='h').astype(str), athletes))
+    df.insert(0, 'Athlete', np.repeat([f"Athlete {i + 1}" for i in range(athletes)], sessions))
+    df.to_csv(path, index=False)
+
+
+def measure(func):
+    """Run func and return (result, seconds, peak MiB)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--metrics', type=int, default=10)
+    parser.add_argument('--athletes', type=int, default=200)
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'export.csv')
+        write_csv(path, args.rows, args.metrics, args.athletes)
+        print(f"{args.rows:,} rows x {args.metrics} metrics, {os.path.getsize(path) / 2 ** 20:.0f} MiB CSV")
+
+        _, full_time, full_peak = measure(lambda: process_all_athletes(pd.read_csv(path)))
+        print(f"read_csv + process_all_athletes: {full_time:8.2f}s  peak {full_peak:8.1f} MiB")
+
+        result, stream_time, stream_peak = measure(
+            lambda: stream_performance_csv(path, spill=None, chunksize=args.chunksize)
+        )
+        print(f"stream_performance_csv:          {stream_time:8.2f}s  peak {stream_peak:8.1f} MiB "
+              f"({len(result.summaries.stats):,} summaries)")
+
+
+if __name__ == "__main__":
+    main()
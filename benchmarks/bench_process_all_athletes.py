@@ -0,0 +1,59 @@
+"""
+Benchmark league-wide analysis: process_all_athletes vs. a per-athlete loop.
+
+Usage:
+    python benchmarks/bench_process_all_athletes.py --athletes 500 --sessions 50 --metrics 10
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.data_processor import process_performance_data, process_all_athletes
+
+
+def make_league(athletes, sessions, metrics, seed=0):
+    """Create a synthetic league DataFrame with a few missing values."""
+    rng = np.random.default_rng(seed)
+    rows = athletes * sessions
+    df = pd.DataFrame(
+        rng.uniform(50, 100, size=(rows, metrics)),
+        columns=[f"Metric {i + 1}" for i in range(metrics)]
+    )
+    df = df.mask(rng.random(df.shape) < 0.05)
+    df.insert(0, 'Date', np.tile(pd.date_range('2023-01-01', periods=sessions).astype(str), athletes))
+    df.insert(0, 'Athlete', np.repeat([f"Athlete {i + 1}" for i in range(athletes)], sessions))
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--athletes', type=int, default=500)
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--metrics', type=int, default=10)
+    args = parser.parse_args()
+
+    data = make_league(args.athletes, args.sessions, args.metrics)
+
+    start = time.perf_counter()
+    for athlete in data['Athlete'].unique():
+        process_performance_data(data, athlete)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = process_all_athletes(data)
+    vector_time = time.perf_counter() - start
+
+    print(f"{args.athletes} athletes x {args.metrics} metrics, {len(data):,} rows")
+    print(f"per-athlete process_performance_data loop: {loop_time:8.3f}s")
+    print(f"process_all_athletes ({len(results):,} result rows): {vector_time:8.3f}s")
+    print(f"speedup: {loop_time / vector_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
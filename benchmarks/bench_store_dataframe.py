@@ -0,0 +1,115 @@
+"""
+Benchmark the bulk DataFrame ingest path against the per-cell legacy path.
+
+Both paths write into a throwaway SQLite database so the numbers are not
+affected by any data already stored in sports_performance.db.
+
+It also compares saving a whole squad with store_team_dataframe against
+filtering and saving one athlete at a time.
+
+Usage:
+    python benchmarks/bench_store_dataframe.py --rows 2000 --metrics 10 --athletes 40
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Point the database module at a temporary SQLite file before importing it
+_tmp_dir = tempfile.mkdtemp(prefix="sports_bench_")
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.database import (
+    bulk_store_dataframe, store_team_dataframe, save_performance_data,
+    get_or_create_athlete, delete_athlete
+)
+
+
+def make_frame(rows, metrics, athletes=1, seed=0):
+    """Create a synthetic wide performance DataFrame."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        rng.uniform(50, 100, size=(rows, metrics)).round(2),
+        columns=[f"Metric {i + 1}" for i in range(metrics)]
+    )
+    df.insert(0, 'Date', pd.date_range('2020-01-01', periods=rows, freq='h'))
+    df.insert(0, 'Athlete', [f"Bench Athlete {i % athletes + 1}" for i in range(rows)])
+    return df
+
+
+def legacy_store(athlete_name, df):
+    """The previous store_dataframe loop: one session and commit per metric value."""
+    get_or_create_athlete(athlete_name)
+    metric_columns = [col for col in df.columns if col not in ['Athlete', 'Date', 'Session', 'date']]
+    for _, row in df.iterrows():
+        for metric in metric_columns:
+            if pd.notna(row[metric]):
+                save_performance_data(
+                    athlete_name=athlete_name,
+                    metric_name=metric,
+                    metric_value=float(row[metric]),
+                    date=pd.to_datetime(row['Date'])
+                )
+
+
+def looped_team_store(df):
+    """Save a squad one athlete at a time, as the Data Analysis page used to."""
+    for athlete in df['Athlete'].unique():
+        bulk_store_dataframe(athlete, df[df['Athlete'] == athlete])
+
+
+def time_call(func, *args):
+    """Run func once and return the elapsed wall time in seconds."""
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000, help="DataFrame rows (sessions)")
+    parser.add_argument('--metrics', type=int, default=10, help="Metric columns per row")
+    parser.add_argument('--legacy-rows', type=int, default=200,
+                        help="Rows used for the much slower legacy path")
+    parser.add_argument('--athletes', type=int, default=40, help="Athletes in the team comparison")
+    args = parser.parse_args()
+
+    bulk_df = make_frame(args.rows, args.metrics)
+    legacy_df = make_frame(args.legacy_rows, args.metrics)
+
+    bulk_cells = args.rows * args.metrics
+    legacy_cells = args.legacy_rows * args.metrics
+
+    legacy_time = time_call(legacy_store, "Legacy Athlete", legacy_df)
+    bulk_time = time_call(bulk_store_dataframe, "Bulk Athlete", bulk_df)
+
+    legacy_rate = legacy_cells / legacy_time
+    bulk_rate = bulk_cells / bulk_time
+
+    print(f"legacy store_dataframe: {legacy_cells:>9} rows in {legacy_time:8.3f}s  ({legacy_rate:12,.0f} rows/sec)")
+    print(f"bulk_store_dataframe:   {bulk_cells:>9} rows in {bulk_time:8.3f}s  ({bulk_rate:12,.0f} rows/sec)")
+    print(f"speedup: {bulk_rate / legacy_rate:.1f}x")
+
+    delete_athlete("Legacy Athlete")
+    delete_athlete("Bulk Athlete")
+
+    team_df = make_frame(args.rows, args.metrics, athletes=args.athletes, seed=1)
+    team_cells = args.rows * args.metrics
+
+    looped_time = time_call(looped_team_store, team_df)
+    team_df['Athlete'] = team_df['Athlete'].str.replace('Bench', 'Team')
+    team_time = time_call(store_team_dataframe, team_df)
+
+    print(f"per-athlete loop ({args.athletes} athletes): {team_cells} rows in {looped_time:8.3f}s")
+    print(f"store_team_dataframe ({args.athletes} athletes): {team_cells} rows in {team_time:8.3f}s")
+    print(f"speedup: {looped_time / team_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmark the batched trend kernel against one np.polyfit call per series.
+
+Usage:
+    python benchmarks/bench_trend.py --series 10000 --length 50
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.trend import batch_trends
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--series', type=int, default=10000)
+    parser.add_argument('--length', type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    values = rng.uniform(50, 100, size=(args.series, args.length))
+    x = np.arange(args.length)
+
+    start = time.perf_counter()
+    polyfit_slopes = np.array([np.polyfit(x, row, 1)[0] for row in values])
+    polyfit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    slopes, _ = batch_trends(values)
+    kernel_time = time.perf_counter() - start
+
+    print(f"{args.series:,} series x {args.length} points")
+    print(f"per-series np.polyfit: {polyfit_time:8.3f}s")
+    print(f"batch_trends:          {kernel_time:8.3f}s")
+    print(f"speedup: {polyfit_time / kernel_time:.1f}x")
+    print(f"max abs slope difference: {np.max(np.abs(slopes - polyfit_slopes)):.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark the video analysis pipeline against the serial decode/pose loop.
+
+Writes a synthetic MP4 clip, then analyzes every frame with a plain loop
+(decode, detect_pose, analyze_keypoints one after the other) and with
+VideoAnalysisPipeline at several worker counts.
+
+Usage:
+    python benchmarks/bench_video_pipeline.py --seconds 10 --workers 1 2 4
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import cv2
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.image_analyzer import analyze_keypoints, detect_pose
+from utils.video_pipeline import VideoAnalysisPipeline
+from utils.video_source import VideoFrameSource
+from bench_video_source import write_clip
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=int, default=10)
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'clip.mp4')
+        write_clip(path, args.seconds * args.fps, args.fps, args.width, args.height)
+
+        start = time.perf_counter()
+        frames = 0
+        for frame in VideoFrameSource(path, target_fps=None, max_frames=None):
+            analyze_keypoints(detect_pose(frame.image), frame.image.shape)
+            frames += 1
+        serial_time = time.perf_counter() - start
+        print(f"{frames} frames at {args.width}x{args.height}")
+        print(f"serial loop:          {serial_time:8.3f}s ({frames / serial_time:7.1f} fps)")
+
+        for workers in args.workers:
+            source = VideoFrameSource(path, target_fps=None, max_frames=None)
+            result = VideoAnalysisPipeline(workers=workers).run(source)
+            stats = result.stats
+            print(f"pipeline, {workers} workers: {stats['total']['seconds']:8.3f}s "
+                  f"({stats['total']['fps']:7.1f} fps; decode {stats['decode']['fps']:.0f}, "
+                  f"pose {stats['pose']['fps']:.0f}, analyze {stats['analyze']['fps']:.0f} fps per stage)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark sequential frame sampling against one seek per sampled frame.
+
+Writes a synthetic MP4 clip, then samples it at the analysis rate with
+cap.set(cv2.CAP_PROP_POS_FRAMES, idx) + read() and with VideoFrameSource.
+
+Usage:
+    python benchmarks/bench_video_source.py --seconds 20 --fps 30 --target-fps 5
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.video_source import VideoFrameSource
+
+
+def write_clip(path, frames, fps, width, height):
+    """Write a moving-gradient clip so inter frames are not trivial."""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    for index in range(frames):
+        row = ((x + index * 4) % 256).astype(np.uint8)
+        writer.write(np.dstack([np.tile(row, (height, 1))] * 3))
+    writer.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=int, default=20)
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--target-fps', type=float, default=5.0)
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=360)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'clip.mp4')
+        frame_count = args.seconds * args.fps
+        write_clip(path, frame_count, args.fps, args.width, args.height)
+
+        step = args.fps / args.target_fps
+        sample_indices = [int(i * step) for i in range(int(frame_count / step))]
+
+        start = time.perf_counter()
+        cap = cv2.VideoCapture(path)
+        seek_frames = 0
+        for index in sample_indices:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+            ok, _ = cap.read()
+            seek_frames += ok
+        cap.release()
+        seek_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sequential_frames = sum(1 for _ in VideoFrameSource(path, target_fps=args.target_fps, max_frames=None))
+        sequential_time = time.perf_counter() - start
+
+    print(f"{frame_count} frames at {args.fps} fps, sampled at {args.target_fps} fps")
+    print(f"seek per frame:    {seek_time:8.3f}s ({seek_frames} frames)")
+    print(f"VideoFrameSource:  {sequential_time:8.3f}s ({sequential_frames} frames)")
+    print(f"speedup: {seek_time / sequential_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+import os
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.analysis_cache import AnalysisCache, data_fingerprint
+from utils.performance_frame import PerformanceFrame
+from utils.visualization import create_performance_radar, figure_to_png
+
+class TestAnalysisCache(unittest.TestCase):
+    """Tests for the analysis_cache module."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.sample_data = pd.DataFrame({
+            'Athlete': ['Athlete1', 'Athlete1', 'Athlete2'],
+            'Date': ['2023-01-01', '2023-01-02', '2023-01-01'],
+            'Strength': [80, 82, 75],
+            'Speed': [90, 89, 88]
+        })
+    
+    def test_fingerprint_depends_on_content(self):
+        """Test that equal data hashes equal and any change alters the hash."""
+        key = data_fingerprint(self.sample_data)
+        self.assertEqual(key, data_fingerprint(self.sample_data.copy()))
+        self.assertEqual(data_fingerprint(PerformanceFrame(self.sample_data)),
+                         data_fingerprint(PerformanceFrame(self.sample_data.copy())))
+        
+        changed = self.sample_data.copy()
+        changed.loc[2, 'Speed'] = 87
+        self.assertNotEqual(key, data_fingerprint(changed))
+        self.assertNotEqual(key, data_fingerprint(self.sample_data.rename(columns={'Speed': 'Agility'})))
+        self.assertNotEqual(key, data_fingerprint(self.sample_data.astype({'Speed': float})))
+    
+    def test_get_or_compute_counts_hits_and_misses(self):
+        """Test that a cached key is computed once."""
+        cache = AnalysisCache()
+        calls = []
+        compute = lambda: calls.append(1) or {'mean': 1.0}
+        
+        first = cache.get_or_compute(('data', 'Athlete1', 'analysis'), compute)
+        second = cache.get_or_compute(('data', 'Athlete1', 'analysis'), compute)
+        
+        self.assertIs(first, second)
+        self.assertEqual(len(calls), 1)
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (1, 1, 1))
+        self.assertGreater(stats['bytes'], 0)
+    
+    def test_lru_eviction_by_size(self):
+        """Test that the least recently used entries are evicted over budget."""
+        cache = AnalysisCache(max_bytes=3 * 8000 + 100)
+        for name in ['a', 'b', 'c']:
+            cache.put(name, np.zeros(1000))
+        cache.get('a')
+        cache.put('d', np.zeros(1000))
+        
+        self.assertNotIn('b', cache)
+        self.assertIn('a', cache)
+        self.assertEqual(cache.stats()['evictions'], 1)
+        
+        # Values larger than the whole budget are not cached
+        cache.put('huge', np.zeros(10000))
+        self.assertNotIn('huge', cache)
+        self.assertLessEqual(cache.current_bytes, cache.max_bytes)
+    
+    def test_evicted_figures_are_closed(self):
+        """Test that figures are sized and closed on eviction."""
+        cache = AnalysisCache(max_entries=1)
+        fig = create_performance_radar(self.sample_data, 'Athlete1')
+        cache.put('radar', fig)
+        self.assertGreater(cache.current_bytes, 100000)
+        
+        cache.put('other', {'mean': 1.0})
+        self.assertNotIn(fig.number, plt.get_fignums())
+    
+    def test_charts_cached_as_png(self):
+        """Test that cached charts are rendered images, not open figures."""
+        cache = AnalysisCache()
+        open_figures = len(plt.get_fignums())
+        png = cache.get_or_compute(
+            'radar', lambda: figure_to_png(create_performance_radar(self.sample_data, 'Athlete1'))
+        )
+        
+        self.assertIsInstance(png, bytes)
+        self.assertTrue(png.startswith(b'\x89PNG'))
+        self.assertEqual(len(plt.get_fignums()), open_figures)
+        self.assertGreaterEqual(cache.current_bytes, len(png))
+        self.assertIs(cache.get_or_compute('radar', lambda: b''), png)
+
+if __name__ == '__main__':
+    unittest.main()
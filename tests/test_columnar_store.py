@@ -0,0 +1,77 @@
+import unittest
+from unittest import mock
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.columnar_store import pa, write_performance_store, read_performance_store, PerformanceStore
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class TestColumnarStore(unittest.TestCase):
+    """Tests for the columnar_store module."""
+    
+    def setUp(self):
+        """Set up a temporary store and test data."""
+        self.path = tempfile.mkdtemp()
+        self.sample_data = pd.DataFrame({
+            'Athlete': ['Athlete1', 'Athlete1', 'Athlete1', 'Athlete2', 'Athlete2'],
+            'Date': ['2023-12-30', '2024-01-02', '2024-01-05', '2024-01-01', '2024-01-03'],
+            'Strength': [80, 82, 85, 75, np.nan],
+            'Speed': [90, 89, 92, 88, 87],
+            'Session': ['S1', 'S2', 'S3', 'S1', 'S2']
+        })
+        write_performance_store(self.sample_data, self.path)
+    
+    def tearDown(self):
+        """Remove the temporary store."""
+        shutil.rmtree(self.path, ignore_errors=True)
+    
+    def test_partitions(self):
+        """Test that data is partitioned by season and athlete."""
+        self.assertEqual(sorted(os.listdir(self.path)), ['season=2023', 'season=2024'])
+        self.assertEqual(sorted(os.listdir(os.path.join(self.path, 'season=2024'))),
+                         ['athlete=Athlete1', 'athlete=Athlete2'])
+    
+    def test_read_filters(self):
+        """Test athlete, date and metric filters."""
+        df = read_performance_store(self.path)
+        self.assertEqual(len(df), 5)
+        self.assertEqual(list(df.columns), ['Athlete', 'Date', 'Speed', 'Strength'])
+        
+        df = read_performance_store(self.path, athletes=['Athlete1'], start='2024-01-01', metrics=['Strength'])
+        self.assertEqual(df['Strength'].tolist(), [82, 85])
+        self.assertNotIn('Speed', df.columns)
+        
+        self.assertTrue(read_performance_store(self.path, athletes=['Unknown']).empty)
+        self.assertTrue(read_performance_store(os.path.join(self.path, 'missing')).empty)
+    
+    def test_write_replaces_measurements(self):
+        """Test that rewriting a measurement replaces it and keeps the rest of the partition."""
+        update = pd.DataFrame({'Date': ['2024-01-05', '2024-01-06'], 'Strength': [86, 88]})
+        
+        self.assertEqual(write_performance_store(update, self.path, athlete='Athlete1'), 2)
+        df = read_performance_store(self.path, athletes=['Athlete1'], metrics='Strength')
+        self.assertEqual(df['Strength'].tolist(), [80, 82, 86, 88])
+    
+    def test_store_as_data_source(self):
+        """Test analysis and database loading from the store."""
+        from utils.data_processor import process_performance_data
+        
+        results = process_performance_data(PerformanceStore(self.path), 'Athlete1')
+        self.assertEqual(results['metrics']['Strength']['recent'], 85)
+        self.assertEqual(results['data_points'], 3)
+        
+        from utils.database import load_dataframe
+        with mock.patch('utils.columnar_store.PERFORMANCE_STORE_PATH', self.path):
+            df = load_dataframe('Athlete1', source='parquet', limit=2)
+        self.assertEqual(list(df.columns), ['date', 'Speed', 'Strength'])
+        self.assertEqual(len(df), 2)
+
+if __name__ == '__main__':
+    unittest.main()
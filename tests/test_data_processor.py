@@ -11,7 +11,9 @@ from utils.data_processor import (
     process_performance_data,
     calculate_trend,
     identify_strengths_weaknesses,
-    extract_key_metrics
+    extract_key_metrics,
+    process_all_athletes,
+    identify_all_strengths_weaknesses
 )
 
 class TestDataProcessor(unittest.TestCase):
@@ -83,6 +85,22 @@ class TestDataProcessor(unittest.TestCase):
         for weakness in weaknesses:
             self.assertIn(weakness, metrics)
             
+    def test_identify_all_strengths_weaknesses(self):
+        """Test strengths and weaknesses for every athlete at once."""
+        metrics = ['Strength', 'Speed', 'Endurance', 'Recovery Time', 'Technique Score']
+        
+        results = identify_all_strengths_weaknesses(self.sample_data, metrics)
+        
+        self.assertEqual(set(results), {'Athlete1', 'Athlete2'})
+        athlete_data = self.sample_data[self.sample_data['Athlete'] == 'Athlete1']
+        self.assertEqual(results['Athlete1'], identify_strengths_weaknesses(athlete_data, metrics))
+        
+        # Missing values no longer blank out the whole result
+        with_missing = athlete_data.copy()
+        with_missing.loc[with_missing.index[0], 'Speed'] = np.nan
+        strengths, weaknesses = identify_strengths_weaknesses(with_missing, metrics)
+        self.assertTrue(len(strengths) > 0)
+            
     def test_extract_key_metrics(self):
         """Test extraction of key metrics."""
         # Extract key metrics for Athlete1
@@ -98,5 +116,24 @@ class TestDataProcessor(unittest.TestCase):
         self.assertEqual(key_metrics['Speed'], 92)
         self.assertEqual(key_metrics['Endurance'], 75)
         
+    def test_process_all_athletes(self):
+        """Test the vectorized all-athletes analysis."""
+        results = process_all_athletes(self.sample_data)
+        
+        # One row per athlete and metric
+        self.assertEqual(len(results), 2 * 5)
+        
+        # Statistics and trends match the per-athlete analysis
+        per_athlete = process_performance_data(self.sample_data, 'Athlete1')
+        athlete1 = results[results['athlete'] == 'Athlete1'].set_index('metric')
+        for metric, stats in per_athlete['metrics'].items():
+            self.assertAlmostEqual(athlete1.loc[metric, 'mean'], stats['mean'])
+            self.assertAlmostEqual(athlete1.loc[metric, 'std'], stats['std'])
+            self.assertEqual(athlete1.loc[metric, 'recent'], stats['recent'])
+            self.assertEqual(athlete1.loc[metric, 'trend'], stats['trend'])
+        
+        # Closed-form slope matches a least-squares fit
+        self.assertAlmostEqual(athlete1.loc['Strength', 'slope'], np.polyfit([0, 1, 2], [80, 82, 85], 1)[0])
+        
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
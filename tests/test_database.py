@@ -3,6 +3,8 @@ import pandas as pd
 import sys
 import os
 import datetime
+from unittest import mock
+from sqlalchemy import inspect, text
 
 # Add the parent directory to sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -11,7 +13,12 @@ from utils.database import (
     init_db, get_or_create_athlete, save_performance_data,
     get_athlete_performance_data, save_form_analysis,
     get_athlete_form_analyses, get_all_athletes, delete_athlete,
-    store_dataframe, load_dataframe, Athlete, PerformanceData, FormAnalysis
+    store_dataframe, load_dataframe, bulk_store_dataframe, store_team_dataframe,
+    migrate_db, engine, session_scope, invalidate_athlete_cache,
+    search_athletes, count_athletes, iter_athletes, get_form_analysis,
+    update_metric_stats, load_metric_stats, get_metric_summaries,
+    get_percentile_index, invalidate_percentile_index, get_cohort_percentiles,
+    Athlete, PerformanceData, FormAnalysis
 )
 
 class TestDatabase(unittest.TestCase):
@@ -105,6 +112,19 @@ class TestDatabase(unittest.TestCase):
         for metric in self.sample_metrics.keys():
             self.assertIn(metric, performance_data.columns)
     
+    def test_save_performance_data_returns_stored_row(self):
+        """Test that saving returns the stored row, also when it already existed."""
+        date = datetime.datetime(2023, 7, 1, 9, 30)
+        saved = save_performance_data("TestAthlete", "Strength", 80.0, notes="First", date=date)
+        self.assertIsNotNone(saved.id)
+        self.assertEqual(saved.metric_value, 80.0)
+    
+        # Saving the same measurement again updates the same row
+        updated = save_performance_data("TestAthlete", "Strength", 82.0, date=date)
+        self.assertEqual(updated.id, saved.id)
+        self.assertEqual(updated.metric_value, 82.0)
+        self.assertEqual(updated.notes, "First")
+    
     def test_save_and_get_form_analysis(self):
         """Test saving and retrieving form analysis data."""
         # Save form analysis for the test athlete
@@ -126,6 +146,25 @@ class TestDatabase(unittest.TestCase):
         self.assertEqual(form_analyses[0]["analysis_data"]["posture"], "good")
         self.assertEqual(form_analyses[0]["recommendations"]["technique"][0], "Improve knee extension")
     
+    def test_form_analyses_without_data(self):
+        """Test listing form analyses without decoding the JSON payloads."""
+        save_form_analysis(
+            athlete_name="TestAthlete",
+            exercise_type="Squat",
+            analysis_data=self.sample_analysis,
+            recommendations=self.sample_recommendations
+        )
+        
+        listing = get_athlete_form_analyses("TestAthlete", include_data=False)
+        self.assertEqual(len(listing), 1)
+        self.assertEqual(set(listing[0].keys()), {"id", "date", "exercise_type"})
+        
+        # The full analysis is loaded on demand
+        analysis = get_form_analysis(listing[0]["id"])
+        self.assertEqual(analysis["analysis_data"]["joint_angles"]["knee"], 120)
+        self.assertEqual(analysis["recommendations"], self.sample_recommendations)
+        self.assertIsNone(get_form_analysis(-1))
+    
     def test_get_all_athletes(self):
         """Test retrieving all athletes."""
         # Get all athletes
@@ -164,6 +203,335 @@ class TestDatabase(unittest.TestCase):
         self.assertIn("Speed", loaded_df.columns)
         self.assertIn("Endurance", loaded_df.columns)
     
+    def test_bulk_store_dataframe(self):
+        """Test the single-transaction bulk ingest path."""
+        df = pd.DataFrame({
+            "Athlete": ["TestAthlete", "TestAthlete", "TestAthlete"],
+            "Date": ["2023-02-01", "2023-02-08", "2023-02-15"],
+            "Session": ["Morning", "Morning", "Evening"],
+            "Strength": [80, None, 85],
+            "Speed": [90, 92, "n/a"]
+        })
+        
+        # NaN and non-numeric cells are skipped
+        written = bulk_store_dataframe("TestAthlete", df, batch_size=2)
+        self.assertEqual(written, 4)
+        
+        loaded_df = load_dataframe("TestAthlete")
+        self.assertEqual(len(loaded_df), 3)
+        self.assertEqual(loaded_df["Strength"].dropna().tolist(), [80.0, 85.0])
+        self.assertEqual(loaded_df["Speed"].dropna().tolist(), [90.0, 92.0])
+    
+    def test_store_undated_dataframe(self):
+        """Test that rows without a usable date are stored as separate sessions."""
+        df = pd.DataFrame({"Speed": [1.0, 2.0, 3.0], "Power": [4, 5, 6]})
+        self.assertEqual(bulk_store_dataframe("TestAthlete", df), 6)
+    
+        dated = pd.DataFrame({"Date": ["2023-03-01", "not a date", None], "Speed": [7.0, 8.0, 9.0]})
+        self.assertEqual(bulk_store_dataframe("TestAthlete", dated), 3)
+    
+        loaded_df = load_dataframe("TestAthlete")
+        self.assertEqual(len(loaded_df), 6)
+        self.assertEqual(sorted(loaded_df["Speed"].tolist()), [1.0, 2.0, 3.0, 7.0, 8.0, 9.0])
+        # Undated rows keep their order after the dated history
+        self.assertEqual(loaded_df["Speed"].tolist()[1:4], [1.0, 2.0, 3.0])
+    
+    def test_get_athlete_performance_data_filters(self):
+        """Test date-range and metric filters on the joined loader."""
+        df = pd.DataFrame({
+            "Date": pd.date_range("2023-05-01", periods=4, freq="7D"),
+            "Strength": [80, 81, 82, 83],
+            "Speed": [90, 91, 92, 93]
+        })
+        store_dataframe("TestAthlete", df)
+        
+        filtered = get_athlete_performance_data(
+            "TestAthlete", start="2023-05-08", end="2023-05-15", metrics=["Speed"]
+        )
+        self.assertEqual(list(filtered.columns), ["date", "Speed"])
+        self.assertEqual(filtered["Speed"].tolist(), [91.0, 92.0])
+        
+        # limit keeps the most recent measurement dates
+        latest = load_dataframe("TestAthlete", metrics="Strength", limit=2)
+        self.assertEqual(latest["date"].tolist(), [pd.Timestamp("2023-05-15"), pd.Timestamp("2023-05-22")])
+        self.assertEqual(latest["Strength"].tolist(), [82.0, 83.0])
+        
+        # Unknown athletes give an empty DataFrame
+        self.assertTrue(get_athlete_performance_data("NoSuchAthlete").empty)
+    
+    def test_store_team_dataframe(self):
+        """Test storing several athletes from one team DataFrame."""
+        df = pd.DataFrame({
+            "Athlete": ["TestAthlete", "TeamAthlete", "TestAthlete", "TeamAthlete"],
+            "Sport": ["Running", "Rowing", "Running", "Rowing"],
+            "Date": pd.date_range("2023-03-01", periods=4),
+            "Strength": [80, 70, 82, None],
+            "Speed": [90, 60, 91, 62]
+        })
+        
+        try:
+            counts = store_team_dataframe(df)
+            self.assertEqual(counts, {"TestAthlete": 4, "TeamAthlete": 3})
+            
+            # New athletes pick up their sport, existing athletes are untouched
+            athletes = {athlete["name"]: athlete for athlete in get_all_athletes()}
+            self.assertEqual(athletes["TeamAthlete"]["sport"], "Rowing")
+            self.assertEqual(athletes["TestAthlete"]["sport"], "Running")
+            
+            loaded_df = load_dataframe("TeamAthlete")
+            self.assertEqual(loaded_df["Speed"].tolist(), [60.0, 62.0])
+        finally:
+            delete_athlete("TeamAthlete")
+    
+    def test_store_dataframe_is_idempotent(self):
+        """Test that re-storing the same data upserts instead of duplicating rows."""
+        df = pd.DataFrame({
+            "Athlete": ["TestAthlete", "TestAthlete"],
+            "Date": [pd.Timestamp("2023-04-01"), pd.Timestamp("2023-04-08")],
+            "Strength": [80, 82]
+        })
+        
+        store_dataframe("TestAthlete", df)
+        store_dataframe("TestAthlete", df)
+        
+        # A changed value replaces the stored one
+        df.loc[1, "Strength"] = 90
+        store_dataframe("TestAthlete", df)
+        
+        loaded_df = load_dataframe("TestAthlete")
+        self.assertEqual(len(loaded_df), 2)
+        self.assertEqual(loaded_df["Strength"].tolist(), [80.0, 90.0])
+    
+    def test_migrate_db_creates_missing_indexes(self):
+        """Test that migrate_db adds indexes missing from an existing database."""
+        # Already migrated by init_db
+        self.assertEqual(migrate_db(), [])
+        
+        with engine.begin() as connection:
+            connection.execute(text("DROP INDEX ix_form_analyses_athlete_date"))
+        
+        self.assertEqual(migrate_db(), ["ix_form_analyses_athlete_date"])
+        index_names = {idx["name"] for idx in inspect(engine).get_indexes("form_analyses")}
+        self.assertIn("ix_form_analyses_athlete_date", index_names)
+    
+    def test_session_scope_rolls_back_on_error(self):
+        """Test that a failed unit of work leaves no partial writes."""
+        with self.assertRaises(RuntimeError):
+            with session_scope() as session:
+                session.add(Athlete(name="RolledBackAthlete"))
+                session.flush()
+                raise RuntimeError("boom")
+        
+        names = [athlete["name"] for athlete in get_all_athletes()]
+        self.assertNotIn("RolledBackAthlete", names)
+    
+    def test_get_all_athletes_cache(self):
+        """Test that the athlete directory is cached and refreshed on writes."""
+        first = get_all_athletes()
+        second = get_all_athletes()
+        # Served from the cache: same dictionaries, new list
+        self.assertIsNot(first, second)
+        self.assertIs(first[0], second[0])
+        
+        get_or_create_athlete(name="CachedAthlete")
+        try:
+            names = [athlete["name"] for athlete in get_all_athletes()]
+            self.assertIn("CachedAthlete", names)
+        finally:
+            delete_athlete("CachedAthlete")
+        
+        names = [athlete["name"] for athlete in get_all_athletes()]
+        self.assertNotIn("CachedAthlete", names)
+        
+        # Manual invalidation forces a reload
+        cached = get_all_athletes()
+        invalidate_athlete_cache()
+        self.assertIsNot(get_all_athletes()[0], cached[0])
+    
+    def test_search_athletes_pagination(self):
+        """Test prefix/sport filtering and keyset pagination of the directory."""
+        names = [f"PagedAthlete{i}" for i in range(5)]
+        for name in names:
+            get_or_create_athlete(name=name, sport="Fencing")
+        get_or_create_athlete(name="PagedAthleteX", sport="Judo")
+        
+        try:
+            self.assertEqual(count_athletes(prefix="PagedAthlete", sport="Fencing"), 5)
+            
+            first_page, cursor = search_athletes(prefix="PagedAthlete", sport="Fencing", limit=2)
+            self.assertEqual([a["name"] for a in first_page], names[:2])
+            self.assertEqual(cursor, names[1])
+            
+            second_page, cursor = search_athletes(prefix="PagedAthlete", sport="Fencing", after=cursor, limit=2)
+            self.assertEqual([a["name"] for a in second_page], names[2:4])
+            
+            last_page, cursor = search_athletes(prefix="PagedAthlete", sport="Fencing", after=cursor, limit=2)
+            self.assertEqual([a["name"] for a in last_page], names[4:])
+            self.assertIsNone(cursor)
+        finally:
+            for name in names + ["PagedAthleteX"]:
+                delete_athlete(name)
+    
+    def test_iter_athletes(self):
+        """Test that the directory iterator walks every page in name order."""
+        names = [f"IterAthlete{i}" for i in range(5)]
+        for name in names:
+            get_or_create_athlete(name=name)
+        
+        try:
+            iterated = [a["name"] for a in iter_athletes(prefix="IterAthlete", page_size=2)]
+            self.assertEqual(iterated, names)
+        finally:
+            for name in names:
+                delete_athlete(name)
+    
+    def test_count_athletes_cache(self):
+        """Test that athlete counts are cached until athletes change."""
+        before = count_athletes(prefix="CountedAthlete")
+        with mock.patch("utils.database.engine.connect") as connect:
+            self.assertEqual(count_athletes(prefix="CountedAthlete"), before)
+        connect.assert_not_called()
+        
+        get_or_create_athlete(name="CountedAthlete")
+        try:
+            self.assertEqual(count_athletes(prefix="CountedAthlete"), before + 1)
+        finally:
+            delete_athlete("CountedAthlete")
+        self.assertEqual(count_athletes(prefix="CountedAthlete"), before)
+    
+    def test_search_athletes_max_code_point_prefix(self):
+        """Test prefixes ending in the highest code point."""
+        top = chr(0x10FFFF)
+        get_or_create_athlete(name="Edge" + top + "A")
+        get_or_create_athlete(name="Edgf")
+        
+        try:
+            page, _ = search_athletes(prefix="Edge" + top)
+            self.assertEqual([a["name"] for a in page], ["Edge" + top + "A"])
+            self.assertEqual(count_athletes(prefix=top), 0)
+        finally:
+            delete_athlete("Edge" + top + "A")
+            delete_athlete("Edgf")
+    
+    def test_update_metric_stats(self):
+        """Test that stored running stats are updated incrementally."""
+        values = [80.0, 82.0, 85.0, 84.0, 88.0, 90.0]
+        df = pd.DataFrame({
+            "Date": pd.date_range("2023-06-01", periods=len(values)),
+            "Strength": values
+        })
+        
+        update_metric_stats("TestAthlete", df.iloc[:4])
+        summaries = update_metric_stats("TestAthlete", df.iloc[4:])
+        
+        self.assertEqual(summaries["Strength"]["count"], len(values))
+        self.assertAlmostEqual(summaries["Strength"]["mean"], pd.Series(values).mean())
+        self.assertAlmostEqual(summaries["Strength"]["std"], pd.Series(values).std())
+        self.assertEqual(summaries["Strength"]["recent"], 90.0)
+        self.assertEqual(summaries["Strength"]["trend"], "increasing")
+        
+        # Round trip through the database
+        stored = get_metric_summaries("TestAthlete")
+        self.assertEqual(stored["Strength"]["max"], 90.0)
+        self.assertAlmostEqual(stored["Strength"]["slope"], summaries["Strength"]["slope"])
+        self.assertEqual(load_metric_stats("UnknownAthlete"), {})
+    
+    def test_metric_summaries_follow_writes(self):
+        """Test that every write path keeps the stored summaries in step with the history."""
+        values = pd.Series([80.0, 82.0, 85.0, 84.0, 88.0, 90.0])
+        df = pd.DataFrame({"Date": pd.date_range("2023-08-01", periods=6), "Strength": values})
+        
+        def check(expected):
+            summary = get_metric_summaries("TestAthlete")["Strength"]
+            self.assertEqual(summary["count"], len(expected))
+            self.assertAlmostEqual(summary["mean"], expected.mean())
+            self.assertAlmostEqual(summary["std"], expected.std())
+            self.assertEqual(summary["recent"], expected.iloc[-1])
+            slope = pd.Series(range(len(expected)), dtype=float).cov(expected.reset_index(drop=True)) \
+                / pd.Series(range(len(expected)), dtype=float).var()
+            self.assertAlmostEqual(summary["slope"], slope)
+        
+        # Backfilled (older) rows are put in date order
+        store_dataframe("TestAthlete", df.iloc[3:])
+        check(values.iloc[3:])
+        store_dataframe("TestAthlete", df.iloc[:3])
+        check(values)
+        
+        # Re-ingesting the same rows changes nothing
+        before = load_metric_stats("TestAthlete")["Strength"].to_dict()
+        store_dataframe("TestAthlete", df)
+        self.assertEqual(load_metric_stats("TestAthlete")["Strength"].to_dict(), before)
+        
+        # A corrected value replaces the old one
+        df.loc[2, "Strength"] = 95.0
+        store_dataframe("TestAthlete", df)
+        check(df["Strength"])
+        
+        # Single saves and team uploads are folded in too
+        save_performance_data("TestAthlete", "Strength", 91.0, date=datetime.datetime(2023, 8, 7))
+        check(pd.concat([df["Strength"], pd.Series([91.0])]))
+        try:
+            # Large batches go through the grouped batch stats
+            with mock.patch("utils.database.SUMMARY_BATCH_THRESHOLD", 0):
+                store_team_dataframe(pd.DataFrame({
+                    "Athlete": ["TeamSummaryAthlete"] * 3,
+                    "Date": ["2023-08-01", "2023-08-02", "2023-08-03"],
+                    "Speed": [7.0, 7.5, 8.0]
+                }))
+            summary = get_metric_summaries("TeamSummaryAthlete")["Speed"]
+            self.assertEqual(summary["count"], 3)
+            self.assertAlmostEqual(summary["slope"], 0.5)
+        finally:
+            delete_athlete("TeamSummaryAthlete")
+    
+    def test_metric_summaries_rebuilt_for_old_data(self):
+        """Test that history stored without summaries is summarized on first read."""
+        store_dataframe("TestAthlete", pd.DataFrame({
+            "Date": pd.date_range("2023-09-01", periods=4), "Strength": [80.0, 81.0, 83.0, 86.0]
+        }))
+        with session_scope() as session:
+            session.execute(text(
+                "DELETE FROM metric_summaries WHERE athlete_id = (SELECT id FROM athletes WHERE name = 'TestAthlete')"
+            ))
+        self.assertEqual(load_metric_stats("TestAthlete"), {})
+        
+        self.assertEqual(get_metric_summaries("TestAthlete")["Strength"]["count"], 4)
+        self.assertEqual(load_metric_stats("TestAthlete")["Strength"].count, 4)
+    
+    def test_cohort_percentiles(self):
+        """Test that the percentile index follows stored rows."""
+        names = ["CohortAthlete1", "CohortAthlete2", "CohortAthlete3"]
+        df = pd.DataFrame({
+            "Athlete": names * 2,
+            "Date": ["2023-07-01"] * 3 + ["2023-07-02"] * 3,
+            "Team": "Cohort U18",
+            "Speed": [70.0, 80.0, 90.0, 75.0, 85.0, 95.0]
+        })
+        
+        try:
+            store_team_dataframe(df.iloc[:3])
+            get_percentile_index()
+            store_team_dataframe(df.iloc[3:])
+            
+            # Latest values are 75, 85, 95 within the team
+            result = get_cohort_percentiles("CohortAthlete2", cohort="team")["Speed"]
+            self.assertEqual(result["value"], 85.0)
+            self.assertEqual((result["rank"], result["cohort_size"]), (2, 3))
+            self.assertAlmostEqual(result["percentile"], 50.0)
+            
+            store_dataframe("CohortAthlete1", pd.DataFrame({"Date": ["2023-07-03"], "Speed": [99.0]}))
+            self.assertEqual(get_cohort_percentiles("CohortAthlete1", cohort="team")["Speed"]["rank"], 1)
+            
+            delete_athlete("CohortAthlete3")
+            incremental = get_percentile_index().cohort_values("Speed", "team", "Cohort U18")
+            invalidate_percentile_index()
+            rebuilt = get_percentile_index().cohort_values("Speed", "team", "Cohort U18")
+            self.assertEqual(list(incremental), [85.0, 99.0])
+            self.assertEqual(list(rebuilt), list(incremental))
+        finally:
+            for name in names:
+                delete_athlete(name)
+    
     def test_delete_athlete(self):
         """Test deleting an athlete."""
         # Create a temporary athlete
@@ -0,0 +1,140 @@
+import unittest
+import io
+import numpy as np
+import pandas as pd
+import sys
+import os
+import tempfile
+from unittest import mock
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.ingest import stream_performance_csv, validate_schema, read_csv_schema
+
+class TestIngest(unittest.TestCase):
+    """Tests for the ingest module."""
+    
+    def setUp(self):
+        """Set up test data."""
+        rng = np.random.default_rng(0)
+        sessions = 40
+        self.data = pd.DataFrame({
+            'Athlete': np.repeat(['StreamAthlete1', 'StreamAthlete2'], sessions),
+            'Date': np.tile(pd.date_range('2023-01-01', periods=sessions).strftime('%Y-%m-%d'), 2),
+            'Strength': np.round(rng.uniform(60, 100, 2 * sessions), 1),
+            'Speed': np.round(rng.uniform(60, 100, 2 * sessions), 1),
+            'Notes': ''
+        })
+        self.data.loc[3, 'Speed'] = np.nan
+        self.csv = self.data.to_csv(index=False)
+    
+    def test_validate_schema(self):
+        """Test dtype selection and schema errors."""
+        dtypes = validate_schema(['Athlete', 'Date', 'Strength', 'Team'])
+        self.assertEqual(dtypes['Strength'], 'float32')
+        self.assertEqual(dtypes['Team'], 'string')
+        
+        with self.assertRaises(ValueError):
+            validate_schema(['Athlete', 'Strength'])
+        with self.assertRaises(ValueError):
+            validate_schema(['Athlete', 'Date', 'Notes'])
+        
+        # The header read leaves the file where it was
+        source = io.StringIO(self.csv)
+        read_csv_schema(source)
+        self.assertEqual(source.tell(), 0)
+    
+    def test_stream_summaries_match_full_read(self):
+        """Test that chunked summaries match statistics over the whole file."""
+        result = stream_performance_csv(io.StringIO(self.csv), spill=None, chunksize=7)
+        
+        self.assertEqual(result.rows, len(self.data))
+        self.assertEqual(result.athletes, ['StreamAthlete1', 'StreamAthlete2'])
+        self.assertEqual(result.metrics, ['Strength', 'Speed'])
+        
+        athlete_data = self.data[self.data['Athlete'] == 'StreamAthlete1']
+        summary = result.athlete_summary('StreamAthlete1')
+        for metric in ['Strength', 'Speed']:
+            values = athlete_data[metric].dropna().astype(np.float32).astype(float)
+            self.assertEqual(summary[metric]['count'], len(values))
+            self.assertAlmostEqual(summary[metric]['mean'], values.mean(), places=4)
+            self.assertAlmostEqual(summary[metric]['std'], values.std(), places=4)
+            self.assertAlmostEqual(summary[metric]['slope'], np.polyfit(np.arange(len(values)), values, 1)[0], places=6)
+            self.assertEqual(summary[metric]['max'], values.max())
+            self.assertEqual(summary[metric]['recent'], values.iloc[-1])
+            self.assertAlmostEqual(summary[metric]['median'], values.median(), delta=5)
+        
+        self.assertTrue(result.load('StreamAthlete1').empty)
+    
+    def test_stream_rejects_bad_values(self):
+        """Test that non-numeric metric values are reported as schema errors."""
+        csv = "Athlete,Date,Strength\nA,2023-01-01,80\nA,2023-01-02,strong\n"
+        with self.assertRaises(ValueError):
+            stream_performance_csv(io.StringIO(csv), spill=None)
+    
+    def test_spill_errors_are_not_schema_errors(self):
+        """Test that a failing spill is raised as is, keeping the chunks already stored."""
+        stored = []
+        
+        def failing_store(chunk):
+            if stored:
+                raise ValueError("database unavailable")
+            stored.append(len(chunk))
+        
+        with mock.patch('utils.database.store_team_dataframe', side_effect=failing_store):
+            with self.assertRaises(ValueError) as context:
+                stream_performance_csv(io.StringIO(self.csv), spill='database', chunksize=25)
+        
+        self.assertEqual(str(context.exception), "database unavailable")
+        self.assertEqual(stored, [25])
+    
+    def test_stream_spills_to_parquet(self):
+        """Test spilling raw rows to Parquet and discarding the file."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'spill.parquet')
+            result = stream_performance_csv(io.StringIO(self.csv), spill='parquet', path=path, chunksize=25)
+            self.assertEqual(len(result.load('StreamAthlete1')), 40)
+            
+            result.discard()
+            self.assertFalse(os.path.exists(path))
+    
+    def test_stream_spills_to_database(self):
+        """Test spilling raw rows to the database."""
+        from utils.database import delete_athlete
+        
+        try:
+            result = stream_performance_csv(io.StringIO(self.csv), spill='database', chunksize=25)
+            loaded = result.load('StreamAthlete2')
+            self.assertEqual(len(loaded), 40)
+            self.assertIn('Strength', loaded.columns)
+        finally:
+            delete_athlete('StreamAthlete1')
+            delete_athlete('StreamAthlete2')
+    
+    def test_database_load_is_limited_to_the_upload(self):
+        """Test that loading a database spill skips older rows and other metrics."""
+        from utils.database import store_dataframe, delete_athlete
+        
+        try:
+            store_dataframe('StreamAthlete1', pd.DataFrame({
+                'Date': ['2022-06-01', '2022-06-02'], 'Strength': [50.0, 51.0], 'Power': [1.0, 2.0]
+            }))
+            result = stream_performance_csv(io.StringIO(self.csv), spill='database', chunksize=25)
+            loaded = result.load('StreamAthlete1')
+            
+            self.assertEqual(len(loaded), 40)
+            self.assertEqual(loaded['Date'].min(), pd.Timestamp('2023-01-01'))
+            self.assertNotIn('Power', loaded.columns)
+            self.assertTrue(result.load('UnknownAthlete').empty)
+            
+            # Undated rows are stored at ingest time and still load back
+            undated = 'Athlete,Date,Strength\nStreamAthlete1,,70\nStreamAthlete1,2023-03-01,71\n'
+            result = stream_performance_csv(io.StringIO(undated), spill='database')
+            self.assertEqual(sorted(result.load('StreamAthlete1')['Strength']), [70.0, 71.0])
+        finally:
+            delete_athlete('StreamAthlete1')
+            delete_athlete('StreamAthlete2')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.metric_stats import (
+    StreamingQuantile,
+    RunningMetricStats,
+    MetricStatsStore
+)
+
+class TestMetricStats(unittest.TestCase):
+    """Tests for the metric_stats module."""
+    
+    def setUp(self):
+        """Set up test data."""
+        rng = np.random.default_rng(0)
+        self.values = rng.normal(70, 10, size=2000)
+    
+    def test_running_stats_match_batch(self):
+        """Test running stats against the batch computations."""
+        stats = RunningMetricStats()
+        for value in self.values:
+            stats.update(value)
+        
+        self.assertEqual(stats.count, len(self.values))
+        self.assertAlmostEqual(stats.mean, self.values.mean())
+        self.assertAlmostEqual(stats.std, self.values.std(ddof=1))
+        self.assertEqual(stats.min, self.values.min())
+        self.assertEqual(stats.max, self.values.max())
+        self.assertEqual(stats.recent, self.values[-1])
+        self.assertAlmostEqual(stats.slope, np.polyfit(np.arange(len(self.values)), self.values, 1)[0])
+    
+    def test_missing_values_are_ignored(self):
+        """Test that None and NaN do not change the stats."""
+        stats = RunningMetricStats()
+        for value in [1.0, None, np.nan, 3.0]:
+            stats.update(value)
+        
+        self.assertEqual(stats.count, 2)
+        self.assertEqual(stats.mean, 2.0)
+        self.assertEqual(stats.trend(), 'increasing')
+        self.assertEqual(RunningMetricStats().trend(), 'insufficient_data')
+    
+    def test_streaming_median(self):
+        """Test the P-squared median estimate."""
+        estimator = StreamingQuantile()
+        for value in [5, 1, 3]:
+            estimator.update(value)
+        self.assertEqual(estimator.value(), 3)
+        
+        for value in self.values:
+            estimator.update(value)
+        self.assertAlmostEqual(estimator.value(), np.median(self.values), delta=0.5)
+        self.assertTrue(np.isnan(StreamingQuantile().value()))
+    
+    def test_round_trip(self):
+        """Test that saved state resumes identically."""
+        stats = RunningMetricStats()
+        for value in self.values[:1000]:
+            stats.update(value)
+        restored = RunningMetricStats.from_dict(stats.to_dict())
+        
+        for value in self.values[1000:]:
+            stats.update(value)
+            restored.update(value)
+        
+        self.assertEqual(restored.summary(), stats.summary())
+    
+    def test_merge(self):
+        """Test that merging batch stats matches sequential updates."""
+        merged = RunningMetricStats()
+        sequential = RunningMetricStats()
+        for start, stop in [(0, 3), (3, 700), (700, 1500), (1500, 2000)]:
+            batch = RunningMetricStats()
+            for value in self.values[start:stop]:
+                batch.update(value)
+                sequential.update(value)
+            merged.merge(batch)
+        
+        self.assertEqual(merged.count, sequential.count)
+        self.assertAlmostEqual(merged.mean, sequential.mean)
+        self.assertAlmostEqual(merged.std, sequential.std)
+        self.assertAlmostEqual(merged.slope, sequential.slope)
+        self.assertEqual(merged.recent, sequential.recent)
+        self.assertAlmostEqual(merged.median, np.median(self.values), delta=1.0)
+    
+    def test_store_update_from_dataframe(self):
+        """Test per-athlete summaries from a wide DataFrame."""
+        df = pd.DataFrame({
+            'Athlete': ['A', 'B', 'A', 'B'],
+            'Date': ['2023-01-02', '2023-01-01', '2023-01-01', '2023-01-02'],
+            'Strength': [82, 75, 80, np.nan]
+        })
+        store = MetricStatsStore()
+        
+        self.assertEqual(store.update_from_dataframe(df), 3)
+        summary = store.athlete_summary('A')['Strength']
+        self.assertEqual(summary['recent'], 82)
+        self.assertEqual(summary['trend'], 'increasing')
+        self.assertEqual(store.get('B', 'Strength').count, 1)
+        self.assertEqual(len(store.to_frame()), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.percentile_index import CohortPercentileIndex
+from utils.performance_frame import PerformanceFrame
+
+class TestPercentileIndex(unittest.TestCase):
+    """Tests for the percentile_index module."""
+    
+    def setUp(self):
+        """Set up test data for a squad of athletes."""
+        rng = np.random.default_rng(0)
+        rows = 240
+        athletes = [f"Athlete{i % 40}" for i in range(rows)]
+        self.data = pd.DataFrame({
+            'Athlete': athletes,
+            'Date': pd.date_range('2024-01-01', periods=rows),
+            'Sport': [['Sprint', 'Jump'][i % 40 % 2] for i in range(rows)],
+            'Team': [['U18', 'U20', 'Senior'][i % 40 % 3] for i in range(rows)],
+            'Speed': rng.integers(60, 80, rows).astype(float),
+            'Power': rng.uniform(100, 200, rows)
+        })
+        self.latest = self.data.groupby('Athlete').last()
+    
+    def test_matches_brute_force_ranking(self):
+        """Test rank and percentile against a sort of each cohort."""
+        index = CohortPercentileIndex.from_dataframe(PerformanceFrame(self.data))
+        
+        for athlete in ['Athlete0', 'Athlete7', 'Athlete13']:
+            team = self.latest.loc[athlete, 'Team']
+            cohort = self.latest.loc[self.latest['Team'] == team, 'Speed']
+            value = self.latest.loc[athlete, 'Speed']
+            
+            result = index.percentile(athlete, 'Speed', cohort='team')
+            self.assertEqual(result['group'], team)
+            self.assertEqual(result['cohort_size'], len(cohort))
+            self.assertEqual(result['rank'], int((cohort > value).sum()) + 1)
+            self.assertAlmostEqual(result['percentile'],
+                                   100 * ((cohort < value).sum() + 0.5 * (cohort == value).sum()) / len(cohort))
+            
+            lower = index.percentile(athlete, 'Speed', cohort='team', higher_is_better=False)
+            self.assertEqual(lower['rank'], int((cohort < value).sum()) + 1)
+        
+        self.assertEqual(len(index.athlete_percentiles('Athlete0', cohort='sport')), 2)
+        self.assertIsNone(index.percentile('Unknown', 'Speed'))
+        with self.assertRaises(ValueError):
+            index.cohort_values('Speed', cohort='age')
+    
+    def test_incremental_updates_match_rebuild(self):
+        """Test batches, cohort moves and removals against a full rebuild."""
+        index = CohortPercentileIndex()
+        for start in range(0, len(self.data), 35):
+            index.update_from_dataframe(self.data.iloc[start:start + 35])
+        
+        # Athlete3 moves team with a new value; an older row must not replace it
+        moved = pd.DataFrame({
+            'Athlete': ['Athlete3', 'Athlete3'],
+            'Date': ['2025-01-02', '2023-01-01'],
+            'Team': ['U18', 'U18'],
+            'Speed': [61.0, 99.0]
+        })
+        index.update_from_dataframe(moved)
+        index.remove_athlete('Athlete5')
+        
+        expected = self.data.copy()
+        expected.loc[expected['Athlete'] == 'Athlete3', 'Team'] = 'U18'
+        expected = pd.concat([expected, moved.assign(Sport='Jump')])
+        rebuilt = CohortPercentileIndex.from_dataframe(expected[expected['Athlete'] != 'Athlete5'])
+        
+        self.assertEqual(set(index._arrays), set(rebuilt._arrays))
+        for key, values in rebuilt._arrays.items():
+            np.testing.assert_array_equal(index._arrays[key], values)
+        self.assertEqual(index.percentile('Athlete3', 'Speed', cohort='team')['value'], 61.0)
+
+if __name__ == '__main__':
+    unittest.main()
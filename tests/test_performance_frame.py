@@ -0,0 +1,97 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.performance_frame import PerformanceFrame, as_performance_frame, athlete_rows
+from utils.data_processor import process_performance_data, extract_key_metrics, process_all_athletes
+from utils.visualization import create_performance_radar, plot_trend_analysis, plot_comparison
+
+class TestPerformanceFrame(unittest.TestCase):
+    """Tests for the performance_frame module."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.sample_data = pd.DataFrame({
+            'Athlete': ['Athlete2', 'Athlete1', 'Athlete1', 'Athlete2', 'Athlete1'],
+            'Date': ['2023-01-05', '2023-01-03', '2023-01-01', '2023-01-04', '2023-01-02'],
+            'Strength': [78, 85, 80, 75, 82],
+            'Speed': [87, 92, 90, 88, 89],
+            'Notes': ['', '', 'Tired', '', '']
+        })
+        self.frame = PerformanceFrame(self.sample_data)
+    
+    def test_normalized_types(self):
+        """Test column types and metric detection."""
+        data = self.frame.data
+        
+        self.assertIsInstance(data['Athlete'].dtype, pd.CategoricalDtype)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(data['Date']))
+        self.assertEqual(self.frame.metrics, ['Strength', 'Speed'])
+        self.assertEqual(data['Strength'].dtype, np.float32)
+        self.assertEqual(self.frame.athletes, ['Athlete1', 'Athlete2'])
+        self.assertEqual(len(self.frame), 5)
+    
+    def test_athlete_slices(self):
+        """Test per-athlete access in date order."""
+        athlete_data = self.frame.athlete('Athlete1')
+        
+        self.assertEqual(athlete_data['Strength'].tolist(), [80, 82, 85])
+        self.assertTrue(athlete_data['Date'].is_monotonic_increasing)
+        self.assertTrue(self.frame.athlete('Unknown').empty)
+        self.assertIn('Athlete2', self.frame)
+        
+        # Plain DataFrames go through the same helper
+        legacy = athlete_rows(self.sample_data, 'Athlete1')
+        self.assertEqual(legacy['Strength'].tolist(), [80, 82, 85])
+        self.assertIs(as_performance_frame(self.frame), self.frame)
+    
+    def test_database_layout(self):
+        """Test data with a lower-case date column and no Athlete column."""
+        db_data = pd.DataFrame({'date': ['2023-01-02', '2023-01-01'], 'Strength': [82.0, 80.0]})
+        
+        frame = PerformanceFrame(db_data, athlete='Athlete1')
+        self.assertEqual(frame.athlete('Athlete1')['Strength'].tolist(), [80, 82])
+        with self.assertRaises(ValueError):
+            PerformanceFrame(db_data)
+    
+    def test_analysis_functions_accept_frame(self):
+        """Test that analysis and plotting functions give the same results for frames."""
+        from_frame = process_performance_data(self.frame, 'Athlete1')
+        from_data = process_performance_data(self.sample_data, 'Athlete1')
+        
+        self.assertEqual(from_frame['metrics'].keys(), from_data['metrics'].keys())
+        self.assertAlmostEqual(from_frame['metrics']['Strength']['mean'], from_data['metrics']['Strength']['mean'], places=5)
+        self.assertEqual(from_frame['metrics']['Speed']['trend'], from_data['metrics']['Speed']['trend'])
+        self.assertEqual(extract_key_metrics(self.frame, 'Athlete1')['Strength'], 85)
+        self.assertEqual(len(process_all_athletes(self.frame)), 4)
+        
+        import matplotlib.pyplot as plt
+        for fig in (create_performance_radar(self.frame, 'Athlete1'),
+                    plot_trend_analysis(self.frame, 'Athlete1', 'Strength'),
+                    plot_comparison(self.frame, 'Athlete1', 'Athlete2')):
+            self.assertIsNotNone(fig)
+            plt.close(fig)
+    
+    def test_sport_and_team_are_not_metrics(self):
+        """Test analyses of data with Sport and Team columns, as used by cohorts."""
+        data = self.sample_data.assign(Sport='Rugby', Team='Firsts')
+        
+        import matplotlib.pyplot as plt
+        for source in (data, PerformanceFrame(data)):
+            results = process_performance_data(source, 'Athlete1')
+            self.assertEqual(list(results['metrics']), ['Strength', 'Speed'])
+            self.assertEqual(list(extract_key_metrics(source, 'Athlete1')), ['Strength', 'Speed'])
+            self.assertEqual(set(process_all_athletes(source)['metric']), {'Strength', 'Speed'})
+            
+            for fig in (create_performance_radar(source, 'Athlete1'),
+                        plot_comparison(source, 'Athlete1', 'Athlete2')):
+                self.assertEqual(len(fig.axes[0].get_xticks()), 2)
+                plt.close(fig)
+
+if __name__ == '__main__':
+    unittest.main()
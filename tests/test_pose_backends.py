@@ -0,0 +1,179 @@
+import unittest
+from unittest import mock
+import numpy as np
+import cv2
+import sys
+import os
+import tempfile
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import pose_backends
+from utils.pose_backends import (
+    HeuristicPoseBackend, OpenCVPoseBackend, create_pose_backend, get_pose_backend,
+    set_pose_backend, parse_input_size
+)
+from utils.pose_sequence import JOINTS
+from utils.image_analyzer import analyze_form, detect_pose
+
+class FakeNet:
+    """Stand-in for a heatmap model: every channel is the downscaled frame."""
+
+    def __init__(self, map_size=(46, 46)):
+        self.map_size = map_size
+        self.batches = []
+
+    def setPreferableBackend(self, backend):
+        pass
+
+    def setPreferableTarget(self, target):
+        pass
+
+    def setInput(self, blob):
+        self.blob = blob
+
+    def forward(self):
+        self.batches.append(len(self.blob))
+        map_height, map_width = self.map_size
+        # The brightest cell of each frame becomes the peak of every joint
+        heatmaps = np.zeros((len(self.blob), 18, map_height, map_width), dtype=np.float32)
+        for i, image in enumerate(self.blob):
+            small = cv2.resize(image.mean(axis=0), (map_width, map_height), interpolation=cv2.INTER_AREA)
+            heatmaps[i] = small
+        return heatmaps
+
+def spot_frame(width, height, x, y):
+    """Black frame with a white square centred at (x, y)."""
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    frame[max(y - 8, 0):y + 8, max(x - 8, 0):x + 8] = 255
+    return frame
+
+class TestPoseBackends(unittest.TestCase):
+    """Tests for the pose_backends module."""
+
+    def setUp(self):
+        """Set up a dummy model file and a clean backend cache."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.model_path = os.path.join(self.tmp_dir.name, 'pose.onnx')
+        open(self.model_path, 'wb').close()
+        pose_backends._net_cache.clear()
+        set_pose_backend(None)
+
+    def tearDown(self):
+        """Remove the dummy model and restore the backend."""
+        pose_backends._net_cache.clear()
+        set_pose_backend(None)
+        self.tmp_dir.cleanup()
+
+    def test_heuristic_still_layout(self):
+        """Test that photos get the fixed demo layout in JOINTS order."""
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        keypoints = HeuristicPoseBackend().detect(frame, still=True)
+
+        self.assertEqual(list(keypoints), list(JOINTS))
+        self.assertEqual(keypoints['head'], (160, 48))
+        self.assertEqual(keypoints['right_knee'], (120, 200))
+        self.assertEqual(keypoints['left_ankle'], (213, 210))
+
+        # Video frames move a few pixels around the same layout
+        moved = HeuristicPoseBackend().detect(frame)
+        for name in JOINTS:
+            self.assertLessEqual(abs(moved[name][0] - keypoints[name][0]), 10)
+            self.assertLessEqual(abs(moved[name][1] - keypoints[name][1]), 8)
+
+    def test_backends_must_implement_estimate(self):
+        """Test that a backend without estimate cannot be created."""
+        class IncompleteBackend(pose_backends.PoseBackend):
+            name = 'incomplete'
+
+        with self.assertRaises(TypeError):
+            IncompleteBackend()
+
+    def test_parse_input_size(self):
+        """Test network input size parsing."""
+        self.assertEqual(parse_input_size('368'), (368, 368))
+        self.assertEqual(parse_input_size('456x256'), (456, 256))
+        self.assertEqual(parse_input_size(224), (224, 224))
+        self.assertEqual(parse_input_size((320, 240)), (320, 240))
+
+    def test_opencv_backend_batches(self):
+        """Test heatmap decoding of a batch of frames with different sizes."""
+        net = FakeNet()
+        with mock.patch('cv2.dnn.readNet', return_value=net):
+            backend = OpenCVPoseBackend(self.model_path, input_size=184, batch_size=2)
+
+        frames = [
+            spot_frame(320, 240, 80, 60),
+            spot_frame(320, 240, 240, 180),
+            spot_frame(640, 480, 320, 120),
+            np.zeros((240, 320, 3), dtype=np.uint8)
+        ]
+        keypoints, confidence = backend.estimate(frames)
+
+        self.assertEqual(keypoints.shape, (4, len(JOINTS), 2))
+        self.assertEqual(net.batches, [2, 2])
+        np.testing.assert_allclose(keypoints[0, 0], (80, 60), atol=8)
+        np.testing.assert_allclose(keypoints[1, 5], (240, 180), atol=8)
+        np.testing.assert_allclose(keypoints[2, 13], (320, 120), atol=16)
+        self.assertTrue((confidence[:3] > 0.1).all())
+
+        # A blank frame has no peak above the threshold
+        self.assertTrue(np.isnan(keypoints[3]).all())
+        self.assertEqual(backend.detect(frames[3]), {})
+        self.assertEqual(len(backend.detect_batch(frames[:2])), 2)
+        
+        # The batch entry point for video keeps the scores
+        batch_keypoints, batch_confidence = backend.estimate_batch(frames[:2])
+        np.testing.assert_allclose(batch_keypoints, keypoints[:2])
+        np.testing.assert_allclose(batch_confidence, confidence[:2])
+        empty_keypoints, empty_confidence = backend.estimate_batch([])
+        self.assertEqual(empty_keypoints.shape, (0, len(JOINTS), 2))
+        self.assertEqual(empty_confidence.shape, (0, len(JOINTS)))
+
+    def test_model_loaded_once(self):
+        """Test that backends share one network per model file."""
+        with mock.patch('cv2.dnn.readNet', side_effect=lambda *args: FakeNet()) as read_net:
+            first = OpenCVPoseBackend(self.model_path)
+            second = OpenCVPoseBackend(self.model_path, input_size='256x192')
+
+        self.assertEqual(read_net.call_count, 1)
+        self.assertIs(first._net, second._net)
+        self.assertEqual(second.input_size, (256, 192))
+
+    def test_fallback_and_selection(self):
+        """Test backend selection from names and the heuristic fallback."""
+        missing = os.path.join(self.tmp_dir.name, 'missing.onnx')
+        with mock.patch.object(pose_backends, 'POSE_MODEL_PATH', missing):
+            self.assertIsInstance(create_pose_backend('auto'), HeuristicPoseBackend)
+            self.assertIsInstance(create_pose_backend('opencv'), HeuristicPoseBackend)
+            with self.assertRaises(FileNotFoundError):
+                OpenCVPoseBackend()
+
+        with mock.patch.object(pose_backends, 'POSE_MODEL_PATH', self.model_path), \
+                mock.patch('cv2.dnn.readNet', return_value=FakeNet()):
+            self.assertIsInstance(create_pose_backend('auto'), OpenCVPoseBackend)
+            self.assertIsInstance(create_pose_backend('heuristic'), HeuristicPoseBackend)
+
+        with self.assertRaises(ValueError):
+            create_pose_backend('movenet')
+
+    def test_detect_pose_uses_backend(self):
+        """Test that detect_pose and analyze_form use the configured backend."""
+        net = FakeNet()
+        with mock.patch('cv2.dnn.readNet', return_value=net):
+            set_pose_backend(OpenCVPoseBackend(self.model_path, input_size=184))
+        self.assertIsInstance(get_pose_backend(), OpenCVPoseBackend)
+
+        keypoints = detect_pose(spot_frame(320, 240, 160, 120))
+        self.assertEqual(len(keypoints), len(JOINTS))
+        self.assertEqual(net.batches, [1])
+
+        # Missing joints are left out of the drawing and the analysis
+        self.assertEqual(detect_pose(np.zeros((240, 320, 3), dtype=np.uint8)), {})
+        analysis, annotated = analyze_form(np.zeros((240, 320, 3), dtype=np.uint8))
+        self.assertEqual(annotated.shape, (240, 320, 3))
+        self.assertIsInstance(analysis, dict)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.pose_geometry import (
+    angles_from_points, joint_angles, segment_lengths, segment_vertical_angles, symmetry_index
+)
+from utils.pose_sequence import PoseSequence, JOINT_ANGLES, SEGMENTS, analyze_pose_geometry
+
+def scalar_angle(a, b, c):
+    """Reference: the original one-triplet calculate_angle."""
+    ba = np.array(a, dtype=float) - np.array(b, dtype=float)
+    bc = np.array(c, dtype=float) - np.array(b, dtype=float)
+    cosine = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc))
+    return np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+
+class TestPoseGeometry(unittest.TestCase):
+    """Tests for the pose_geometry module."""
+    
+    def setUp(self):
+        """Set up random keypoints."""
+        rng = np.random.default_rng(0)
+        self.keypoints = rng.uniform(0, 500, size=(50, 14, 2))
+        self.triplets = np.array([[8, 10, 12], [9, 11, 13], [2, 4, 6]])
+    
+    def test_matches_scalar_angles(self):
+        """Test batched angles against one scalar calculation per triplet."""
+        angles = joint_angles(self.keypoints, self.triplets)
+        self.assertEqual(angles.shape, (50, 3))
+        for frame in range(50):
+            for t, (a, b, c) in enumerate(self.triplets):
+                expected = scalar_angle(self.keypoints[frame, a], self.keypoints[frame, b], self.keypoints[frame, c])
+                self.assertAlmostEqual(angles[frame, t], expected, places=6)
+        
+        self.assertAlmostEqual(float(angles_from_points((0, 0), (0, 1), (1, 1))), 90.0)
+    
+    def test_vertical_angles_and_lengths(self):
+        """Test segment angles from vertical and segment lengths."""
+        points = np.array([[[0, 0], [0, 10], [10, 10], [3, 14]]], dtype=float)
+        segments = [[0, 1], [1, 2], [1, 3]]
+        np.testing.assert_allclose(segment_vertical_angles(points, segments), [[0.0, 90.0, np.degrees(np.arctan2(3, 4))]])
+        np.testing.assert_allclose(segment_lengths(points, segments), [[10.0, 10.0, 5.0]])
+    
+    def test_missing_joints_and_symmetry(self):
+        """Test NaN propagation, degenerate angles and the symmetry index."""
+        keypoints = self.keypoints.copy()
+        keypoints[3, 10] = np.nan
+        keypoints[4, 8] = keypoints[4, 10]
+        with np.errstate(all='raise'):
+            angles = joint_angles(keypoints, self.triplets)
+        self.assertTrue(np.isnan(angles[3, 0]) and np.isnan(angles[4, 0]))
+        self.assertFalse(np.isnan(angles[3, 1]))
+        
+        np.testing.assert_allclose(symmetry_index([100, 90, 0, np.nan], [100, 110, 0, 5]), [0.0, 20.0, np.nan, np.nan])
+    
+    def test_pose_sequence_geometry(self):
+        """Test the named geometry table of a PoseSequence."""
+        geometry = analyze_pose_geometry(PoseSequence(self.keypoints))
+        self.assertEqual(len(geometry), 50)
+        self.assertEqual(len([c for c in geometry.columns if c.endswith('_symmetry')]),
+                         (len(JOINT_ANGLES) + len(SEGMENTS)) // 2)
+        np.testing.assert_allclose(
+            geometry['knee_angle_symmetry'],
+            symmetry_index(geometry['left_knee_angle'], geometry['right_knee_angle'])
+        )
+        self.assertAlmostEqual(geometry['right_knee_angle'][0],
+                               scalar_angle(*self.keypoints[0, [8, 10, 12]]), places=3)
+
+if __name__ == '__main__':
+    unittest.main()
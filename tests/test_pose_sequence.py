@@ -0,0 +1,77 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.image_analyzer import analyze_keypoints, detect_pose
+from utils.pose_sequence import (
+    PoseSequence, JOINTS, analyze_pose_sequence, summarize_pose_analysis
+)
+from utils.recommendation_engine import generate_recommendations
+
+class TestPoseSequence(unittest.TestCase):
+    """Tests for the pose_sequence module."""
+    
+    def setUp(self):
+        """Set up detected poses with some badly aligned frames."""
+        np.random.seed(0)
+        self.image_shape = (240, 320, 3)
+        frame = np.zeros(self.image_shape, dtype=np.uint8)
+        self.poses = [detect_pose(frame) for _ in range(40)]
+        for pose in self.poses[::5]:
+            # Lean the trunk and drop one shoulder and hip
+            pose['neck'] = (pose['neck'][0] + 40, pose['neck'][1])
+            pose['right_shoulder'] = (pose['right_shoulder'][0], pose['right_shoulder'][1] + 30)
+            pose['left_hip'] = (pose['left_hip'][0], pose['left_hip'][1] + 20)
+            pose['right_ankle'] = (pose['right_ankle'][0] + 60, pose['right_ankle'][1])
+        self.sequence = PoseSequence.from_keypoints(self.poses, timestamps=np.arange(40) / 10,
+                                                    image_shape=self.image_shape)
+    
+    def test_layout(self):
+        """Test array shapes, joint order and missing joints."""
+        self.assertEqual(self.sequence.keypoints.shape, (40, 14, 2))
+        self.assertEqual(self.sequence.keypoints.dtype, np.float32)
+        self.assertEqual(self.sequence.frame_keypoints(3), {k: (float(x), float(y)) for k, (x, y) in self.poses[3].items()})
+        np.testing.assert_array_equal(self.sequence.joint('neck')[0], self.poses[0]['neck'])
+        
+        partial = PoseSequence.from_keypoints([{'head': (1, 2)}, {}])
+        self.assertEqual(partial.confidence[0, JOINTS.index('head')], 1.0)
+        self.assertEqual(partial.confidence.sum(), 1.0)
+        self.assertTrue(np.isnan(partial.keypoints[1]).all())
+    
+    def test_matches_analyze_keypoints(self):
+        """Test that every frame gets the same verdicts and angles as analyze_keypoints."""
+        metrics = analyze_pose_sequence(self.sequence)
+        
+        for frame, pose in enumerate(self.poses):
+            expected = analyze_keypoints(pose, self.image_shape)
+            row = metrics.iloc[frame]
+            
+            self.assertEqual(expected["Posture"][0] == "Good vertical spine alignment", row['spine_vertical'])
+            if not row['spine_vertical']:
+                self.assertIn(f"{row['spine_angle']:.1f}°", expected["Posture"][0])
+            self.assertEqual(expected["Alignment"][0] == "Good shoulder alignment", row['shoulders_level'])
+            self.assertEqual(expected["Alignment"][1] == "Good hip alignment", row['hips_level'])
+            self.assertEqual(expected["Balance"][0] == "Good knee alignment over ankles", row['knees_over_ankles'])
+            self.assertEqual(expected["Joint Angles"][0], f"Right knee angle: {row['right_knee_angle']:.1f}°")
+            self.assertEqual(expected["Joint Angles"][1], f"Left knee angle: {row['left_knee_angle']:.1f}°")
+        
+        self.assertFalse(metrics['spine_vertical'].all())
+    
+    def test_summary(self):
+        """Test clip-level insights and missing poses."""
+        summary = summarize_pose_analysis(analyze_pose_sequence(self.sequence))
+        self.assertEqual(set(summary), {"Posture", "Alignment", "Balance", "Joint Angles", "Movement Pattern"})
+        self.assertIn("80% of frames", summary["Posture"][0])
+        self.assertTrue(generate_recommendations(form_analysis=summary))
+        
+        empty = PoseSequence.from_keypoints([{}, {}], image_shape=self.image_shape)
+        self.assertIn("No pose detected", summarize_pose_analysis(analyze_pose_sequence(empty))["Posture"][0])
+        with self.assertRaises(ValueError):
+            analyze_pose_sequence(PoseSequence.from_keypoints(self.poses))
+
+if __name__ == '__main__':
+    unittest.main()
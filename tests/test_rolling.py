@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.rolling import compute_rolling_metrics, RollingWorkload
+
+class TestRolling(unittest.TestCase):
+    """Tests for the rolling module."""
+    
+    def setUp(self):
+        """Set up test data with missing days."""
+        rng = np.random.default_rng(0)
+        days = pd.date_range('2024-01-01', periods=60)
+        self.data = pd.DataFrame({
+            'Athlete': np.tile(['Athlete1', 'Athlete2'], len(days)),
+            'Date': np.repeat(days, 2),
+            'Load': rng.uniform(100, 500, 2 * len(days)),
+            'Speed': rng.uniform(60, 100, 2 * len(days))
+        }).drop(index=[5, 6, 7, 40] + list(range(90, 100)))
+    
+    def test_matches_pandas_reference(self):
+        """Test windows and EWMAs against pandas rolling/ewm on a daily series."""
+        results, _ = compute_rolling_metrics(self.data)
+        last = results[(results['athlete'] == 'Athlete1') & (results['metric'] == 'Load')].iloc[-1]
+        
+        series = self.data[self.data['Athlete'] == 'Athlete1'].set_index('Date')['Load'].asfreq('D')
+        acute = series.rolling(7, min_periods=1).mean()
+        acute_ewma = series.ewm(alpha=2 / 8, adjust=False, ignore_na=True).mean().iloc[-1]
+        chronic_ewma = series.ewm(alpha=2 / 29, adjust=False, ignore_na=True).mean().iloc[-1]
+        
+        self.assertAlmostEqual(last['acute_mean'], acute.iloc[-1])
+        self.assertAlmostEqual(last['chronic_mean'], series.rolling(28, min_periods=1).mean().iloc[-1])
+        self.assertAlmostEqual(last['wow_delta'], acute.iloc[-1] - acute.iloc[-8])
+        self.assertAlmostEqual(last['acute_ewma'], acute_ewma)
+        self.assertAlmostEqual(last['acwr'], acute_ewma / chronic_ewma)
+    
+    def test_incremental_update_matches_batch(self):
+        """Test that daily updates reproduce the batch results."""
+        full, _ = compute_rolling_metrics(self.data)
+        _, workload = compute_rolling_metrics(self.data[self.data['Date'] < '2024-02-10'])
+        
+        for day in sorted(self.data.loc[self.data['Date'] >= '2024-02-10', 'Date'].unique()):
+            latest = workload.update(self.data[self.data['Date'] == day])
+        
+        expected = full[full['date'] == full['date'].max()].reset_index(drop=True)
+        pd.testing.assert_frame_equal(latest, expected, check_dtype=False)
+        
+        summary = workload.athlete_summary('Athlete2')
+        self.assertEqual(set(summary), {'Load', 'Speed'})
+        self.assertIn('acwr', summary['Load'])
+    
+    def test_update_validation_and_new_athletes(self):
+        """Test day ordering checks and athletes added by updates."""
+        workload = RollingWorkload(['Athlete1'], ['Load'])
+        workload.update(pd.DataFrame({'Athlete': ['Athlete1'], 'Date': ['2024-01-01'], 'Load': [100.0]}))
+        latest = workload.update(pd.DataFrame({'Athlete': ['Athlete3'], 'Date': ['2024-01-03'], 'Load': [300.0]}))
+        
+        self.assertEqual(sorted(latest['athlete']), ['Athlete1', 'Athlete3'])
+        with self.assertRaises(ValueError):
+            workload.update(pd.DataFrame({'Athlete': ['Athlete1'], 'Date': ['2024-01-02'], 'Load': [1.0]}))
+        with self.assertRaises(ValueError):
+            RollingWorkload([], [], acute=30, chronic=28)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.trend import (
+    slopes_from_sums,
+    batch_trend_slopes,
+    classify_trends,
+    batch_trends,
+    series_trend
+)
+
+class TestTrend(unittest.TestCase):
+    """Tests for the trend module."""
+    
+    def setUp(self):
+        """Set up test data."""
+        rng = np.random.default_rng(0)
+        self.values = rng.uniform(50, 100, size=(200, 30))
+    
+    def test_batch_trend_slopes_matches_polyfit(self):
+        """Test that batch slopes match a per-series polyfit."""
+        slopes, counts, means = batch_trend_slopes(self.values)
+        
+        x = np.arange(self.values.shape[1])
+        expected = np.array([np.polyfit(x, row, 1)[0] for row in self.values])
+        np.testing.assert_allclose(slopes, expected, rtol=1e-9, atol=1e-12)
+        np.testing.assert_array_equal(counts, np.full(len(self.values), self.values.shape[1]))
+        np.testing.assert_allclose(means, self.values.mean(axis=1))
+    
+    def test_batch_trend_slopes_skips_missing(self):
+        """Test that missing values are skipped and keep their time positions."""
+        values = np.array([
+            [80, 82, np.nan, 87, 90],
+            [np.nan, np.nan, np.nan, 5, np.nan],
+            [np.nan] * 5
+        ])
+        slopes, counts, _ = batch_trend_slopes(values)
+        
+        expected = np.polyfit([0, 1, 3, 4], [80, 82, 87, 90], 1)[0]
+        self.assertAlmostEqual(slopes[0], expected)
+        self.assertTrue(np.isnan(slopes[1]))
+        self.assertTrue(np.isnan(slopes[2]))
+        np.testing.assert_array_equal(counts, [4, 1, 0])
+    
+    def test_slopes_from_sums(self):
+        """Test the closed-form slope from raw sums."""
+        x = np.arange(5, dtype=float)
+        y = 3 * x + 2
+        slope = slopes_from_sums([5, 1], [x.sum(), 0], [y.sum(), 2], [(x * y).sum(), 0], [(x * x).sum(), 0])
+        
+        self.assertAlmostEqual(slope[0], 3.0)
+        self.assertTrue(np.isnan(slope[1]))
+    
+    def test_classify_trends(self):
+        """Test trend labels and the minimum point threshold."""
+        labels = classify_trends([2.0, -2.0, 0.1, 2.0], [50, 50, 50, 50], [5, 5, 5, 2], min_points=3)
+        
+        self.assertEqual(list(labels), ['increasing', 'decreasing', 'stable', 'insufficient_data'])
+    
+    def test_batch_trends_and_series_trend(self):
+        """Test the combined helpers."""
+        _, labels = batch_trends([[1, 2, 3, 4], [4, 3, 2, 1]])
+        
+        self.assertEqual(list(labels), ['increasing', 'decreasing'])
+        self.assertEqual(series_trend([80, 82, np.nan, 87, 90], min_points=3), 'increasing')
+        self.assertEqual(series_trend([80], min_points=2), 'insufficient_data')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+import numpy as np
+import cv2
+import sys
+import os
+import time
+import tempfile
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.video_pipeline import VideoAnalysisPipeline
+from utils.video_source import VideoFrame, VideoFrameSource
+from utils.pose_sequence import PoseSequence, JOINTS, JOINT_INDEX
+
+def brightness_pose(image):
+    """Deterministic stand-in for detect_pose with uneven run times."""
+    level = int(image[0, 0, 0])
+    time.sleep(0.001 * (level % 3))
+    return {'neck': (level, 10), 'right_hip': (level, 50), 'left_hip': (level + 2, 50)}
+
+class TestVideoPipeline(unittest.TestCase):
+    """Tests for the video_pipeline module."""
+    
+    def setUp(self):
+        """Set up synthetic frames."""
+        self.frames = [
+            VideoFrame(index, index / 30, np.full((48, 64, 3), index, dtype=np.uint8))
+            for index in range(60)
+        ]
+    
+    def test_results_are_ordered(self):
+        """Test that parallel workers return frames in clip order."""
+        seen = []
+        pipeline = VideoAnalysisPipeline(workers=4, queue_size=3, pose_fn=brightness_pose, analyze_fn=None)
+        result = pipeline.run(self.frames, on_result=lambda frame: seen.append(frame.index))
+        
+        self.assertEqual(seen, list(range(60)))
+        self.assertEqual([frame.index for frame in result.frames], list(range(60)))
+        self.assertEqual(result.keypoints, [brightness_pose(frame.image) for frame in self.frames])
+        self.assertEqual(result.stats['pose']['frames'], 60)
+        self.assertEqual(result.stats['total']['frames'], 60)
+        self.assertGreater(result.stats['decode']['fps'], 0)
+    
+    def test_batched_pose(self):
+        """Test that batches are passed to pose_batch_fn and results stay ordered."""
+        batch_sizes = []
+        
+        def batch_pose(images):
+            batch_sizes.append(len(images))
+            return [brightness_pose(image) for image in images]
+        
+        pipeline = VideoAnalysisPipeline(workers=3, queue_size=4, pose_batch_fn=batch_pose, batch_size=8, analyze_fn=None)
+        result = pipeline.run(self.frames)
+        
+        self.assertEqual([frame.index for frame in result.frames], list(range(60)))
+        self.assertEqual(result.keypoints, [brightness_pose(frame.image) for frame in self.frames])
+        self.assertEqual(sorted(batch_sizes), [4] + [8] * 7)
+        self.assertEqual(result.stats['pose']['frames'], 60)
+        with self.assertRaises(ValueError):
+            VideoAnalysisPipeline(batch_size=0)
+    
+    def test_pose_confidence_is_kept(self):
+        """Test that pose_estimate_fn scores reach the frame results and PoseSequence."""
+        def estimate(images):
+            keypoints = np.zeros((len(images), len(JOINTS), 2), dtype=np.float32)
+            keypoints[:, :, 0] = [[image[0, 0, 0]] for image in images]
+            keypoints[:, JOINT_INDEX['head']] = np.nan
+            confidence = np.array([np.full(len(JOINTS), image[0, 0, 0] / 100) for image in images], dtype=np.float32)
+            return keypoints, confidence
+        
+        pipeline = VideoAnalysisPipeline(workers=2, pose_estimate_fn=estimate, batch_size=8, analyze_fn=None)
+        result = pipeline.run(self.frames)
+        
+        self.assertEqual([frame.index for frame in result.frames], list(range(60)))
+        self.assertEqual(result.frames[5].keypoints['neck'], (5, 0))
+        self.assertNotIn('head', result.frames[5].keypoints)
+        
+        poses = PoseSequence.from_frame_results(result.frames)
+        self.assertAlmostEqual(float(poses.confidence[30, JOINT_INDEX['neck']]), 0.3, places=6)
+        self.assertEqual(float(poses.confidence[30, JOINT_INDEX['head']]), 0.0)
+        
+        # Without scores, present joints default to 1
+        plain = VideoAnalysisPipeline(workers=2, pose_fn=brightness_pose, analyze_fn=None).run(self.frames[:4])
+        self.assertIsNone(plain.frames[0].confidence)
+        self.assertEqual(float(PoseSequence.from_frame_results(plain.frames).confidence[1, JOINT_INDEX['neck']]), 1.0)
+    
+    def test_default_stages_on_video(self):
+        """Test detect_pose and analyze_keypoints on a decoded clip."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'clip.mp4')
+            writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), 30, (160, 120))
+            for index in range(30):
+                writer.write(np.full((120, 160, 3), index * 4, dtype=np.uint8))
+            writer.release()
+            
+            result = VideoAnalysisPipeline(workers=2).run(VideoFrameSource(path, target_fps=10))
+        
+        self.assertEqual(len(result), 10)
+        self.assertEqual(result.frames[0].shape, (120, 160, 3))
+        self.assertIn('Posture', result.frames[0].analysis)
+        self.assertEqual(result.stats['analyze']['frames'], 10)
+    
+    def test_errors_are_raised(self):
+        """Test that worker and decode errors stop the run and propagate."""
+        def failing_pose(image):
+            if image[0, 0, 0] == 20:
+                raise RuntimeError("pose failed")
+            return {}
+        
+        with self.assertRaises(RuntimeError):
+            VideoAnalysisPipeline(workers=2, queue_size=2, pose_fn=failing_pose).run(self.frames)
+        
+        def failing_source():
+            yield self.frames[0]
+            raise IOError("decode failed")
+        
+        with self.assertRaises(IOError):
+            VideoAnalysisPipeline(workers=2, pose_fn=brightness_pose).run(failing_source())
+        with self.assertRaises(ValueError):
+            VideoAnalysisPipeline(workers=0)
+
+if __name__ == '__main__':
+    unittest.main()
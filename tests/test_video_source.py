@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+import cv2
+import sys
+import os
+import tempfile
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.video_source import VideoFrameSource, iter_video_frames
+
+class TestVideoSource(unittest.TestCase):
+    """Tests for the video_source module."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Write a 3 second, 30 fps test clip with a different image per frame."""
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.video_path = os.path.join(cls.tmp_dir.name, 'clip.mp4')
+        writer = cv2.VideoWriter(cls.video_path, cv2.VideoWriter_fourcc(*'mp4v'), 30, (64, 48))
+        for index in range(90):
+            writer.write(np.full((48, 64, 3), index * 2, dtype=np.uint8))
+        writer.release()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+    
+    def test_samples_at_target_fps(self):
+        """Test that frames are taken at the target rate in clip order."""
+        with VideoFrameSource(self.video_path, target_fps=5) as source:
+            self.assertEqual((source.fps, source.frame_count), (30.0, 90))
+            self.assertEqual(source.expected_frames, 15)
+            frames = list(source)
+        
+        self.assertEqual([frame.index for frame in frames], list(range(0, 90, 6)))
+        self.assertAlmostEqual(frames[1].timestamp, 0.2)
+        self.assertEqual(source.frames_decoded, 90)
+        
+        # The retrieved image is the frame at that index of a plain read() loop
+        capture = cv2.VideoCapture(self.video_path)
+        decoded = [capture.read()[1] for _ in range(90)]
+        capture.release()
+        for frame in frames:
+            np.testing.assert_array_equal(frame.image, decoded[frame.index])
+    
+    def test_fractional_rate_and_limits(self):
+        """Test non-integer rate ratios, full-rate decoding and the frame cap."""
+        indices = [frame.index for frame in iter_video_frames(self.video_path, target_fps=4, max_frames=None)]
+        self.assertEqual(len(indices), 12)
+        self.assertEqual(indices[:3], [0, 8, 15])
+        
+        self.assertEqual(len(list(iter_video_frames(self.video_path, target_fps=None, max_frames=None))), 90)
+        self.assertEqual(len(list(iter_video_frames(self.video_path, target_fps=60, max_frames=7))), 7)
+    
+    def test_errors(self):
+        """Test invalid sources and iterating twice."""
+        with self.assertRaises(ValueError):
+            VideoFrameSource(os.path.join(self.tmp_dir.name, 'missing.mp4'))
+        with self.assertRaises(ValueError):
+            VideoFrameSource(self.video_path, target_fps=0)
+        
+        source = VideoFrameSource(self.video_path)
+        list(source)
+        with self.assertRaises(RuntimeError):
+            list(source)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.zscores import compute_zscores, classify_zscores
+
+class TestZScores(unittest.TestCase):
+    """Tests for the zscores module."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.data = pd.DataFrame({
+            'Athlete': ['A', 'A', 'B', 'B', 'C', 'C'],
+            'Team': ['X', 'X', 'X', 'X', 'Y', 'Y'],
+            'Date': pd.date_range('2023-01-01', periods=6),
+            'Strength': [1.0, 2.0, 3.0, 4.0, 5.0, np.nan],
+            'Speed': [10.0, 20.0, 10.0, 40.0, 5.0, 6.0]
+        })
+        self.metrics = ['Strength', 'Speed']
+    
+    def test_pooled_baseline(self):
+        """Test scoring against the athlete's pooled values."""
+        zscores = compute_zscores(self.data, self.metrics, baseline='pooled')
+        
+        pooled = np.array([1.0, 2.0, 10.0, 20.0])
+        expected = (np.array([2.0, 20.0]) - pooled.mean()) / pooled.std()
+        np.testing.assert_allclose(zscores.loc['A'].to_numpy(), expected)
+        
+        # Missing values are skipped, so C's recent Strength is 5
+        pooled = np.array([5.0, 5.0, 6.0])
+        self.assertAlmostEqual(zscores.loc['C', 'Strength'], (5.0 - pooled.mean()) / pooled.std())
+    
+    def test_metric_and_team_baselines(self):
+        """Test scoring against per-metric and cohort baselines."""
+        zscores = compute_zscores(self.data, self.metrics, baseline='metric')
+        self.assertAlmostEqual(zscores.loc['B', 'Speed'], 1.0)
+        # A single value has no spread
+        self.assertTrue(np.isnan(zscores.loc['C', 'Strength']))
+        
+        zscores = compute_zscores(self.data, self.metrics, baseline='team')
+        team_x = np.array([1.0, 2.0, 3.0, 4.0])
+        self.assertAlmostEqual(zscores.loc['B', 'Strength'], (4.0 - team_x.mean()) / team_x.std())
+    
+    def test_invalid_baseline(self):
+        """Test errors for unknown or unavailable baselines."""
+        with self.assertRaises(ValueError):
+            compute_zscores(self.data, self.metrics, baseline='league')
+        with self.assertRaises(ValueError):
+            compute_zscores(self.data, self.metrics, baseline='sport')
+    
+    def test_classify_zscores(self):
+        """Test strengths and weaknesses from a z-score table."""
+        zscores = pd.DataFrame({'Strength': [1.0, -1.0], 'Speed': [np.nan, 0.5]}, index=['A', 'B'])
+        
+        result = classify_zscores(zscores)
+        self.assertEqual(result['A'], (['Strength'], []))
+        self.assertEqual(result['B'], ([], ['Strength']))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,218 @@
+"""
+Memoized analysis results keyed by a fingerprint of the data.
+
+Streamlit reruns the whole page whenever a widget changes, so the analysis
+and plotting functions are called again with the same data. The cache keys
+their results on a content hash of the performance data plus the athlete and
+the analysis, so unchanged inputs are computed once:
+
+    key = (data_fingerprint(data), athlete, 'radar')
+    png = analysis_cache.get_or_compute(key, lambda: figure_to_png(create_performance_radar(frame, athlete)))
+
+The cache is a bounded LRU: entries are sized when stored and the least
+recently used ones are evicted once the total exceeds the byte budget.
+Cached values are shared between reruns and sessions and must be treated as
+read-only; charts are therefore cached as rendered PNG bytes rather than as
+matplotlib figures, which are not safe to draw from several threads.
+"""
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.performance_frame import PerformanceFrame
+
+# Default byte budget of the shared cache, overridable from the environment
+ANALYSIS_CACHE_MAX_BYTES = int(os.environ.get('ANALYSIS_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+# Default maximum number of cached entries
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.environ.get('ANALYSIS_CACHE_MAX_ENTRIES', 512))
+
+
+def data_fingerprint(data):
+    """
+    Content hash of performance data.
+
+    Two DataFrames with the same columns, dtypes and values in the same order
+    get the same fingerprint, whether or not they are the same object.
+
+    Args:
+        data (pd.DataFrame or PerformanceFrame): Performance data
+
+    Returns:
+        str: Hex digest identifying the data
+    """
+    if isinstance(data, PerformanceFrame):
+        data = data.data
+
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(repr([(str(column), str(dtype)) for column, dtype in data.dtypes.items()]).encode())
+    # One 64-bit hash per row, computed column-wise without Python loops
+    row_hashes = pd.util.hash_pandas_object(data, index=False).to_numpy()
+    hasher.update(np.ascontiguousarray(row_hashes).tobytes())
+    return hasher.hexdigest()
+
+
+def _sizeof(value):
+    """
+    Approximate memory footprint of a cached value in bytes.
+
+    Args:
+        value: Cached value
+
+    Returns:
+        int: Size in bytes
+    """
+    if isinstance(value, PerformanceFrame):
+        value = value.data
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if hasattr(value, 'get_size_inches') and hasattr(value, 'dpi'):
+        # matplotlib figure: dominated by its RGBA canvas once rendered
+        width, height = value.get_size_inches()
+        return int(width * value.dpi * height * value.dpi * 4)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(_sizeof(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def _release(value):
+    """Close evicted matplotlib figures so pyplot does not keep them alive."""
+    if hasattr(value, 'get_size_inches') and hasattr(value, 'dpi'):
+        import matplotlib.pyplot as plt
+        plt.close(value)
+
+
+class AnalysisCache:
+    """Thread-safe LRU cache with a byte budget and hit/miss counters."""
+
+    def __init__(self, max_bytes=ANALYSIS_CACHE_MAX_BYTES, max_entries=ANALYSIS_CACHE_MAX_ENTRIES):
+        """
+        Create an empty cache.
+
+        Args:
+            max_bytes (int): Total size of the cached values before evicting
+            max_entries (int): Number of cached values before evicting
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """
+        Look up a cached value and mark it as recently used.
+
+        Args:
+            key: Cache key
+            default: Value returned when the key is not cached
+
+        Returns:
+            The cached value or default
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """
+        Store a value, evicting least recently used entries over budget.
+
+        Values larger than the whole budget are not cached.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        size = _sizeof(value)
+        evicted = []
+        with self._lock:
+            if key in self._entries:
+                old_value, old_size = self._entries.pop(key)
+                self.current_bytes -= old_size
+                if old_value is not value:
+                    evicted.append(old_value)
+            if size <= self.max_bytes:
+                self._entries[key] = (value, size)
+                self.current_bytes += size
+            while self._entries and (self.current_bytes > self.max_bytes or len(self._entries) > self.max_entries):
+                _, (old_value, old_size) = self._entries.popitem(last=False)
+                self.current_bytes -= old_size
+                self.evictions += 1
+                evicted.append(old_value)
+        for old_value in evicted:
+            _release(old_value)
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for key, computing and caching it on a miss.
+
+        Args:
+            key: Cache key, e.g. (data_fingerprint(data), athlete, 'analysis')
+            compute (callable): Called without arguments on a miss
+
+        Returns:
+            The cached or newly computed value
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            # Computed outside the lock so other keys are not blocked
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Drop all entries; the counters are kept."""
+        with self._lock:
+            values = [value for value, _ in self._entries.values()]
+            self._entries.clear()
+            self.current_bytes = 0
+        for value in values:
+            _release(value)
+
+    def stats(self):
+        """
+        Cache counters.
+
+        Returns:
+            dict: hits, misses, hit_rate, evictions, entries and bytes
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes
+            }
+
+
+# Cache shared by all reruns and sessions of the app
+analysis_cache = AnalysisCache()
@@ -0,0 +1,267 @@
+"""
+Optional Parquet store for performance history.
+
+Stores measurements as long (date, metric, value) rows in a Hive-partitioned
+Parquet dataset, one directory per season and athlete:
+
+    <root>/season=2024/athlete=Kyle%20Stanley/part-0.parquet
+
+Reads go through pyarrow with memory-mapped files. Season and athlete
+filters prune whole partitions, and date and metric filters are pushed down
+to the Parquet row groups. Only rows that match are read and pivoted into the
+usual wide layout. pyarrow is optional; without it the store raises ImportError.
+"""
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+# pyarrow is optional; it is only needed for the Parquet store
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    ds = None
+    pq = None
+
+# Default location of the store, overridable from the environment
+PERFORMANCE_STORE_PATH = os.environ.get('PERFORMANCE_STORE_PATH', os.path.join('data', 'performance_store'))
+
+# Columns of a performance DataFrame that are never stored as metrics
+_NON_METRIC_COLUMNS = ['Athlete', 'Date', 'Session', 'Notes', 'date', 'Sport', 'Team']
+
+# Key of a stored measurement; later writes replace earlier ones
+_KEY = ['athlete', 'date', 'metric']
+
+
+def _require_pyarrow():
+    """Raise a helpful error when pyarrow is missing."""
+    if pa is None:
+        raise ImportError("The Parquet performance store requires pyarrow")
+
+
+def _schema():
+    """Arrow schema of the stored rows, partition columns included."""
+    return pa.schema([
+        pa.field('season', pa.int32()),
+        pa.field('athlete', pa.string()),
+        pa.field('date', pa.timestamp('us')),
+        # Few distinct metric names; dictionary encoded, read back as categorical
+        pa.field('metric', pa.dictionary(pa.int32(), pa.string())),
+        pa.field('value', pa.float32())
+    ])
+
+
+def _partitioning():
+    """Hive partitioning by season, then athlete."""
+    return ds.partitioning(
+        pa.schema([pa.field('season', pa.int32()), pa.field('athlete', pa.string())]),
+        flavor='hive'
+    )
+
+
+def _to_long(df, athlete=None):
+    """Convert a wide performance DataFrame into stored rows."""
+    df = df.rename(columns={'date': 'Date'}) if 'Date' not in df.columns else df
+    if 'Athlete' not in df.columns:
+        if athlete is None:
+            raise ValueError("Data without an 'Athlete' column needs the athlete argument")
+        df = df.assign(Athlete=athlete)
+    if 'Date' not in df.columns:
+        raise ValueError("Performance data needs a 'Date' column to be stored")
+    
+    metrics = [col for col in df.columns if col not in _NON_METRIC_COLUMNS]
+    wide = df[metrics].apply(pd.to_numeric, errors='coerce')
+    wide.insert(0, 'date', pd.to_datetime(df['Date'], errors='coerce'))
+    wide.insert(0, 'athlete', df['Athlete'].astype(str))
+    
+    long_df = wide.melt(id_vars=['athlete', 'date'], var_name='metric', value_name='value')
+    long_df = long_df.dropna(subset=['date', 'value'])
+    long_df['metric'] = long_df['metric'].astype(str)
+    long_df['value'] = long_df['value'].astype('float32')
+    long_df.insert(0, 'season', long_df['date'].dt.year.astype('int32'))
+    
+    return long_df.drop_duplicates(_KEY, keep='last')
+
+
+def _filters(athletes=None, seasons=None, start=None, end=None, metrics=None):
+    """DNF filter list for pyarrow; partition columns first so they prune directories."""
+    filters = []
+    if seasons is not None:
+        filters.append(('season', 'in', [int(season) for season in seasons]))
+    if athletes is not None:
+        filters.append(('athlete', 'in', [str(athlete) for athlete in athletes]))
+    if start is not None:
+        start = pd.Timestamp(start)
+        filters.append(('season', '>=', start.year))
+        filters.append(('date', '>=', start.to_pydatetime()))
+    if end is not None:
+        end = pd.Timestamp(end)
+        filters.append(('season', '<=', end.year))
+        filters.append(('date', '<=', end.to_pydatetime()))
+    if metrics is not None:
+        filters.append(('metric', 'in', [metrics] if isinstance(metrics, str) else list(metrics)))
+    return filters or None
+
+
+def _read_long(path, filters=None):
+    """Read stored rows matching filters as a long DataFrame."""
+    if not os.path.isdir(path):
+        return pd.DataFrame(columns=['season', 'athlete', 'date', 'metric', 'value'])
+    
+    table = pq.read_table(
+        path, schema=_schema(), partitioning=_partitioning(), filters=filters, memory_map=True
+    )
+    return table.to_pandas()
+
+
+def write_performance_store(df, path=None, athlete=None):
+    """
+    Write performance data into the Parquet store.
+    
+    Each (season, athlete) partition touched by df is rewritten with its
+    existing rows merged with the new ones; a measurement of the same athlete,
+    date and metric replaces the stored value.
+    
+    Args:
+        df (pd.DataFrame): Wide performance data with Athlete and Date columns
+        path (str, optional): Store directory, PERFORMANCE_STORE_PATH by default
+        athlete (str, optional): Athlete for data without an 'Athlete' column
+        
+    Returns:
+        int: Number of measurements in df that were written
+    """
+    _require_pyarrow()
+    path = path or PERFORMANCE_STORE_PATH
+    
+    new_rows = _to_long(df, athlete=athlete)
+    written = len(new_rows)
+    if not written:
+        return 0
+    
+    partitions = new_rows[['season', 'athlete']].drop_duplicates()
+    existing = _read_long(path, _filters(
+        athletes=partitions['athlete'].unique(), seasons=partitions['season'].unique()
+    ))
+    if not existing.empty:
+        # Keep only rows of the partitions being rewritten
+        existing = existing.merge(partitions, on=['season', 'athlete'])
+        new_rows = pd.concat([existing[new_rows.columns], new_rows], ignore_index=True)
+        new_rows = new_rows.drop_duplicates(_KEY, keep='last')
+    
+    # Sorted by metric and date so row-group statistics prune well
+    new_rows = new_rows.sort_values(['season', 'athlete', 'metric', 'date'], kind='stable')
+    table = pa.Table.from_pandas(new_rows, schema=_schema(), preserve_index=False)
+    
+    ds.write_dataset(
+        table, path,
+        format='parquet',
+        partitioning=_partitioning(),
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior='delete_matching'
+    )
+    
+    return written
+
+
+def read_performance_store(path=None, athletes=None, start=None, end=None, metrics=None, seasons=None):
+    """
+    Read performance data from the Parquet store.
+    
+    Args:
+        path (str, optional): Store directory, PERFORMANCE_STORE_PATH by default
+        athletes (list, optional): Athletes to include
+        start (datetime or str, optional): Earliest date to include
+        end (datetime or str, optional): Latest date to include
+        metrics (list or str, optional): Metric names to include
+        seasons (list, optional): Seasons (calendar years) to include
+        
+    Returns:
+        pd.DataFrame: Wide DataFrame with Athlete and Date columns and one
+            float32 column per metric, sorted by athlete and date
+    """
+    _require_pyarrow()
+    path = path or PERFORMANCE_STORE_PATH
+    
+    long_df = _read_long(path, _filters(athletes, seasons, start, end, metrics))
+    if long_df.empty:
+        return pd.DataFrame(columns=['Athlete', 'Date'])
+    
+    return _pivot_wide(long_df)
+
+
+def _pivot_wide(long_df):
+    """Scatter long rows into a wide (athlete, date) x metric array."""
+    athlete_codes, athletes = pd.factorize(long_df['athlete'])
+    date_codes, dates = pd.factorize(long_df['date'])
+    metric_codes, metric_names = pd.factorize(long_df['metric'])
+    
+    # One row per distinct (athlete, date) pair
+    row_codes, row_keys = pd.factorize(athlete_codes.astype('int64') * len(dates) + date_codes)
+    values = np.full((len(row_keys), len(metric_names)), np.nan, dtype=np.float32)
+    values[row_codes, metric_codes] = long_df['value'].to_numpy()
+    
+    wide = pd.DataFrame(values, columns=[str(name) for name in metric_names])
+    wide = wide[sorted(wide.columns)]
+    wide.insert(0, 'Date', dates[row_keys % len(dates)])
+    wide.insert(0, 'Athlete', athletes[row_keys // len(dates)])
+    
+    return wide.sort_values(['Athlete', 'Date'], kind='stable').reset_index(drop=True)
+
+
+class PerformanceStore:
+    """Handle to a Parquet store, usable wherever performance data is accepted."""
+    
+    def __init__(self, path=None, start=None, end=None, metrics=None):
+        """
+        Args:
+            path (str, optional): Store directory, PERFORMANCE_STORE_PATH by default
+            start, end (datetime or str, optional): Date range read by default
+            metrics (list, optional): Metrics read by default
+        """
+        _require_pyarrow()
+        self.path = path or PERFORMANCE_STORE_PATH
+        self.start = start
+        self.end = end
+        self.metrics = metrics
+    
+    def read(self, athletes=None):
+        """
+        Read the store's data for some or all athletes.
+        
+        Args:
+            athletes (list, optional): Athletes to include
+            
+        Returns:
+            pd.DataFrame: Wide performance data
+        """
+        return read_performance_store(self.path, athletes=athletes, start=self.start,
+                                      end=self.end, metrics=self.metrics)
+    
+    def athlete(self, athlete):
+        """
+        Rows of one athlete, in date order.
+        
+        Args:
+            athlete (str): The name of the athlete
+            
+        Returns:
+            pd.DataFrame: The athlete's rows
+        """
+        return self.read(athletes=[athlete])
+    
+    def write(self, df, athlete=None):
+        """
+        Write performance data into the store.
+        
+        Args:
+            df (pd.DataFrame): Wide performance data
+            athlete (str, optional): Athlete for data without an 'Athlete' column
+            
+        Returns:
+            int: Number of measurements in df that were written
+        """
+        return write_performance_store(df, self.path, athlete=athlete)
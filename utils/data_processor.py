@@ -1,33 +1,31 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from utils.trend import series_trend, slopes_from_sums, classify_trends
+from utils.zscores import compute_zscores, classify_zscores
+from utils.performance_frame import athlete_rows, frame_data, metric_columns
 
 def process_performance_data(data, athlete):
     """
     Process performance data for a specific athlete.
     
     Args:
-        data (pd.DataFrame): The performance data
+        data (pd.DataFrame, PerformanceFrame or PerformanceStore): The performance data
         athlete (str): The name of the athlete to analyze
         
     Returns:
         dict: Processed analysis results
     """
-    # Filter data for the selected athlete
-    athlete_data = data[data['Athlete'] == athlete].copy()
-    
-    # Ensure date is in datetime format if it exists
-    if 'Date' in athlete_data.columns:
-        athlete_data['Date'] = pd.to_datetime(athlete_data['Date'], errors='coerce')
-        athlete_data = athlete_data.sort_values('Date')
+    # The athlete's rows with parsed dates, in date order
+    athlete_data = athlete_rows(data, athlete)
     
     # Calculate basic statistics for each metric
-    metric_columns = [col for col in athlete_data.columns 
-                     if col not in ['Athlete', 'Date', 'Session', 'Notes']]
+    metrics = metric_columns(athlete_data)
     
     stats = {}
-    for metric in metric_columns:
-        metric_data = athlete_data[metric].dropna()
+    for metric in metrics:
+        # float32 frame columns are summarized in float64
+        metric_data = athlete_data[metric].dropna().astype(float)
         if len(metric_data) > 0:
             stats[metric] = {
                 'mean': metric_data.mean(),
@@ -40,7 +38,7 @@ def process_performance_data(data, athlete):
             }
     
     # Identify strengths and weaknesses
-    strengths, weaknesses = identify_strengths_weaknesses(athlete_data, metric_columns)
+    strengths, weaknesses = identify_strengths_weaknesses(athlete_data, metrics)
     
     # Prepare the analysis results
     analysis_results = {
@@ -64,21 +62,7 @@ def calculate_trend(data_series):
     Returns:
         str: 'increasing', 'decreasing', or 'stable'
     """
-    if len(data_series) < 2:
-        return 'insufficient_data'
-    
-    # Simple linear regression to find the slope
-    x = np.arange(len(data_series))
-    y = data_series.values
-    slope = np.polyfit(x, y, 1)[0]
-    
-    # Determine trend direction
-    if abs(slope) < 0.01 * data_series.mean():  # Less than 1% change on average
-        return 'stable'
-    elif slope > 0:
-        return 'increasing'
-    else:
-        return 'decreasing'
+    return series_trend(np.asarray(data_series, dtype=float), min_points=2)
 
 def identify_strengths_weaknesses(data, metrics):
     """
@@ -91,61 +75,117 @@ def identify_strengths_weaknesses(data, metrics):
     Returns:
         tuple: Lists of strengths and weaknesses
     """
-    strengths = []
-    weaknesses = []
-    
-    # Calculate the mean for each metric
-    means = {metric: data[metric].mean() for metric in metrics}
-    
-    # Calculate the standard deviation across all metrics
-    all_values = np.concatenate([data[metric].values for metric in metrics])
-    overall_std = np.std(all_values)
+    # Score the rows as one athlete: recent values against their pooled values
+    zscores = compute_zscores(data, metrics, baseline='pooled', athlete_column=None)
+    return classify_zscores(zscores)[None]
+
+def identify_all_strengths_weaknesses(data, metrics=None, baseline='pooled'):
+    """
+    Identify strengths and weaknesses of every athlete at once.
     
-    # Normalize the metrics and identify outliers
-    for metric in metrics:
-        metric_mean = means[metric]
-        metric_data = data[metric].dropna()
+    Args:
+        data (pd.DataFrame, PerformanceFrame or PerformanceStore): The performance data for all athletes
+        metrics (list, optional): Metric columns; defaults to the numeric columns
+        baseline (str): 'pooled' or 'metric' for the athlete's own values,
+            'team' or 'sport' to compare against their cohort
         
-        if len(metric_data) > 0:
-            recent_value = metric_data.iloc[-1]
-            normalized_value = (recent_value - np.mean(all_values)) / overall_std
-            
-            if normalized_value > 0.75:  # More than 0.75 std above mean
-                strengths.append(metric)
-            elif normalized_value < -0.75:  # More than 0.75 std below mean
-                weaknesses.append(metric)
-    
-    return strengths, weaknesses
+    Returns:
+        dict: Athlete -> (strengths, weaknesses)
+    """
+    data = frame_data(data)
+    if metrics is None:
+        metrics = metric_columns(data)
+    
+    return classify_zscores(compute_zscores(data, metrics, baseline=baseline))
 
 def extract_key_metrics(data, athlete):
     """
     Extract key performance metrics for display.
     
     Args:
-        data (pd.DataFrame): The performance data
+        data (pd.DataFrame, PerformanceFrame or PerformanceStore): The performance data
         athlete (str): The name of the athlete
         
     Returns:
         dict: Key metrics and their values
     """
-    # Filter data for the selected athlete
-    athlete_data = data[data['Athlete'] == athlete].copy()
+    # The athlete's rows with parsed dates
+    athlete_data = athlete_rows(data, athlete)
     
     # Get the metrics (excluding non-metric columns)
-    metric_columns = [col for col in athlete_data.columns 
-                     if col not in ['Athlete', 'Date', 'Session', 'Notes']]
+    metrics = metric_columns(athlete_data)
     
     # Get the most recent values for each metric
     if 'Date' in athlete_data.columns:
-        athlete_data['Date'] = pd.to_datetime(athlete_data['Date'], errors='coerce')
         most_recent = athlete_data.loc[athlete_data['Date'].idxmax()]
     else:
         most_recent = athlete_data.iloc[-1]
     
     # Extract the key metrics
     key_metrics = {}
-    for metric in metric_columns:
+    for metric in metrics:
         if metric in most_recent and not pd.isna(most_recent[metric]):
             key_metrics[metric] = most_recent[metric]
     
     return key_metrics
+
+def process_all_athletes(data):
+    """
+    Compute summary statistics and trends for every athlete and metric at once.
+    
+    Produces the same per-metric statistics as process_performance_data, but
+    for all athletes in one groupby pass. Trend slopes use the closed-form
+    least-squares solution from per-group sums instead of np.polyfit per series.
+    
+    Args:
+        data (pd.DataFrame, PerformanceFrame or PerformanceStore): The performance data for all athletes
+        
+    Returns:
+        pd.DataFrame: One row per athlete and metric with the columns athlete,
+            metric, count, mean, median, min, max, std, recent, slope and trend
+    """
+    data = frame_data(data)
+    result_columns = ['athlete', 'metric', 'count', 'mean', 'median', 'min', 'max',
+                      'std', 'recent', 'slope', 'trend']
+    
+    # Only numeric metric columns can be summarized
+    metrics = metric_columns(data)
+    
+    if data.empty or not metrics:
+        return pd.DataFrame(columns=result_columns)
+    
+    df = data[['Athlete'] + metrics]
+    
+    # Order each athlete's sessions by date, as process_performance_data does
+    if 'Date' in data.columns:
+        order = pd.DataFrame({
+            'Athlete': data['Athlete'],
+            'Date': pd.to_datetime(data['Date'], errors='coerce')
+        }).sort_values(['Athlete', 'Date'], kind='stable').index
+        df = df.loc[order]
+    
+    long_df = df.melt(id_vars='Athlete', var_name='metric', value_name='value').dropna(subset=['value'])
+    long_df['metric'] = pd.Categorical(long_df['metric'], categories=metrics)
+    
+    keys = ['Athlete', 'metric']
+    grouped = long_df.groupby(keys, observed=True, sort=True)
+    
+    # x is the position of each value within its (athlete, metric) series
+    x = grouped.cumcount().astype(float)
+    y = long_df['value'].astype(float)
+    sums = pd.DataFrame({'x': x, 'y': y, 'xy': x * y, 'xx': x * x})
+    sums[keys] = long_df[keys]
+    sums = sums.groupby(keys, observed=True, sort=True).sum()
+    
+    stats = grouped['value'].agg(['count', 'mean', 'median', 'min', 'max', 'std', 'last'])
+    stats = stats.rename(columns={'last': 'recent'})
+    
+    n = stats['count'].to_numpy()
+    stats['slope'] = slopes_from_sums(n, sums['x'], sums['y'], sums['xy'], sums['xx'])
+    stats['trend'] = classify_trends(stats['slope'], stats['mean'], n, min_points=2)
+    
+    results = stats.reset_index().rename(columns={'Athlete': 'athlete'})
+    results['athlete'] = results['athlete'].astype(object)
+    results['metric'] = results['metric'].astype(str)
+    
+    return results[result_columns]
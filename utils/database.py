@@ -5,22 +5,190 @@ This module handles the database connection and operations for storing
 and retrieving athlete data, metrics, and analysis results.
 """
 import os
+import sys
 import datetime
 import json
+import threading
+from contextlib import contextmanager
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, ForeignKey
+from sqlalchemy import (
+    create_engine, event, insert, select, inspect, delete, func, text,
+    Column, Integer, String, Float, DateTime, Text, ForeignKey, Index, JSON
+)
+from sqlalchemy.dialects import postgresql, sqlite
+
+# orjson is optional; it serializes JSON columns several times faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from utils.metric_stats import RunningMetricStats, batch_stats
+from utils.columnar_store import read_performance_store
+from utils.percentile_index import CohortPercentileIndex
 
 # Get database URL from environment or use SQLite as fallback
 DATABASE_URL = os.environ.get('DATABASE_URL')
 if not DATABASE_URL:
     # Use SQLite for local development or when no PostgreSQL is available
     DATABASE_URL = "sqlite:///sports_performance.db"
+
+# Connection pool settings, overridable from the environment
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+
+# SQLite journal mode; WAL lets readers proceed while a writer is active
+DB_SQLITE_JOURNAL_MODE = os.environ.get('DB_SQLITE_JOURNAL_MODE', 'WAL')
+# Milliseconds a SQLite connection waits for a lock before failing
+DB_SQLITE_BUSY_TIMEOUT = int(os.environ.get('DB_SQLITE_BUSY_TIMEOUT', 30000))
+
+
+def _engine_options(url):
+    """
+    Build create_engine keyword arguments for the configured backend.
     
-engine = create_engine(DATABASE_URL)
+    Args:
+        url (str): The database URL
+        
+    Returns:
+        dict: Keyword arguments for create_engine
+    """
+    options = {
+        'pool_pre_ping': DB_POOL_PRE_PING,
+        'pool_recycle': DB_POOL_RECYCLE,
+    }
+    
+    if url.startswith('sqlite'):
+        # Connections are shared across Streamlit's script threads
+        options['connect_args'] = {'check_same_thread': False}
+        if ':memory:' in url or url.rstrip('/') == 'sqlite:':
+            return options
+    
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+    return options
+
+
+def _json_dumps(value):
+    """Serialize a JSON column value, using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass
+    return json.dumps(value)
+
+
+def _json_loads(value):
+    """Deserialize a JSON column value, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(value)
+    return json.loads(value)
+
+
+engine = create_engine(
+    DATABASE_URL,
+    json_serializer=_json_dumps,
+    json_deserializer=_json_loads,
+    **_engine_options(DATABASE_URL)
+)
+
+
+@event.listens_for(engine, "connect")
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    """Apply journal mode and lock timeout to every new SQLite connection."""
+    if engine.dialect.name != 'sqlite':
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout={DB_SQLITE_BUSY_TIMEOUT}")
+    if DB_SQLITE_JOURNAL_MODE:
+        cursor.execute(f"PRAGMA journal_mode={DB_SQLITE_JOURNAL_MODE}")
+        if DB_SQLITE_JOURNAL_MODE.upper() == 'WAL':
+            # Durable at checkpoints; avoids an fsync on every commit
+            cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
 Base = declarative_base()
-Session = sessionmaker(bind=engine)
+# Objects stay usable after commit, so returned instances are not expired
+Session = sessionmaker(bind=engine, expire_on_commit=False)
+
+
+# Process-wide athlete directory cache. Writers bump the version after commit;
+# a cached list is only served while its version is still current.
+_athlete_cache_lock = threading.Lock()
+_athlete_cache_version = 0
+_athlete_cache = {'version': None, 'athletes': None}
+# Directory counts by filters, valid for one cache version
+_athlete_count_cache = {'version': None, 'counts': {}}
+
+
+def invalidate_athlete_cache():
+    """
+    Mark the cached athlete directory as stale.
+    
+    Called automatically after commits that change athletes. Call it directly
+    after writing athletes from outside this module or another process.
+    """
+    global _athlete_cache_version
+    with _athlete_cache_lock:
+        _athlete_cache_version += 1
+
+
+def _mark_athletes_changed(session):
+    """Flag a session so the athlete cache is invalidated once it commits."""
+    session.info['athletes_changed'] = True
+
+
+# Process-wide cohort percentile index, built from the database on first use
+# and updated in place as performance rows are stored
+_percentile_index_lock = threading.Lock()
+_percentile_index = None
+
+# Last timestamp handed to a row without a usable date
+_undated_lock = threading.Lock()
+_last_undated = None
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_athlete_cache_after_commit(session):
+    if session.info.pop('athletes_changed', False):
+        invalidate_athlete_cache()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_athlete_change_flag(session):
+    session.info.pop('athletes_changed', None)
+
+
+@contextmanager
+def session_scope():
+    """
+    Provide a transactional unit of work around a series of operations.
+    
+    Commits when the block exits normally, rolls back on error and always
+    returns the connection to the pool.
+    
+    Yields:
+        Session: The session for the unit of work
+    """
+    session = Session()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
 
 # Rest of your database.py file remains the same
 # import os
@@ -41,6 +209,12 @@ Session = sessionmaker(bind=engine)
 class Athlete(Base):
     """Athlete model for storing basic athlete information."""
     __tablename__ = 'athletes'
+    __table_args__ = (
+        # Keyset pagination of the directory filtered by sport or team;
+        # name itself is covered by its unique constraint
+        Index('ix_athletes_sport_name', 'sport', 'name'),
+        Index('ix_athletes_team_name', 'team', 'name'),
+    )
     
     id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False, unique=True)
@@ -53,6 +227,7 @@ class Athlete(Base):
     # Relationships
     performance_data = relationship("PerformanceData", back_populates="athlete", cascade="all, delete-orphan")
     form_analyses = relationship("FormAnalysis", back_populates="athlete", cascade="all, delete-orphan")
+    metric_summaries = relationship("MetricSummary", back_populates="athlete", cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<Athlete(name='{self.name}', sport='{self.sport}')>"
@@ -61,6 +236,13 @@ class Athlete(Base):
 class PerformanceData(Base):
     """Model for storing athlete performance metrics."""
     __tablename__ = 'performance_data'
+    __table_args__ = (
+        # One value per athlete, date and metric; target of the ingest upserts.
+        # Its (athlete_id, date) prefix also serves per-athlete history loads.
+        Index('uq_performance_data_athlete_date_metric', 'athlete_id', 'date', 'metric_name', unique=True),
+        # Per-athlete, per-metric time windows (trend charts, metric filters)
+        Index('ix_performance_data_athlete_metric_date', 'athlete_id', 'metric_name', 'date'),
+    )
     
     id = Column(Integer, primary_key=True)
     athlete_id = Column(Integer, ForeignKey('athletes.id'), nullable=False)
@@ -79,13 +261,17 @@ class PerformanceData(Base):
 class FormAnalysis(Base):
     """Model for storing form analysis results from image or video processing."""
     __tablename__ = 'form_analyses'
+    __table_args__ = (
+        Index('ix_form_analyses_athlete_date', 'athlete_id', 'date'),
+    )
     
     id = Column(Integer, primary_key=True)
     athlete_id = Column(Integer, ForeignKey('athletes.id'), nullable=False)
     date = Column(DateTime, default=datetime.datetime.utcnow)
     exercise_type = Column(String(255))
-    analysis_data = Column(Text)  # Stored as JSON string
-    recommendations = Column(Text)  # Stored as JSON string
+    # Native JSONB on PostgreSQL, JSON text elsewhere
+    analysis_data = Column(JSON(none_as_null=True).with_variant(postgresql.JSONB(none_as_null=True), 'postgresql'))
+    recommendations = Column(JSON(none_as_null=True).with_variant(postgresql.JSONB(none_as_null=True), 'postgresql'))
     
     # Relationship
     athlete = relationship("Athlete", back_populates="form_analyses")
@@ -94,39 +280,235 @@ class FormAnalysis(Base):
         return f"<FormAnalysis(athlete_id={self.athlete_id}, exercise='{self.exercise_type}')>"
 
 
+class MetricSummary(Base):
+    """Model for storing the running statistics of an athlete's metric."""
+    __tablename__ = 'metric_summaries'
+    __table_args__ = (
+        Index('uq_metric_summaries_athlete_metric', 'athlete_id', 'metric_name', unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    athlete_id = Column(Integer, ForeignKey('athletes.id'), nullable=False)
+    metric_name = Column(String(255), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    mean = Column(Float)
+    m2 = Column(Float)
+    min_value = Column(Float)
+    max_value = Column(Float)
+    recent_value = Column(Float)
+    c_xy = Column(Float)
+    # Streaming median estimator markers
+    median_state = Column(JSON(none_as_null=True).with_variant(postgresql.JSONB(none_as_null=True), 'postgresql'))
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    
+    # Relationship
+    athlete = relationship("Athlete", back_populates="metric_summaries")
+    
+    def __repr__(self):
+        return f"<MetricSummary(athlete_id={self.athlete_id}, metric='{self.metric_name}', count={self.count})>"
+
+
+# Columns of an uploaded DataFrame that are never treated as metrics
+NON_METRIC_COLUMNS = ['Athlete', 'Date', 'Session', 'date', 'Sport', 'Team']
+
+# Number of rows sent per executemany batch by the bulk insert path
+BULK_INSERT_BATCH_SIZE = 5000
+
+# Number of athletes per multi-row upsert statement
+ATHLETE_UPSERT_CHUNK_SIZE = 1000
+
+# Default page size for the athlete directory
+ATHLETE_PAGE_SIZE = 50
+
+
+# Columns identifying a single performance measurement
+PERFORMANCE_DATA_KEY = ['athlete_id', 'date', 'metric_name']
+
+# Newly stored rows above which metric summaries are updated with grouped batch stats
+SUMMARY_BATCH_THRESHOLD = 256
+
+
 # Database functions
 
+def _dialect_insert(model):
+    """
+    Build an INSERT statement that supports ON CONFLICT on SQLite and PostgreSQL.
+    
+    Args:
+        model: The mapped model class to insert into
+        
+    Returns:
+        Insert: Dialect-specific insert for SQLite/PostgreSQL, generic insert otherwise
+    """
+    if engine.dialect.name == 'postgresql':
+        return postgresql.insert(model)
+    if engine.dialect.name == 'sqlite':
+        return sqlite.insert(model)
+    return insert(model)
+
+
+def _upsert_performance_statement():
+    """
+    Build the INSERT ... ON CONFLICT statement used for performance rows.
+    
+    On SQLite and PostgreSQL an existing (athlete_id, date, metric_name) row is
+    updated only when the value or notes changed, so re-ingesting the same data
+    writes nothing. Other backends fall back to a plain insert.
+    
+    Returns:
+        Insert: The statement, to be executed with a list of row dictionaries
+    """
+    table = PerformanceData.__table__
+    stmt = _dialect_insert(table)
+    
+    if engine.dialect.name not in ('postgresql', 'sqlite'):
+        return stmt
+    
+    return stmt.on_conflict_do_update(
+        index_elements=PERFORMANCE_DATA_KEY,
+        set_={
+            'metric_value': stmt.excluded.metric_value,
+            'notes': func.coalesce(stmt.excluded.notes, table.c.notes)
+        },
+        where=(table.c.metric_value != stmt.excluded.metric_value)
+        | (stmt.excluded.notes.is_not(None) & table.c.notes.is_distinct_from(stmt.excluded.notes))
+    )
+
+
+def _dedupe_performance_data(connection):
+    """
+    Collapse duplicate (athlete_id, date, metric_name) rows to the most recent one.
+    
+    Needed before the unique key can be added to databases created without it.
+    
+    Args:
+        connection (Connection): Connection inside the migration transaction
+    """
+    table = PerformanceData.__table__
+    keep_ids = select(func.max(table.c.id)).group_by(*[table.c[col] for col in PERFORMANCE_DATA_KEY])
+    connection.execute(delete(table).where(table.c.id.not_in(keep_ids)))
+
+
+# Steps that must run before a given index can be created on an existing table
+_INDEX_PREREQUISITES = {
+    'uq_performance_data_athlete_date_metric': _dedupe_performance_data,
+}
+
+# Columns stored as JSON text before they became native JSON/JSONB columns
+_JSON_COLUMNS = [
+    ('form_analyses', 'analysis_data'),
+    ('form_analyses', 'recommendations'),
+]
+
+
+def _migrate_json_columns(connection, inspector):
+    """
+    Convert legacy TEXT JSON columns to JSONB on PostgreSQL.
+    
+    SQLite stores the JSON type as text, so existing rows are already compatible.
+    
+    Args:
+        connection (Connection): Connection inside the migration transaction
+        inspector (Inspector): Inspector bound to the connection
+        
+    Returns:
+        list: Names of the columns that were converted
+    """
+    if connection.dialect.name != 'postgresql':
+        return []
+    
+    converted = []
+    for table_name, column_name in _JSON_COLUMNS:
+        columns = {col['name']: col['type'] for col in inspector.get_columns(table_name)}
+        if column_name in columns and not isinstance(columns[column_name], postgresql.JSONB):
+            connection.execute(text(
+                f"ALTER TABLE {table_name} ALTER COLUMN {column_name} "
+                f"TYPE JSONB USING {column_name}::jsonb"
+            ))
+            converted.append(f"{table_name}.{column_name}")
+    
+    return converted
+
+
+def migrate_db():
+    """
+    Bring an existing database up to date with the models.
+    
+    create_all only creates missing tables, so indexes added to a model after its
+    table was created are created here, and legacy JSON text columns are
+    converted to JSONB on PostgreSQL. Safe to run repeatedly.
+    
+    Returns:
+        list: Names of the indexes and columns that were migrated
+    """
+    created = []
+    
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        created.extend(_migrate_json_columns(connection, inspector))
+        for table in Base.metadata.sorted_tables:
+            existing = {idx['name'] for idx in inspector.get_indexes(table.name)}
+            for index in sorted(table.indexes, key=lambda idx: idx.name):
+                if index.name in existing:
+                    continue
+                prerequisite = _INDEX_PREREQUISITES.get(index.name)
+                if prerequisite:
+                    prerequisite(connection)
+                index.create(connection)
+                created.append(index.name)
+    
+    return created
+
+
 def init_db():
-    """Initialize the database by creating all tables."""
+    """Initialize the database by creating all tables and running migrations."""
     Base.metadata.create_all(engine)
+    migrate_db()
     print("Database initialized successfully.")
 
 
-def get_or_create_athlete(name, sport=None, team=None, age=None):
+def _get_or_create_athlete(session, name, sport=None, team=None, age=None):
     """
-    Get an existing athlete or create a new one if they don't exist.
+    Get or create an athlete inside an existing unit of work.
     
     Args:
+        session (Session): Session from session_scope
         name (str): Athlete's name
         sport (str, optional): Athlete's sport
         team (str, optional): Athlete's team
         age (int, optional): Athlete's age
         
     Returns:
-        Athlete: The athlete object
+        Athlete: The athlete object, with its id assigned
     """
-    session = Session()
     athlete = session.query(Athlete).filter_by(name=name).first()
     
     if not athlete:
         athlete = Athlete(name=name, sport=sport, team=team, age=age)
         session.add(athlete)
-        session.commit()
+        session.flush()
+        _mark_athletes_changed(session)
     
-    session.close()
     return athlete
 
 
+def get_or_create_athlete(name, sport=None, team=None, age=None):
+    """
+    Get an existing athlete or create a new one if they don't exist.
+    
+    Args:
+        name (str): Athlete's name
+        sport (str, optional): Athlete's sport
+        team (str, optional): Athlete's team
+        age (int, optional): Athlete's age
+        
+    Returns:
+        Athlete: The athlete object
+    """
+    with session_scope() as session:
+        return _get_or_create_athlete(session, name, sport=sport, team=team, age=age)
+
+
 def save_performance_data(athlete_name, metric_name, metric_value, notes=None, date=None):
     """
     Save a performance metric for an athlete.
@@ -139,26 +521,41 @@ def save_performance_data(athlete_name, metric_name, metric_value, notes=None, d
         date (datetime, optional): Date of the measurement, defaults to current time
         
     Returns:
-        PerformanceData: The saved performance data object
+        PerformanceData: The stored row; saving an existing (date, metric)
+            measurement again updates and returns that row
     """
-    session = Session()
-    
-    athlete = get_or_create_athlete(athlete_name)
-    
     if not date:
         date = datetime.datetime.utcnow()
     
-    perf_data = PerformanceData(
-        athlete_id=athlete.id,
-        date=date,
-        metric_name=metric_name,
-        metric_value=metric_value,
-        notes=notes
-    )
+    with session_scope() as session:
+        athlete = _get_or_create_athlete(session, athlete_name)
+        
+        rows = [{
+            'athlete_id': athlete.id,
+            'date': date,
+            'metric_name': metric_name,
+            'metric_value': metric_value,
+            'notes': notes
+        }]
+        stored, latest = _stored_performance_state(session, rows)
+        
+        # Upsert so that saving the same measurement twice keeps a single row
+        session.execute(_upsert_performance_statement(), rows)
+        _update_metric_summaries(session, rows, stored, latest)
+        
+        # The stored row, whether it was inserted, updated or left unchanged
+        perf_data = session.scalars(
+            select(PerformanceData).where(
+                PerformanceData.athlete_id == athlete.id,
+                PerformanceData.date == date,
+                PerformanceData.metric_name == metric_name
+            )
+        ).one()
     
-    session.add(perf_data)
-    session.commit()
-    session.close()
+    _index_stored_rows(
+        pd.DataFrame({'date': [date], 'metric_name': [metric_name], 'metric_value': [metric_value]}),
+        {athlete_name: (athlete.sport, athlete.team)}
+    )
     
     return perf_data
 
@@ -176,126 +573,343 @@ def save_form_analysis(athlete_name, exercise_type, analysis_data, recommendatio
     Returns:
         FormAnalysis: The saved form analysis object
     """
-    session = Session()
-    
-    athlete = get_or_create_athlete(athlete_name)
-    
-    form_analysis = FormAnalysis(
-        athlete_id=athlete.id,
-        exercise_type=exercise_type,
-        analysis_data=json.dumps(analysis_data),
-        recommendations=json.dumps(recommendations) if recommendations else None
-    )
-    
-    session.add(form_analysis)
-    session.commit()
-    session.close()
+    with session_scope() as session:
+        athlete = _get_or_create_athlete(session, athlete_name)
+        
+        form_analysis = FormAnalysis(
+            athlete_id=athlete.id,
+            exercise_type=exercise_type,
+            analysis_data=analysis_data,
+            recommendations=recommendations if recommendations else None
+        )
+        
+        session.add(form_analysis)
     
     return form_analysis
 
 
-def get_athlete_performance_data(athlete_name):
+def _to_datetime(value):
+    """Convert a date-like value (str, date, Timestamp) into a datetime for SQL filters."""
+    return pd.Timestamp(value).to_pydatetime()
+
+
+def _performance_data_query(athlete_name, start=None, end=None, metrics=None, limit=None):
     """
-    Get all performance data for an athlete.
+    Build the joined SELECT for an athlete's performance rows.
+    
+    Only the date, metric name and value columns are selected, and the optional
+    filters are applied in SQL so the (athlete_id, metric_name, date) index can
+    be used.
     
     Args:
         athlete_name (str): The name of the athlete
+        start (datetime or str, optional): Earliest date to include
+        end (datetime or str, optional): Latest date to include
+        metrics (list or str, optional): Metric names to include
+        limit (int, optional): Only include the most recent `limit` measurement dates
         
     Returns:
-        pd.DataFrame: DataFrame containing all performance data for the athlete
+        Select: The query, ordered by date
     """
-    session = Session()
+    conditions = [Athlete.name == athlete_name]
     
-    athlete = session.query(Athlete).filter_by(name=athlete_name).first()
+    if start is not None:
+        conditions.append(PerformanceData.date >= _to_datetime(start))
+    if end is not None:
+        conditions.append(PerformanceData.date <= _to_datetime(end))
+    if metrics is not None:
+        if isinstance(metrics, str):
+            metrics = [metrics]
+        conditions.append(PerformanceData.metric_name.in_(list(metrics)))
     
-    if not athlete:
-        session.close()
-        return pd.DataFrame()
+    def filtered(*columns):
+        return (
+            select(*columns)
+            .join(Athlete, Athlete.id == PerformanceData.athlete_id)
+            .where(*conditions)
+        )
     
-    performance_data = session.query(PerformanceData).filter_by(athlete_id=athlete.id).all()
+    stmt = filtered(PerformanceData.date, PerformanceData.metric_name, PerformanceData.metric_value)
     
-    data = []
-    for perf_data in performance_data:
-        data.append({
-            'date': perf_data.date,
-            'metric_name': perf_data.metric_name,
-            'metric_value': perf_data.metric_value,
-            'notes': perf_data.notes
-        })
+    if limit is not None:
+        # Walks the date index backwards, so cost depends on limit, not history size
+        latest_dates = (
+            filtered(PerformanceData.date)
+            .distinct()
+            .order_by(PerformanceData.date.desc())
+            .limit(limit)
+        )
+        stmt = stmt.where(PerformanceData.date.in_(latest_dates))
     
-    session.close()
+    return stmt.order_by(PerformanceData.date)
+
+
+def _pivot_performance_rows(df):
+    """
+    Pivot long (date, metric_name, metric_value) rows into one column per metric.
     
-    if not data:
+    Args:
+        df (pd.DataFrame): Long performance rows
+        
+    Returns:
+        pd.DataFrame: DataFrame with a date column followed by one column per metric
+    """
+    if df.empty:
         return pd.DataFrame()
     
-    df = pd.DataFrame(data)
+    # (athlete_id, date, metric_name) is unique, so no aggregation is needed
+    pivot_df = df.pivot(index='date', columns='metric_name', values='metric_value')
+    return pivot_df.reset_index()
+
+
+def get_athlete_performance_data(athlete_name, start=None, end=None, metrics=None, limit=None):
+    """
+    Get performance data for an athlete.
+    
+    Runs a single joined SELECT and reads the rows straight into a DataFrame,
+    without building ORM objects.
+    
+    Args:
+        athlete_name (str): The name of the athlete
+        start (datetime or str, optional): Earliest date to include
+        end (datetime or str, optional): Latest date to include
+        metrics (list or str, optional): Metric names to include
+        limit (int, optional): Only include the most recent `limit` measurement dates
+        
+    Returns:
+        pd.DataFrame: DataFrame containing the athlete's performance data, one column per metric
+    """
+    stmt = _performance_data_query(athlete_name, start=start, end=end, metrics=metrics, limit=limit)
     
-    # Pivot the data to get metrics as columns
-    if not df.empty:
-        pivot_df = df.pivot_table(index='date', columns='metric_name', values='metric_value')
-        pivot_df = pivot_df.reset_index()
-        return pivot_df
+    with engine.connect() as connection:
+        df = pd.read_sql(stmt, connection, parse_dates=['date'])
     
-    return df
+    return _pivot_performance_rows(df)
 
 
-def get_athlete_form_analyses(athlete_name):
+def get_athlete_form_analyses(athlete_name, include_data=True):
     """
     Get all form analyses for an athlete.
     
     Args:
         athlete_name (str): The name of the athlete
+        include_data (bool): Whether to load and decode analysis_data and
+            recommendations. When False only id, date and exercise_type are
+            selected, so listing many analyses decodes no JSON; use
+            get_form_analysis to load a single analysis in full.
         
     Returns:
         list: List of form analysis dictionaries
     """
-    session = Session()
+    columns = [FormAnalysis.id, FormAnalysis.date, FormAnalysis.exercise_type]
+    if include_data:
+        columns += [FormAnalysis.analysis_data, FormAnalysis.recommendations]
     
-    athlete = session.query(Athlete).filter_by(name=athlete_name).first()
+    stmt = (
+        select(*columns)
+        .join(Athlete, Athlete.id == FormAnalysis.athlete_id)
+        .where(Athlete.name == athlete_name)
+        .order_by(FormAnalysis.date, FormAnalysis.id)
+    )
     
-    if not athlete:
-        session.close()
-        return []
+    with engine.connect() as connection:
+        rows = connection.execute(stmt).mappings().all()
     
-    form_analyses = session.query(FormAnalysis).filter_by(athlete_id=athlete.id).all()
+    return [dict(row) for row in rows]
+
+
+def get_form_analysis(analysis_id):
+    """
+    Get a single form analysis, including its decoded analysis data.
     
-    result = []
-    for form_analysis in form_analyses:
-        result.append({
-            'id': form_analysis.id,
-            'date': form_analysis.date,
-            'exercise_type': form_analysis.exercise_type,
-            'analysis_data': json.loads(form_analysis.analysis_data),
-            'recommendations': json.loads(form_analysis.recommendations) if form_analysis.recommendations else None
-        })
+    Args:
+        analysis_id (int): ID of the form analysis
+        
+    Returns:
+        dict: The form analysis, or None if it does not exist
+    """
+    stmt = select(
+        FormAnalysis.id, FormAnalysis.date, FormAnalysis.exercise_type,
+        FormAnalysis.analysis_data, FormAnalysis.recommendations
+    ).where(FormAnalysis.id == analysis_id)
+    
+    with engine.connect() as connection:
+        row = connection.execute(stmt).mappings().first()
+    
+    return dict(row) if row else None
+
+
+def _load_all_athletes():
+    """Query every athlete as a list of basic info dictionaries."""
+    with session_scope() as session:
+        rows = session.execute(
+            select(Athlete.id, Athlete.name, Athlete.sport, Athlete.team, Athlete.age)
+        ).all()
     
-    session.close()
-    return result
+    return [
+        {'id': row.id, 'name': row.name, 'sport': row.sport, 'team': row.team, 'age': row.age}
+        for row in rows
+    ]
 
 
 def get_all_athletes():
     """
     Get a list of all athletes in the database.
     
+    Served from a process-wide cache that is shared by all Streamlit sessions
+    and refreshed after any commit that creates or deletes athletes. The
+    returned dictionaries are shared and should be treated as read-only.
+    
     Returns:
         list: List of athlete dictionaries with basic info
     """
-    session = Session()
+    with _athlete_cache_lock:
+        version = _athlete_cache_version
+        if _athlete_cache['version'] == version:
+            return list(_athlete_cache['athletes'])
     
-    athletes = session.query(Athlete).all()
+    athletes = _load_all_athletes()
     
-    result = []
-    for athlete in athletes:
-        result.append({
-            'id': athlete.id,
-            'name': athlete.name,
-            'sport': athlete.sport,
-            'team': athlete.team,
-            'age': athlete.age
-        })
+    with _athlete_cache_lock:
+        # Only cache if no write committed while we were reading
+        if _athlete_cache_version == version:
+            _athlete_cache['version'] = version
+            _athlete_cache['athletes'] = athletes
+    
+    return list(athletes)
+
+
+def _athlete_filters(prefix=None, sport=None, team=None):
+    """
+    Build WHERE conditions for the athlete directory.
+    
+    The name prefix is expressed as a range (name >= prefix AND name < next
+    prefix) so it can use the name index on every backend. Matching is
+    case-sensitive.
+    
+    Args:
+        prefix (str, optional): Start of the athlete name
+        sport (str, optional): Exact sport to match
+        team (str, optional): Exact team to match
+        
+    Returns:
+        list: SQLAlchemy conditions
+    """
+    conditions = []
+    
+    if prefix:
+        conditions.append(Athlete.name >= prefix)
+        # The highest code point has no successor, so bump the last character
+        # before it; a prefix made only of such characters has no upper bound
+        stem = prefix.rstrip(chr(sys.maxunicode))
+        if stem:
+            upper = stem[:-1] + chr(ord(stem[-1]) + 1)
+            conditions.append(Athlete.name < upper)
+    if sport is not None:
+        conditions.append(Athlete.sport == sport)
+    if team is not None:
+        conditions.append(Athlete.team == team)
+    
+    return conditions
+
+
+def search_athletes(prefix=None, sport=None, team=None, after=None, limit=ATHLETE_PAGE_SIZE):
+    """
+    Get one page of the athlete directory, ordered by name.
+    
+    Uses keyset pagination: pass the returned cursor as `after` to get the next
+    page. Each page costs an index range scan of `limit` rows, however many
+    athletes exist.
+    
+    Args:
+        prefix (str, optional): Start of the athlete name (case-sensitive)
+        sport (str, optional): Only athletes in this sport
+        team (str, optional): Only athletes in this team
+        after (str, optional): Name of the last athlete on the previous page
+        limit (int): Maximum number of athletes to return
+        
+    Returns:
+        tuple: (list of athlete dictionaries, cursor for the next page or None)
+    """
+    conditions = _athlete_filters(prefix, sport, team)
+    if after is not None:
+        conditions.append(Athlete.name > after)
+    
+    stmt = (
+        select(Athlete.id, Athlete.name, Athlete.sport, Athlete.team, Athlete.age)
+        .where(*conditions)
+        .order_by(Athlete.name)
+        .limit(limit + 1)
+    )
+    
+    with engine.connect() as connection:
+        rows = connection.execute(stmt).all()
+    
+    athletes = [
+        {'id': row.id, 'name': row.name, 'sport': row.sport, 'team': row.team, 'age': row.age}
+        for row in rows[:limit]
+    ]
+    next_after = athletes[-1]['name'] if len(rows) > limit else None
+    
+    return athletes, next_after
+
+
+def iter_athletes(prefix=None, sport=None, team=None, page_size=ATHLETE_PAGE_SIZE):
+    """
+    Iterate over the athlete directory one page at a time.
+    
+    Args:
+        prefix (str, optional): Start of the athlete name (case-sensitive)
+        sport (str, optional): Only athletes in this sport
+        team (str, optional): Only athletes in this team
+        page_size (int): Number of athletes fetched per query
+        
+    Yields:
+        dict: Athlete dictionaries ordered by name
+    """
+    after = None
+    while True:
+        athletes, after = search_athletes(prefix, sport, team, after=after, limit=page_size)
+        yield from athletes
+        if after is None:
+            return
+
+
+def count_athletes(prefix=None, sport=None, team=None):
+    """
+    Count athletes matching the directory filters.
     
-    session.close()
-    return result
+    Counts are cached per filter combination and dropped together with the
+    cached athlete directory, so reruns only query after athletes change.
+    
+    Args:
+        prefix (str, optional): Start of the athlete name (case-sensitive)
+        sport (str, optional): Only athletes in this sport
+        team (str, optional): Only athletes in this team
+        
+    Returns:
+        int: Number of matching athletes
+    """
+    key = (prefix, sport, team)
+    with _athlete_cache_lock:
+        version = _athlete_cache_version
+        if _athlete_count_cache['version'] == version and key in _athlete_count_cache['counts']:
+            return _athlete_count_cache['counts'][key]
+    
+    stmt = select(func.count(Athlete.id)).where(*_athlete_filters(prefix, sport, team))
+    
+    with engine.connect() as connection:
+        count = connection.execute(stmt).scalar_one()
+    
+    with _athlete_cache_lock:
+        # Only cache if no write committed while we were counting
+        if _athlete_cache_version == version:
+            if _athlete_count_cache['version'] != version:
+                _athlete_count_cache['version'] = version
+                _athlete_count_cache['counts'] = {}
+            _athlete_count_cache['counts'][key] = count
+    
+    return count
 
 
 def delete_athlete(athlete_name):
@@ -308,19 +922,286 @@ def delete_athlete(athlete_name):
     Returns:
         bool: True if successful, False otherwise
     """
-    session = Session()
+    with session_scope() as session:
+        athlete = session.query(Athlete).filter_by(name=athlete_name).first()
+        
+        if not athlete:
+            return False
+        
+        session.delete(athlete)
+        _mark_athletes_changed(session)
     
-    athlete = session.query(Athlete).filter_by(name=athlete_name).first()
+    with _percentile_index_lock:
+        if _percentile_index is not None:
+            _percentile_index.remove_athlete(athlete_name)
     
-    if not athlete:
-        session.close()
-        return False
+    return True
+
+
+def _undated_timestamps(count):
+    """
+    Distinct timestamps for rows without a usable date.
     
-    session.delete(athlete)
-    session.commit()
-    session.close()
+    Rows get the current time plus one microsecond each, always later than
+    any timestamp handed out before, so undated rows never share the
+    (athlete_id, date, metric_name) key and each is stored as its own session.
     
-    return True
+    Args:
+        count (int): Number of timestamps
+        
+    Returns:
+        numpy.ndarray: datetime64[us] timestamps in increasing order
+    """
+    global _last_undated
+    with _undated_lock:
+        start = np.datetime64(datetime.datetime.utcnow(), 'us')
+        if _last_undated is not None and start <= _last_undated:
+            start = _last_undated + np.timedelta64(1, 'us')
+        stamps = start + np.arange(count).astype('timedelta64[us]')
+        if count:
+            _last_undated = stamps[-1]
+        return stamps
+
+
+def _melt_performance_frame(df, keep_athlete=False):
+    """
+    Convert a wide performance DataFrame into long (date, metric, value) rows.
+    
+    Every column that is not in NON_METRIC_COLUMNS is treated as a metric.
+    Values that cannot be converted to a number are dropped. Rows without a
+    date, or with one that cannot be parsed, get distinct timestamps from the
+    current time (see _undated_timestamps), so they are never merged.
+    
+    Args:
+        df (pd.DataFrame): Wide DataFrame with one column per metric
+        keep_athlete (bool): Whether to carry the Athlete column into the result
+        
+    Returns:
+        pd.DataFrame: Long DataFrame with date, metric_name and metric_value columns
+    """
+    id_columns = ['Athlete', 'date'] if keep_athlete else ['date']
+    
+    # Reset the index if 'date' is the index
+    if df.index.name == 'date':
+        df = df.reset_index()
+    
+    metric_columns = [col for col in df.columns if col not in NON_METRIC_COLUMNS]
+    if not metric_columns or df.empty:
+        return pd.DataFrame(columns=id_columns + ['metric_name', 'metric_value'])
+    
+    # Use Date column if available, otherwise the lowercase date column, otherwise current time
+    if 'Date' in df.columns:
+        dates = pd.to_datetime(df['Date'], errors='coerce').to_numpy(dtype='datetime64[us]', copy=True)
+    elif 'date' in df.columns:
+        dates = pd.to_datetime(df['date'], errors='coerce').to_numpy(dtype='datetime64[us]', copy=True)
+    else:
+        dates = np.full(len(df), np.datetime64('NaT'), dtype='datetime64[us]')
+    undated = np.isnat(dates)
+    dates[undated] = _undated_timestamps(int(undated.sum()))
+    dates = pd.Series(dates, index=df.index)
+    
+    wide = df[metric_columns].copy()
+    wide.insert(0, 'date', dates)
+    if keep_athlete:
+        wide.insert(0, 'Athlete', df['Athlete'])
+    
+    long_df = wide.melt(id_vars=id_columns, var_name='metric_name', value_name='metric_value')
+    # Skip NaN and non-numeric values
+    long_df['metric_value'] = pd.to_numeric(long_df['metric_value'], errors='coerce')
+    long_df = long_df.dropna(subset=['metric_value'])
+    long_df['metric_name'] = long_df['metric_name'].astype(str)
+    
+    return long_df.reset_index(drop=True)
+
+
+def _performance_rows(long_df):
+    """
+    Build insert parameter dictionaries for the performance_data table.
+    
+    Rows repeating the same (athlete_id, date, metric_name) keep the last
+    value, since a single upsert batch cannot touch the same row twice.
+    
+    Args:
+        long_df (pd.DataFrame): Output of _melt_performance_frame with an athlete_id column
+        
+    Returns:
+        list: List of column -> value dictionaries
+    """
+    long_df = long_df.drop_duplicates(subset=PERFORMANCE_DATA_KEY, keep='last')
+    athlete_ids = long_df['athlete_id'].astype(int).tolist()
+    dates = long_df['date'].dt.to_pydatetime()
+    names = long_df['metric_name'].tolist()
+    values = long_df['metric_value'].astype(float).tolist()
+    
+    return [
+        {
+            'athlete_id': athlete_id,
+            'date': date,
+            'metric_name': name,
+            'metric_value': value
+        }
+        for athlete_id, date, name, value in zip(athlete_ids, dates, names, values)
+    ]
+
+
+def _bulk_insert_performance_rows(session, rows, batch_size=BULK_INSERT_BATCH_SIZE):
+    """
+    Upsert performance rows in executemany batches within the session's transaction.
+    
+    Args:
+        session (Session): Open session, committed by the caller
+        rows (list): Parameter dictionaries from _performance_rows
+        batch_size (int): Maximum number of rows per executemany call
+    """
+    stmt = _upsert_performance_statement()
+    for start in range(0, len(rows), batch_size):
+        session.execute(stmt, rows[start:start + batch_size])
+
+
+def _write_performance_rows(session, long_df, batch_size=BULK_INSERT_BATCH_SIZE):
+    """
+    Upsert performance rows and update the metric summaries in one transaction.
+    
+    Args:
+        session (Session): Open session, committed by the caller
+        long_df (pd.DataFrame): Output of _melt_performance_frame with an athlete_id column
+        batch_size (int): Maximum number of rows per executemany call
+        
+    Returns:
+        list: Parameter dictionaries of the rows written
+    """
+    rows = _performance_rows(long_df)
+    if not rows:
+        return rows
+    
+    stored, latest = _stored_performance_state(session, rows)
+    _bulk_insert_performance_rows(session, rows, batch_size)
+    _update_metric_summaries(session, rows, stored, latest)
+    return rows
+
+
+def bulk_store_dataframe(athlete_name, df, batch_size=BULK_INSERT_BATCH_SIZE):
+    """
+    Store an athlete's performance DataFrame in a single transaction.
+    
+    The DataFrame is melted into long form in one vectorized step, the athlete
+    is resolved once, and all metric rows are written with batched executemany
+    inserts instead of one session and commit per metric value.
+    
+    Args:
+        athlete_name (str): The name of the athlete
+        df (pd.DataFrame): DataFrame with one column per metric
+        batch_size (int): Maximum number of rows per insert batch
+        
+    Returns:
+        int: Number of performance rows written
+    """
+    long_df = _melt_performance_frame(df)
+    
+    with session_scope() as session:
+        athlete = _get_or_create_athlete(session, athlete_name)
+        long_df['athlete_id'] = athlete.id
+        rows = _write_performance_rows(session, long_df, batch_size)
+    
+    _index_stored_rows(long_df, {athlete_name: (athlete.sport, athlete.team)})
+    
+    return len(rows)
+
+
+def _upsert_athletes(session, athletes):
+    """
+    Make sure every athlete exists and return their IDs.
+    
+    Missing athletes are created with a multi-row INSERT ... ON CONFLICT DO
+    NOTHING on SQLite and PostgreSQL; existing athletes are left untouched.
+    
+    Args:
+        session (Session): Open session, committed by the caller
+        athletes (pd.DataFrame): One row per athlete with name, sport and team columns
+        
+    Returns:
+        dict: Athlete name -> athlete ID
+    """
+    names = athletes['name'].tolist()
+    if not names:
+        return {}
+    
+    rows = [
+        {
+            'name': row.name,
+            'sport': None if pd.isna(row.sport) else str(row.sport),
+            'team': None if pd.isna(row.team) else str(row.team)
+        }
+        for row in athletes.itertuples(index=False)
+    ]
+    
+    _mark_athletes_changed(session)
+    
+    if engine.dialect.name in ('postgresql', 'sqlite'):
+        # Chunked to stay below the bound-parameter limit of a single statement
+        for start in range(0, len(rows), ATHLETE_UPSERT_CHUNK_SIZE):
+            stmt = _dialect_insert(Athlete).values(rows[start:start + ATHLETE_UPSERT_CHUNK_SIZE])
+            session.execute(stmt.on_conflict_do_nothing(index_elements=['name']))
+    else:
+        existing = set(session.scalars(select(Athlete.name).where(Athlete.name.in_(names))))
+        missing = [row for row in rows if row['name'] not in existing]
+        if missing:
+            session.execute(insert(Athlete), missing)
+    
+    return dict(session.execute(select(Athlete.name, Athlete.id).where(Athlete.name.in_(names))).all())
+
+
+def store_team_dataframe(df, batch_size=BULK_INSERT_BATCH_SIZE):
+    """
+    Store performance data for every athlete in a team DataFrame in one transaction.
+    
+    All athletes are upserted together and all metric rows are bulk inserted
+    in a single transaction, instead of one store_dataframe call per athlete.
+    Optional Sport and Team columns are used when creating new athletes.
+    
+    Args:
+        df (pd.DataFrame): DataFrame with an Athlete column and one column per metric
+        batch_size (int): Maximum number of rows per insert batch
+        
+    Returns:
+        dict: Athlete name -> number of performance rows written
+    """
+    if 'Athlete' not in df.columns:
+        raise ValueError("Team DataFrame must have an 'Athlete' column")
+    
+    df = df[df['Athlete'].notna()]
+    if df.empty:
+        return {}
+    
+    df = df.assign(Athlete=df['Athlete'].astype(str))
+    
+    # One row per athlete, taking the sport/team of their first row
+    first_rows = df.drop_duplicates('Athlete')
+    athletes = pd.DataFrame({
+        'name': first_rows['Athlete'],
+        'sport': first_rows['Sport'] if 'Sport' in df.columns else None,
+        'team': first_rows['Team'] if 'Team' in df.columns else None
+    })
+    
+    long_df = _melt_performance_frame(df, keep_athlete=True)
+    
+    with session_scope() as session:
+        athlete_ids = _upsert_athletes(session, athletes)
+        long_df['athlete_id'] = long_df['Athlete'].map(athlete_ids)
+        _write_performance_rows(session, long_df, batch_size)
+        
+        # Stored cohorts, since existing athletes keep their sport and team
+        cohorts = {
+            row.name: (row.sport, row.team)
+            for row in session.execute(
+                select(Athlete.name, Athlete.sport, Athlete.team).where(Athlete.name.in_(list(athlete_ids)))
+            )
+        }
+    
+    _index_stored_rows(long_df, cohorts)
+    
+    counts = long_df.groupby('Athlete', sort=False).size()
+    return {name: int(counts.get(name, 0)) for name in athletes['name']}
 
 
 def store_dataframe(athlete_name, df, data_type="performance"):
@@ -337,45 +1218,7 @@ def store_dataframe(athlete_name, df, data_type="performance"):
     """
     if data_type == "performance":
         # Assumes DataFrame has columns for metrics and rows for dates/observations
-        athlete = get_or_create_athlete(athlete_name)
-        
-        # Reset the index if 'date' is the index
-        if df.index.name == 'date':
-            df = df.reset_index()
-        
-        # Get all column names except non-metric columns
-        non_metric_columns = ['Athlete', 'Date', 'Session', 'date']
-        metric_columns = [col for col in df.columns if col not in non_metric_columns]
-        
-        # Process each row
-        for _, row in df.iterrows():
-            for metric in metric_columns:
-                if pd.notna(row[metric]):  # Skip NaN values
-                    try:
-                        # Try to convert to float, skip if not possible
-                        metric_value = float(row[metric])
-                        
-                        # Use Date column if available, otherwise current time
-                        date_val = None
-                        if 'Date' in row:
-                            try:
-                                # Try to parse the date
-                                date_val = pd.to_datetime(row['Date'])
-                            except:
-                                date_val = datetime.datetime.utcnow()
-                        else:
-                            date_val = row.get('date', datetime.datetime.utcnow())
-                        
-                        save_performance_data(
-                            athlete_name=athlete_name,
-                            metric_name=metric,
-                            metric_value=metric_value,
-                            date=date_val
-                        )
-                    except (ValueError, TypeError):
-                        # Skip non-numeric values
-                        continue
-        
+        bulk_store_dataframe(athlete_name, df)
         return True
     
     elif data_type == "form_analysis":
@@ -386,19 +1229,40 @@ def store_dataframe(athlete_name, df, data_type="performance"):
     return False
 
 
-def load_dataframe(athlete_name, data_type="performance"):
+def load_dataframe(athlete_name, data_type="performance", start=None, end=None, metrics=None, limit=None,
+                   source="database"):
     """
     Load data for an athlete from the database into a DataFrame.
     
+    For performance data the date, metric and limit filters are applied in SQL,
+    or pushed down to the Parquet files when reading from the columnar store,
+    so loading a recent window costs the same regardless of history size.
+    
     Args:
         athlete_name (str): The name of the athlete
         data_type (str): Type of data ("performance" or "form_analysis")
+        start (datetime or str, optional): Earliest date to include (performance only)
+        end (datetime or str, optional): Latest date to include (performance only)
+        metrics (list or str, optional): Metric names to include (performance only)
+        limit (int, optional): Only include the most recent `limit` measurement dates (performance only)
+        source (str): "database", or "parquet" to read performance data from
+            the Parquet store at PERFORMANCE_STORE_PATH
         
     Returns:
         pd.DataFrame: The loaded DataFrame
     """
+    if data_type == "performance" and source == "parquet":
+        df = read_performance_store(athletes=[athlete_name], start=start, end=end, metrics=metrics)
+        if df.empty:
+            return pd.DataFrame()
+        # Same layout as the database path: a date column followed by the metrics
+        df = df.drop(columns='Athlete').rename(columns={'Date': 'date'})
+        if limit is not None:
+            df = df.tail(limit).reset_index(drop=True)
+        return df
+    
     if data_type == "performance":
-        return get_athlete_performance_data(athlete_name)
+        return get_athlete_performance_data(athlete_name, start=start, end=end, metrics=metrics, limit=limit)
     
     elif data_type == "form_analysis":
         # Convert form analysis data to DataFrame format
@@ -406,28 +1270,420 @@ def load_dataframe(athlete_name, data_type="performance"):
         if not form_analyses:
             return pd.DataFrame()
         
-        # This will depend on how you want to structure form analysis data in a DataFrame
-        df_data = []
-        for analysis in form_analyses:
-            row = {
-                'date': analysis['date'],
-                'exercise_type': analysis['exercise_type']
-            }
-            # Flatten analysis_data dictionary
-            for key, value in analysis['analysis_data'].items():
-                row[f'analysis_{key}'] = value
-            
-            # Add recommendations if available
-            if analysis['recommendations']:
-                for key, value in analysis['recommendations'].items():
-                    row[f'rec_{key}'] = value
-            
-            df_data.append(row)
-        
-        return pd.DataFrame(df_data)
+        analyses = pd.DataFrame(form_analyses)
+        
+        # Flatten the analysis_data and recommendations dictionaries into prefixed columns
+        analysis_columns = pd.DataFrame([data or {} for data in analyses['analysis_data']]).add_prefix('analysis_')
+        rec_columns = pd.DataFrame([recs or {} for recs in analyses['recommendations']]).add_prefix('rec_')
+        
+        return pd.concat([analyses[['date', 'exercise_type']], analysis_columns, rec_columns], axis=1)
     
     return pd.DataFrame()
 
 
+def _nullable_float(value):
+    """Convert NaN to None for nullable float columns."""
+    return None if value is None or value != value else float(value)
+
+
+def _metric_summary_row(athlete_id, metric_name, stats):
+    """Row dictionary for the metric_summaries upsert."""
+    return {
+        'athlete_id': athlete_id,
+        'metric_name': metric_name,
+        'count': stats.count,
+        'mean': stats.mean,
+        'm2': stats.m2,
+        'min_value': _nullable_float(stats.min),
+        'max_value': _nullable_float(stats.max),
+        'recent_value': _nullable_float(stats.recent),
+        'c_xy': stats.c_xy,
+        'median_state': stats.median_estimator.to_dict(),
+        'updated_at': datetime.datetime.utcnow()
+    }
+
+
+def _save_metric_summaries(session, stats_by_key):
+    """Upsert running stats keyed by (athlete_id, metric) inside an existing unit of work."""
+    rows = [_metric_summary_row(athlete_id, metric, stats) for (athlete_id, metric), stats in stats_by_key.items()]
+    if not rows:
+        return
+    
+    table = MetricSummary.__table__
+    if engine.dialect.name in ('postgresql', 'sqlite'):
+        stmt = _dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['athlete_id', 'metric_name'],
+            set_={col: stmt.excluded[col] for col in rows[0] if col not in ('athlete_id', 'metric_name')}
+        )
+        session.execute(stmt, rows)
+    else:
+        metrics_by_athlete = {}
+        for athlete_id, metric in stats_by_key:
+            metrics_by_athlete.setdefault(athlete_id, []).append(metric)
+        for athlete_id, metrics in metrics_by_athlete.items():
+            session.execute(
+                delete(table).where(table.c.athlete_id == athlete_id, table.c.metric_name.in_(metrics))
+            )
+        session.execute(insert(table), rows)
+
+
+def _save_metric_stats(session, athlete_id, stats_by_metric):
+    """Upsert running stats for one athlete inside an existing unit of work."""
+    _save_metric_summaries(session, {(athlete_id, metric): stats for metric, stats in stats_by_metric.items()})
+
+
+def _load_metric_summaries(session, athlete_ids):
+    """Running stats keyed by (athlete_id, metric) inside an existing unit of work."""
+    results = {}
+    for ids in _athlete_id_chunks(athlete_ids):
+        for summary in session.scalars(select(MetricSummary).where(MetricSummary.athlete_id.in_(ids))):
+            results[(summary.athlete_id, summary.metric_name)] = RunningMetricStats.from_dict({
+                'count': summary.count,
+                'mean': summary.mean,
+                'm2': summary.m2,
+                'min': summary.min_value,
+                'max': summary.max_value,
+                'recent': summary.recent_value,
+                'c_xy': summary.c_xy,
+                'median_state': summary.median_state
+            })
+    return results
+
+
+def _load_metric_stats(session, athlete_id):
+    """Running stats for one athlete inside an existing unit of work."""
+    return {metric: stats for (_, metric), stats in _load_metric_summaries(session, [athlete_id]).items()}
+
+
+def _athlete_id_chunks(athlete_ids):
+    """Distinct athlete IDs in chunks small enough for one IN clause."""
+    athlete_ids = sorted(set(athlete_ids))
+    for start in range(0, len(athlete_ids), ATHLETE_UPSERT_CHUNK_SIZE):
+        yield athlete_ids[start:start + ATHLETE_UPSERT_CHUNK_SIZE]
+
+
+def _stored_performance_state(session, rows):
+    """
+    What is already stored for a batch of performance rows, read before it is written.
+    
+    Args:
+        session (Session): Open session of the ingest transaction
+        rows (list): Parameter dictionaries from _performance_rows
+        
+    Returns:
+        tuple: (stored, latest) dicts. stored maps the (athlete_id, date,
+            metric_name) keys of the batch that exist to their stored value;
+            latest maps every (athlete_id, metric_name) of the batch with
+            history to its latest stored date
+    """
+    table = PerformanceData.__table__
+    metrics = sorted({row['metric_name'] for row in rows})
+    start = min(row['date'] for row in rows)
+    end = max(row['date'] for row in rows)
+    
+    stored, latest = {}, {}
+    for ids in _athlete_id_chunks(row['athlete_id'] for row in rows):
+        in_batch = table.c.athlete_id.in_(ids) & table.c.metric_name.in_(metrics)
+        for athlete_id, date, metric, value in session.execute(
+            select(table.c.athlete_id, table.c.date, table.c.metric_name, table.c.metric_value)
+            .where(in_batch, table.c.date.between(start, end))
+        ):
+            stored[(athlete_id, date, metric)] = value
+        for athlete_id, metric, date in session.execute(
+            select(table.c.athlete_id, table.c.metric_name, func.max(table.c.date))
+            .where(in_batch)
+            .group_by(table.c.athlete_id, table.c.metric_name)
+        ):
+            latest[(athlete_id, metric)] = date
+    return stored, latest
+
+
+def _metric_history_stats(session, pairs):
+    """
+    Running stats of (athlete_id, metric) pairs computed from their full stored history.
+    
+    Args:
+        session (Session): Open session; sees rows written earlier in its transaction
+        pairs (set): (athlete_id, metric_name) tuples
+        
+    Returns:
+        dict: (athlete_id, metric) -> RunningMetricStats
+    """
+    table = PerformanceData.__table__
+    metrics = sorted({metric for _, metric in pairs})
+    history = []
+    for ids in _athlete_id_chunks(athlete_id for athlete_id, _ in pairs):
+        history += session.execute(
+            select(table.c.athlete_id, table.c.metric_name, table.c.metric_value)
+            .where(table.c.athlete_id.in_(ids), table.c.metric_name.in_(metrics))
+            .order_by(table.c.athlete_id, table.c.metric_name, table.c.date)
+        ).all()
+    
+    history = pd.DataFrame(history, columns=['athlete', 'metric', 'value'])
+    history = history[pd.MultiIndex.from_frame(history[['athlete', 'metric']]).isin(list(pairs))]
+    if history.empty:
+        return {}
+    return {(int(athlete_id), metric): stats for (athlete_id, metric), stats in batch_stats(history).items()}
+
+
+def _update_metric_summaries(session, rows, stored, latest):
+    """
+    Bring the stored metric summaries in line with a batch the upsert just wrote.
+    
+    Rows the upsert inserted are folded into the stored summaries in date
+    order. Rows that were already stored with the same value change nothing,
+    so re-ingesting a file leaves the summaries as they are. An (athlete,
+    metric) is instead rebuilt from its full history when a stored value
+    changed, when new rows are dated before its latest stored row (a
+    backfill would break the session order), or when it has history but no
+    summary yet (data stored before summaries were kept).
+    
+    Args:
+        session (Session): Open session of the ingest transaction
+        rows (list): The written parameter dictionaries
+        stored (dict): First result of _stored_performance_state
+        latest (dict): Second result of _stored_performance_state
+    """
+    new_rows = []
+    first_dates = {}
+    rebuild = set()
+    for row in rows:
+        key = (row['athlete_id'], row['metric_name'])
+        stored_value = stored.get((row['athlete_id'], row['date'], row['metric_name']))
+        if stored_value is None:
+            new_rows.append(row)
+            first_dates[key] = min(first_dates.get(key, row['date']), row['date'])
+        elif stored_value != row['metric_value']:
+            rebuild.add(key)
+    if not new_rows and not rebuild:
+        return
+    
+    summaries = _load_metric_summaries(session, {athlete_id for athlete_id, _ in first_dates})
+    for key, first_date in first_dates.items():
+        last_date = latest.get(key)
+        if last_date is not None and (key not in summaries or first_date < last_date):
+            rebuild.add(key)
+    
+    appended = sorted(
+        (row for row in new_rows if (row['athlete_id'], row['metric_name']) not in rebuild),
+        key=lambda row: row['date']
+    )
+    updated = {}
+    if len(appended) > SUMMARY_BATCH_THRESHOLD:
+        batch = pd.DataFrame({
+            'athlete': [row['athlete_id'] for row in appended],
+            'metric': [row['metric_name'] for row in appended],
+            'value': [row['metric_value'] for row in appended]
+        })
+        for (athlete_id, metric), stats in batch_stats(batch).items():
+            key = (int(athlete_id), metric)
+            summary = summaries.get(key, RunningMetricStats())
+            summary.merge(stats)
+            updated[key] = summary
+    else:
+        # Grouped batch stats cost more than they save for a few rows
+        for row in appended:
+            key = (row['athlete_id'], row['metric_name'])
+            summary = updated.get(key) or summaries.get(key, RunningMetricStats())
+            summary.update(row['metric_value'])
+            updated[key] = summary
+    if rebuild:
+        updated.update(_metric_history_stats(session, rebuild))
+    
+    _save_metric_summaries(session, updated)
+
+
+def save_metric_stats(athlete_name, stats_by_metric):
+    """
+    Persist running metric statistics for an athlete, replacing stored ones.
+    
+    Args:
+        athlete_name (str): The name of the athlete
+        stats_by_metric (dict): Metric name -> RunningMetricStats
+    """
+    with session_scope() as session:
+        athlete = _get_or_create_athlete(session, athlete_name)
+        _save_metric_stats(session, athlete.id, stats_by_metric)
+
+
+def load_metric_stats(athlete_name):
+    """
+    Load the stored running metric statistics of an athlete.
+    
+    Args:
+        athlete_name (str): The name of the athlete
+        
+    Returns:
+        dict: Metric name -> RunningMetricStats (empty if none are stored)
+    """
+    with session_scope() as session:
+        athlete = session.query(Athlete).filter_by(name=athlete_name).first()
+        if not athlete:
+            return {}
+        return _load_metric_stats(session, athlete.id)
+
+
+def update_metric_stats(athlete_name, df):
+    """
+    Store new measurements and return the athlete's updated running statistics.
+    
+    The summaries are maintained by every performance write, in the same
+    transaction, so this is bulk_store_dataframe followed by
+    get_metric_summaries. Rows that are already stored are not counted again.
+    
+    Args:
+        athlete_name (str): The name of the athlete
+        df (pd.DataFrame): Performance rows (wide format)
+        
+    Returns:
+        dict: Metric name -> updated summary dict
+    """
+    bulk_store_dataframe(athlete_name, df)
+    return get_metric_summaries(athlete_name)
+
+
+def rebuild_metric_summaries(athlete_name):
+    """
+    Recompute an athlete's stored metric summaries from their full history.
+    
+    Args:
+        athlete_name (str): The name of the athlete
+        
+    Returns:
+        dict: Metric name -> summary dict (empty if the athlete has no data)
+    """
+    with session_scope() as session:
+        athlete = session.query(Athlete).filter_by(name=athlete_name).first()
+        if not athlete:
+            return {}
+        
+        metrics = session.scalars(
+            select(PerformanceData.metric_name).where(PerformanceData.athlete_id == athlete.id).distinct()
+        ).all()
+        stats = _metric_history_stats(session, {(athlete.id, metric) for metric in metrics})
+        session.execute(delete(MetricSummary.__table__).where(MetricSummary.athlete_id == athlete.id))
+        _save_metric_summaries(session, stats)
+    
+    return {metric: summary.summary() for (_, metric), summary in stats.items()}
+
+
+def get_metric_summaries(athlete_name):
+    """
+    Precomputed per-metric summaries of an athlete.
+    
+    Summaries are kept up to date as performance rows are stored. Athletes
+    whose data predates them are summarized from their history once, on
+    first read.
+    
+    Args:
+        athlete_name (str): The name of the athlete
+        
+    Returns:
+        dict: Metric name -> dict with mean, median, min, max, std, recent,
+            trend, slope and count, as in process_performance_data
+    """
+    summaries = {metric: stats.summary() for metric, stats in load_metric_stats(athlete_name).items()}
+    if not summaries:
+        summaries = rebuild_metric_summaries(athlete_name)
+    return summaries
+
+
+def _load_percentile_index():
+    """Build a cohort percentile index from each athlete's latest stored values."""
+    latest = select(
+        PerformanceData.athlete_id,
+        PerformanceData.metric_name,
+        func.max(PerformanceData.date).label('date')
+    ).group_by(PerformanceData.athlete_id, PerformanceData.metric_name).subquery()
+    
+    stmt = select(
+        Athlete.name.label('athlete'),
+        Athlete.sport.label('sport'),
+        Athlete.team.label('team'),
+        PerformanceData.date,
+        PerformanceData.metric_name.label('metric'),
+        PerformanceData.metric_value.label('value')
+    ).join(PerformanceData, PerformanceData.athlete_id == Athlete.id).join(
+        latest,
+        (latest.c.athlete_id == PerformanceData.athlete_id)
+        & (latest.c.metric_name == PerformanceData.metric_name)
+        & (latest.c.date == PerformanceData.date)
+    )
+    
+    with engine.connect() as connection:
+        rows = pd.DataFrame(connection.execute(stmt).mappings().all(),
+                            columns=['athlete', 'sport', 'team', 'date', 'metric', 'value'])
+    
+    index = CohortPercentileIndex()
+    index.update(rows)
+    return index
+
+
+def _index_stored_rows(long_df, cohorts):
+    """
+    Fold newly stored performance rows into the percentile index, if it is built.
+    
+    Args:
+        long_df (pd.DataFrame): Output of _melt_performance_frame; rows without
+            an Athlete column belong to the single athlete in cohorts
+        cohorts (dict): Athlete name -> (sport, team)
+    """
+    with _percentile_index_lock:
+        if _percentile_index is None or long_df.empty:
+            return
+        
+        athletes = long_df['Athlete'] if 'Athlete' in long_df.columns else next(iter(cohorts))
+        rows = pd.DataFrame({
+            'athlete': athletes,
+            'date': long_df['date'],
+            'metric': long_df['metric_name'],
+            'value': long_df['metric_value']
+        })
+        rows['sport'] = rows['athlete'].map(lambda name: cohorts.get(name, (None, None))[0])
+        rows['team'] = rows['athlete'].map(lambda name: cohorts.get(name, (None, None))[1])
+        _percentile_index.update(rows)
+
+
+def get_percentile_index():
+    """
+    Cohort percentile index over every athlete in the database.
+    
+    Built from each athlete's latest value of every metric on first use and
+    shared by all sessions. Performance rows stored through this module are
+    folded in as they are written; call invalidate_percentile_index() after
+    writing from elsewhere.
+    
+    Returns:
+        CohortPercentileIndex: The shared index
+    """
+    global _percentile_index
+    with _percentile_index_lock:
+        if _percentile_index is None:
+            _percentile_index = _load_percentile_index()
+        return _percentile_index
+
+
+def invalidate_percentile_index():
+    """Drop the shared percentile index so the next use rebuilds it."""
+    global _percentile_index
+    with _percentile_index_lock:
+        _percentile_index = None
+
+
+def get_cohort_percentiles(athlete_name, cohort='all'):
+    """
+    Rank and percentile of an athlete's latest value of every metric.
+    
+    Args:
+        athlete_name (str): The name of the athlete
+        cohort (str): 'all', 'sport' or 'team'
+        
+    Returns:
+        dict: Metric name -> dict with value, group, rank, percentile and cohort_size
+    """
+    return get_percentile_index().athlete_percentiles(athlete_name, cohort)
+
+
 # Initialize database tables if they don't exist
 init_db()
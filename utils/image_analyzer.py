@@ -2,6 +2,9 @@ import cv2
 import numpy as np
 import logging
 
+from utils.pose_geometry import angles_from_points, vertical_angles_from_points
+from utils.pose_backends import get_pose_backend
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,32 +23,9 @@ def analyze_form(image):
     annotated_img = image.copy()
     
     try:
-        # Convert to grayscale for processing
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # For a real implementation, we would use a pose estimation model
-        # For this demo, we'll simulate pose detection with basic image processing
-        
-        # Simulate detecting key body points (would use a proper pose estimation model in production)
-        height, width = gray.shape
-        
-        # Simulate detected pose keypoints (just for demonstration)
-        keypoints = {
-            'head': (width // 2, height // 5),
-            'neck': (width // 2, height // 4),
-            'right_shoulder': (width // 2 - width // 8, height // 3),
-            'left_shoulder': (width // 2 + width // 8, height // 3),
-            'right_elbow': (width // 2 - width // 5, height // 2),
-            'left_elbow': (width // 2 + width // 5, height // 2),
-            'right_wrist': (width // 2 - width // 4, height // 2 + height // 8),
-            'left_wrist': (width // 2 + width // 4, height // 2 + height // 8),
-            'right_hip': (width // 2 - width // 10, height // 2 + height // 6),
-            'left_hip': (width // 2 + width // 10, height // 2 + height // 6),
-            'right_knee': (width // 2 - width // 8, height // 2 + height // 3),
-            'left_knee': (width // 2 + width // 8, height // 2 + height // 3),
-            'right_ankle': (width // 2 - width // 6, height - height // 8),
-            'left_ankle': (width // 2 + width // 6, height - height // 8),
-        }
+        # Detect key body points with the configured pose backend (a CPU pose
+        # model if one is installed, otherwise the heuristic demo layout)
+        keypoints = get_pose_backend().detect(image, still=True)
         
         # Draw the keypoints on the annotated image
         for point_name, point in keypoints.items():
@@ -64,6 +44,9 @@ def analyze_form(image):
         ]
         
         for connection in connections:
+            # Skip limbs with a joint the model did not detect
+            if connection[0] not in keypoints or connection[1] not in keypoints:
+                continue
             pt1 = keypoints[connection[0]]
             pt2 = keypoints[connection[1]]
             cv2.line(annotated_img, pt1, pt2, (0, 0, 255), 2)
@@ -170,9 +153,12 @@ def analyze_keypoints(keypoints, image_shape):
             form_analysis["Balance"].append("Knees not properly aligned with ankles - may affect stability")
         
         # Joint angle analysis
-        # Calculate knee angles
-        right_knee_angle = calculate_angle(keypoints['right_hip'], keypoints['right_knee'], keypoints['right_ankle'])
-        left_knee_angle = calculate_angle(keypoints['left_hip'], keypoints['left_knee'], keypoints['left_ankle'])
+        # Calculate both knee angles in one kernel call
+        right_knee_angle, left_knee_angle = angles_from_points(
+            [keypoints['right_hip'], keypoints['left_hip']],
+            [keypoints['right_knee'], keypoints['left_knee']],
+            [keypoints['right_ankle'], keypoints['left_ankle']]
+        )
         
         form_analysis["Joint Angles"].append(f"Right knee angle: {right_knee_angle:.1f}°")
         form_analysis["Joint Angles"].append(f"Left knee angle: {left_knee_angle:.1f}°")
@@ -206,30 +192,15 @@ def calculate_angle(point1, point2, point3=None, vertical=False):
     Returns:
         float: Angle in degrees
     """
+    # Single-frame case of the batched kernels in utils.pose_geometry
     if vertical:
-        # Calculate angle with respect to vertical
-        dy = point2[1] - point1[1]
-        dx = point2[0] - point1[0]
-        angle_rad = abs(np.arctan2(dx, dy))  # Vertical is (0, 1) in image coordinates
-        angle_deg = np.degrees(angle_rad)
-        return angle_deg
+        # Vertical is (0, 1) in image coordinates
+        return vertical_angles_from_points(point1, point2)
     
     if point3 is None:
         raise ValueError("For non-vertical angle calculation, three points are required")
     
-    # Calculate angle between three points
-    a = np.array(point1)
-    b = np.array(point2)
-    c = np.array(point3)
-    
-    ba = a - b
-    bc = c - b
-    
-    cosine_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc))
-    angle_rad = np.arccos(np.clip(cosine_angle, -1.0, 1.0))
-    angle_deg = np.degrees(angle_rad)
-    
-    return angle_deg
+    return angles_from_points(point1, point2, point3)
 
 def detect_pose(frame):
     """
@@ -241,35 +212,9 @@ def detect_pose(frame):
     Returns:
         dict: Detected pose keypoints
     """
-    # For a real implementation, we would use a pose estimation model
-    # For this demo, we'll simulate pose detection with basic image processing
-    
+    # The pose backend is chosen once per process (see utils.pose_backends)
     try:
-        # Convert to grayscale for processing
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        
-        # Simulate detected pose keypoints (just for demonstration)
-        height, width = gray.shape
-        
-        # Simulate detected pose with some random variation to suggest movement
-        keypoints = {
-            'head': (width // 2 + np.random.randint(-5, 5), height // 5 + np.random.randint(-3, 3)),
-            'neck': (width // 2 + np.random.randint(-3, 3), height // 4 + np.random.randint(-3, 3)),
-            'right_shoulder': (width // 2 - width // 8 + np.random.randint(-5, 5), height // 3 + np.random.randint(-3, 3)),
-            'left_shoulder': (width // 2 + width // 8 + np.random.randint(-5, 5), height // 3 + np.random.randint(-3, 3)),
-            'right_elbow': (width // 2 - width // 5 + np.random.randint(-8, 8), height // 2 + np.random.randint(-5, 5)),
-            'left_elbow': (width // 2 + width // 5 + np.random.randint(-8, 8), height // 2 + np.random.randint(-5, 5)),
-            'right_wrist': (width // 2 - width // 4 + np.random.randint(-10, 10), height // 2 + height // 8 + np.random.randint(-8, 8)),
-            'left_wrist': (width // 2 + width // 4 + np.random.randint(-10, 10), height // 2 + height // 8 + np.random.randint(-8, 8)),
-            'right_hip': (width // 2 - width // 10 + np.random.randint(-3, 3), height // 2 + height // 6 + np.random.randint(-3, 3)),
-            'left_hip': (width // 2 + width // 10 + np.random.randint(-3, 3), height // 2 + height // 6 + np.random.randint(-3, 3)),
-            'right_knee': (width // 2 - width // 8 + np.random.randint(-5, 5), height // 2 + height // 3 + np.random.randint(-8, 8)),
-            'left_knee': (width // 2 + width // 8 + np.random.randint(-5, 5), height // 2 + height // 3 + np.random.randint(-8, 8)),
-            'right_ankle': (width // 2 - width // 6 + np.random.randint(-5, 5), height - height // 8 + np.random.randint(-5, 5)),
-            'left_ankle': (width // 2 + width // 6 + np.random.randint(-5, 5), height - height // 8 + np.random.randint(-5, 5)),
-        }
-        
-        return keypoints
+        return get_pose_backend().detect(frame)
     
     except Exception as e:
         logger.error(f"Error detecting pose: {e}")
@@ -0,0 +1,292 @@
+"""
+Chunked streaming ingest for large performance CSV files.
+
+Wearable exports can have millions of rows, too many to hold in a session
+DataFrame. stream_performance_csv reads a CSV in chunks with explicit dtypes,
+validates its columns, folds each chunk into per-athlete running statistics
+and spills the raw rows to the database or a Parquet file. The caller keeps
+only the returned IngestResult: the summaries plus a handle to the raw rows.
+"""
+import datetime
+import logging
+import os
+
+import pandas as pd
+
+from utils.metric_stats import MetricStatsStore
+
+# pyarrow is optional; it is only needed to spill to Parquet
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+# Rows read per chunk
+INGEST_CHUNK_SIZE = 100_000
+
+# Columns every performance file must have
+REQUIRED_COLUMNS = ['Athlete', 'Date']
+
+# Optional text columns that are not metrics
+TEXT_COLUMNS = ['Session', 'Notes', 'Sport', 'Team']
+
+SPILL_TARGETS = ('database', 'parquet', None)
+
+
+def read_csv_schema(source):
+    """
+    Read the header of a CSV file and validate it.
+    
+    Args:
+        source (str or file-like): Path or open file; file positions are restored
+        
+    Returns:
+        dict: Column name -> dtype to read it with
+        
+    Raises:
+        ValueError: If required columns are missing or there are no metric columns
+    """
+    position = source.tell() if hasattr(source, 'tell') else None
+    columns = pd.read_csv(source, nrows=0).columns.tolist()
+    if position is not None:
+        source.seek(position)
+    
+    return validate_schema(columns)
+
+
+def validate_schema(columns):
+    """
+    Check performance file columns and choose their dtypes.
+    
+    Athlete, Date and the text columns are read as strings; every other
+    column is a float32 metric.
+    
+    Args:
+        columns (list): Column names from the file header
+        
+    Returns:
+        dict: Column name -> dtype
+        
+    Raises:
+        ValueError: If required columns are missing or there are no metric columns
+    """
+    missing = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing:
+        raise ValueError(f"Performance data is missing required columns: {', '.join(missing)}")
+    
+    duplicated = sorted({col for col in columns if columns.count(col) > 1})
+    if duplicated:
+        raise ValueError(f"Performance data has duplicate columns: {', '.join(duplicated)}")
+    
+    text_columns = REQUIRED_COLUMNS + TEXT_COLUMNS
+    metrics = [col for col in columns if col not in text_columns]
+    if not metrics:
+        raise ValueError("Performance data has no metric columns")
+    
+    return {col: ('string' if col in text_columns else 'float32') for col in columns}
+
+
+class IngestResult:
+    """Summaries of an ingested file plus a handle to its raw rows."""
+    
+    def __init__(self, summaries, metrics, rows, spill=None, location=None, date_ranges=None):
+        self.summaries = summaries
+        self.metrics = metrics
+        self.rows = rows
+        self.spill = spill
+        self.location = location
+        # Athlete -> (first date, last date) of the rows spilled to the database;
+        # None leaves that side of the range open
+        self.date_ranges = date_ranges or {}
+    
+    @property
+    def athletes(self):
+        """Names of the ingested athletes."""
+        return sorted({athlete for athlete, _ in self.summaries.stats})
+    
+    def athlete_summary(self, athlete):
+        """
+        Per-metric summaries of one athlete.
+        
+        Args:
+            athlete (str): The athlete's name
+            
+        Returns:
+            dict: Metric name -> summary dict
+        """
+        return self.summaries.athlete_summary(athlete)
+    
+    def discard(self):
+        """Delete the Parquet spill file, if any; database rows are kept."""
+        if self.spill == 'parquet' and self.location and os.path.exists(self.location):
+            os.remove(self.location)
+    
+    def load(self, athlete):
+        """
+        Load one athlete's raw rows back from the spill.
+        
+        A database spill is read back for the dates and metrics of this file
+        only, so earlier uploads outside that range are not included. Rows
+        the athlete already had stored inside the range are returned too, as
+        the database does not record which upload stored a row.
+        
+        Args:
+            athlete (str): The athlete's name
+            
+        Returns:
+            pd.DataFrame: The athlete's rows (empty if nothing was spilled)
+        """
+        if self.spill == 'parquet':
+            return pq.read_table(self.location, filters=[('Athlete', '==', athlete)]).to_pandas()
+        if self.spill == 'database':
+            if athlete not in self.date_ranges:
+                return pd.DataFrame()
+            from utils.database import load_dataframe
+            first, last = self.date_ranges[athlete]
+            data = load_dataframe(athlete, start=first, end=last, metrics=self.metrics)
+            if not data.empty:
+                data = data.rename(columns={'date': 'Date'})
+                data.insert(0, 'Athlete', athlete)
+            return data
+        return pd.DataFrame()
+
+
+def _prepare_chunk(chunk):
+    """Parse dates and drop rows without an athlete."""
+    chunk = chunk[chunk['Athlete'].notna()]
+    return chunk.assign(Date=pd.to_datetime(chunk['Date'], errors='coerce'))
+
+
+def _read_chunks(source, dtypes, chunksize):
+    """
+    Parsed chunks of a CSV, each sorted by date.
+    
+    Only reading and parsing is covered by the schema error; errors raised
+    while the caller handles a chunk are not relabelled.
+    
+    Yields:
+        pd.DataFrame: The next non-empty chunk
+        
+    Raises:
+        ValueError: If a chunk does not match the expected schema
+    """
+    try:
+        for chunk in pd.read_csv(source, dtype=dtypes, chunksize=chunksize):
+            chunk = _prepare_chunk(chunk).sort_values('Date', kind='stable')
+            if not chunk.empty:
+                yield chunk
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Performance data does not match the expected schema: {e}") from e
+
+
+def _update_date_ranges(date_ranges, chunk, started):
+    """
+    Widen each athlete's spilled date range with a chunk.
+    
+    The database stores undated rows at the time of ingest, so an athlete with
+    undated rows gets a range that starts no later than the ingest and has no
+    upper bound.
+    
+    Args:
+        date_ranges (dict): Athlete -> (first, last), updated in place
+        chunk (pd.DataFrame): Parsed chunk with Athlete and Date columns
+        started (datetime.datetime): UTC time the ingest started
+    """
+    bounds = chunk.groupby('Athlete', observed=True)['Date'].agg(['min', 'max'])
+    undated = set(chunk.loc[chunk['Date'].isna(), 'Athlete'])
+    
+    for athlete, first, last in bounds.itertuples():
+        if athlete in undated:
+            first = started if pd.isna(first) else min(first, pd.Timestamp(started))
+            last = None
+        if athlete in date_ranges:
+            old_first, old_last = date_ranges[athlete]
+            first = min(first, old_first)
+            last = None if last is None or old_last is None else max(last, old_last)
+        date_ranges[athlete] = (first, last)
+
+
+def _parquet_schema(dtypes):
+    """Arrow schema matching the parsed chunks."""
+    fields = []
+    for col, dtype in dtypes.items():
+        if col == 'Date':
+            fields.append(pa.field(col, pa.timestamp('ns')))
+        elif dtype == 'string':
+            fields.append(pa.field(col, pa.string()))
+        else:
+            fields.append(pa.field(col, pa.float32()))
+    return pa.schema(fields)
+
+
+def stream_performance_csv(source, spill='database', path=None, chunksize=INGEST_CHUNK_SIZE):
+    """
+    Ingest a performance CSV chunk by chunk.
+    
+    Rows are assumed to be in time order within each athlete (as exported by
+    wearables); each chunk is sorted by date before it is summarized.
+    
+    Each chunk is spilled as soon as it is read, and a database spill stores
+    every chunk in its own transaction. If ingest fails part way, the chunks
+    stored before the failure stay in the database.
+    
+    Args:
+        source (str or file-like): The CSV file
+        spill (str, optional): 'database' to store the raw rows with
+            store_team_dataframe, 'parquet' to write them to path, or None to
+            keep only the summaries
+        path (str, optional): Parquet file to write when spill is 'parquet'
+        chunksize (int): Rows read per chunk
+        
+    Returns:
+        IngestResult: Per-athlete summaries and a handle to the raw rows
+        
+    Raises:
+        ValueError: If the file does not match the expected schema
+        ImportError: If spill is 'parquet' and pyarrow is not installed
+        Exception: Errors from the database or Parquet spill are raised as is
+    """
+    if spill not in SPILL_TARGETS:
+        raise ValueError(f"Unknown spill target '{spill}', expected one of {SPILL_TARGETS}")
+    if spill == 'parquet':
+        if pq is None:
+            raise ImportError("Spilling to Parquet requires pyarrow")
+        if not path:
+            raise ValueError("A path is required to spill to Parquet")
+    
+    dtypes = read_csv_schema(source)
+    metrics = [col for col, dtype in dtypes.items() if dtype == 'float32']
+    
+    summaries = MetricStatsStore()
+    rows = 0
+    writer = None
+    date_ranges = {}
+    started = datetime.datetime.utcnow()
+    
+    try:
+        for chunk in _read_chunks(source, dtypes, chunksize):
+            summaries.update_from_dataframe(chunk[['Athlete', 'Date'] + metrics])
+            rows += len(chunk)
+            
+            if spill == 'database':
+                from utils.database import store_team_dataframe
+                spill_columns = [col for col in chunk.columns if col not in ('Session', 'Notes')]
+                store_team_dataframe(chunk[spill_columns])
+                _update_date_ranges(date_ranges, chunk, started)
+            elif spill == 'parquet':
+                table = pa.Table.from_pandas(chunk, schema=_parquet_schema(dtypes), preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+            
+            logger.info(f"Ingested {rows} rows")
+    finally:
+        if writer is not None:
+            writer.close()
+    
+    return IngestResult(summaries, metrics, rows, spill=spill,
+                        location=path if spill == 'parquet' else None, date_ranges=date_ranges)
@@ -0,0 +1,472 @@
+"""
+Incremental per-athlete metric statistics.
+
+Keeps running summaries per (athlete, metric) that are updated in O(1) per new
+measurement, so dashboards can show mean, spread, range, median and trend
+without rescanning an athlete's full history:
+
+- mean and variance with Welford's algorithm
+- running min, max and most recent value
+- the online co-moment of (session index, value) for the trend slope
+- an approximate median with the P-squared estimator (Jain & Chlamtac)
+
+Summaries of separate batches can be merged in O(1) (Chan et al.), which lets
+a whole DataFrame or upload chunk be summarized with grouped array operations.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+from utils.trend import classify_trends
+
+# Quantile tracked by the streaming median estimator
+MEDIAN_QUANTILE = 0.5
+
+# Columns of a performance DataFrame that are not metrics
+_NON_METRIC_COLUMNS = ['Athlete', 'Date', 'Session', 'Notes', 'date', 'Sport', 'Team']
+
+
+class StreamingQuantile:
+    """P-squared estimator of a single quantile using five markers."""
+    
+    def __init__(self, quantile=MEDIAN_QUANTILE):
+        self.quantile = quantile
+        # Marker heights; holds the raw observations until five have been seen
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * quantile, 1 + 4 * quantile, 3 + 2 * quantile, 5]
+        self.increments = [0, quantile / 2, quantile, (1 + quantile) / 2, 1]
+    
+    def update(self, value):
+        """
+        Add an observation.
+        
+        Args:
+            value (float): The new observation
+        """
+        heights = self.heights
+        if len(heights) < 5:
+            heights.append(value)
+            heights.sort()
+            return
+        
+        # Find the cell containing the value, extending the extremes if needed
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = 0
+            while value >= heights[cell + 1]:
+                cell += 1
+        
+        for i in range(cell + 1, 5):
+            self.positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+        
+        # Move the middle markers towards their desired positions
+        positions = self.positions
+        for i in range(1, 4):
+            offset = self.desired[i] - positions[i]
+            if (offset >= 1 and positions[i + 1] - positions[i] > 1) or \
+               (offset <= -1 and positions[i - 1] - positions[i] < -1):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (positions[i + step] - positions[i])
+                heights[i] = height
+                positions[i] += step
+    
+    def _parabolic(self, i, step):
+        """Piecewise-parabolic prediction of marker i moved by step."""
+        q, n = self.heights, self.positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+    
+    @classmethod
+    def from_quantiles(cls, count, heights, quantile=MEDIAN_QUANTILE):
+        """
+        Estimator for a batch of at least five values from its exact quantiles.
+        
+        Args:
+            count (int): Number of values in the batch
+            heights (list): The batch's min, quantile/2, quantile, (1+quantile)/2 and max
+            quantile (float): Quantile being tracked
+            
+        Returns:
+            StreamingQuantile: Estimator with markers at the given heights
+        """
+        estimator = cls(quantile)
+        estimator._set_markers(count, heights)
+        return estimator
+    
+    def _set_markers(self, count, heights):
+        """Place the markers at their desired positions for count values."""
+        levels = [0, self.quantile / 2, self.quantile, (1 + self.quantile) / 2, 1]
+        self.heights = [float(h) for h in heights]
+        self.desired = [1 + (count - 1) * level for level in levels]
+        self.positions = [1] + [int(round(d)) for d in self.desired[1:4]] + [count]
+    
+    def merge(self, other):
+        """
+        Fold another estimator into this one.
+        
+        Marker heights are combined count-weighted, so the merged estimate is
+        approximate; estimators with fewer than five values are replayed exactly.
+        
+        Args:
+            other (StreamingQuantile): Estimator over a later batch of values
+        """
+        if len(other.heights) < 5:
+            for value in other.heights:
+                self.update(value)
+            return
+        if len(self.heights) < 5:
+            pending = list(self.heights)
+            self._set_markers(other.positions[4], other.heights)
+            for value in pending:
+                self.update(value)
+            return
+        
+        count_a, count_b = self.positions[4], other.positions[4]
+        count = count_a + count_b
+        heights = [min(self.heights[0], other.heights[0])]
+        heights += [(count_a * a + count_b * b) / count for a, b in zip(self.heights[1:4], other.heights[1:4])]
+        heights.append(max(self.heights[4], other.heights[4]))
+        self._set_markers(count, heights)
+    
+    def value(self):
+        """
+        Current quantile estimate.
+        
+        Returns:
+            float: The estimate (exact for fewer than five observations), NaN if empty
+        """
+        heights = self.heights
+        if not heights:
+            return math.nan
+        if len(heights) < 5:
+            return float(pd.Series(heights).quantile(self.quantile))
+        return heights[2]
+    
+    def to_dict(self):
+        """Serializable estimator state."""
+        return {
+            'quantile': self.quantile,
+            'heights': list(self.heights),
+            'positions': list(self.positions),
+            'desired': list(self.desired)
+        }
+    
+    @classmethod
+    def from_dict(cls, state):
+        """Restore an estimator saved with to_dict."""
+        estimator = cls(state.get('quantile', MEDIAN_QUANTILE))
+        estimator.heights = list(state.get('heights', []))
+        estimator.positions = list(state.get('positions', estimator.positions))
+        estimator.desired = list(state.get('desired', estimator.desired))
+        return estimator
+
+
+class RunningMetricStats:
+    """Running summary of one athlete's metric, updated one measurement at a time."""
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        # Sum of squared deviations from the mean (Welford)
+        self.m2 = 0.0
+        self.min = math.nan
+        self.max = math.nan
+        self.recent = math.nan
+        # Co-moment of (session index, value); the index runs 0..count-1
+        self.c_xy = 0.0
+        self.median_estimator = StreamingQuantile()
+    
+    def update(self, value):
+        """
+        Add a measurement. Missing values (None/NaN) are ignored.
+        
+        Args:
+            value (float): The new measurement
+        """
+        if value is None:
+            return
+        value = float(value)
+        if math.isnan(value):
+            return
+        
+        x = self.count
+        x_mean = (x - 1) / 2 if x else 0.0
+        
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.c_xy += (x - x_mean) * (value - self.mean)
+        
+        self.min = value if self.count == 1 else min(self.min, value)
+        self.max = value if self.count == 1 else max(self.max, value)
+        self.recent = value
+        self.median_estimator.update(value)
+    
+    def merge(self, other):
+        """
+        Fold in the stats of a later batch of measurements of the same metric.
+        
+        Args:
+            other (RunningMetricStats): Stats of measurements taken after these
+        """
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.__dict__.update(RunningMetricStats.from_dict(other.to_dict()).__dict__)
+            return
+        
+        count_a, count_b = self.count, other.count
+        count = count_a + count_b
+        delta = other.mean - self.mean
+        
+        self.mean += delta * count_b / count
+        self.m2 += other.m2 + delta ** 2 * count_a * count_b / count
+        # The batches' session indexes are offset by count_a, so their means differ by count / 2
+        self.c_xy += other.c_xy + delta * count_a * count_b / 2
+        self.count = count
+        
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.recent = other.recent
+        self.median_estimator.merge(other.median_estimator)
+    
+    @property
+    def std(self):
+        """Sample standard deviation (NaN for fewer than two values)."""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else math.nan
+    
+    @property
+    def median(self):
+        """Approximate median."""
+        return self.median_estimator.value()
+    
+    @property
+    def slope(self):
+        """Least-squares slope of value against session index."""
+        if self.count < 2:
+            return math.nan
+        # Sum of squared deviations of 0..n-1 from their mean
+        x_m2 = self.count * (self.count ** 2 - 1) / 12
+        return self.c_xy / x_m2
+    
+    def trend(self, min_points=2):
+        """
+        Trend label using the shared trend rules.
+        
+        Args:
+            min_points (int): Fewest values needed to report a trend
+            
+        Returns:
+            str: 'increasing', 'decreasing', 'stable' or 'insufficient_data'
+        """
+        return str(classify_trends([self.slope], [self.mean], [self.count], min_points=min_points)[0])
+    
+    def summary(self):
+        """
+        Summary in the format of process_performance_data's per-metric stats.
+        
+        Returns:
+            dict: mean, median, min, max, std, recent, trend, slope and count
+        """
+        return {
+            'mean': self.mean if self.count else math.nan,
+            'median': self.median,
+            'min': self.min,
+            'max': self.max,
+            'std': self.std,
+            'recent': self.recent if self.count else None,
+            'trend': self.trend(),
+            'slope': self.slope,
+            'count': self.count
+        }
+    
+    def to_dict(self):
+        """Serializable state."""
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'm2': self.m2,
+            'min': self.min,
+            'max': self.max,
+            'recent': self.recent,
+            'c_xy': self.c_xy,
+            'median_state': self.median_estimator.to_dict()
+        }
+    
+    @classmethod
+    def from_dict(cls, state):
+        """Restore stats saved with to_dict."""
+        stats = cls()
+        stats.count = int(state.get('count') or 0)
+        stats.mean = float(state.get('mean') or 0.0)
+        stats.m2 = float(state.get('m2') or 0.0)
+        stats.min = math.nan if state.get('min') is None else float(state['min'])
+        stats.max = math.nan if state.get('max') is None else float(state['max'])
+        stats.recent = math.nan if state.get('recent') is None else float(state['recent'])
+        stats.c_xy = float(state.get('c_xy') or 0.0)
+        if state.get('median_state'):
+            stats.median_estimator = StreamingQuantile.from_dict(state['median_state'])
+        return stats
+
+
+class MetricStatsStore:
+    """Running statistics keyed by (athlete, metric)."""
+    
+    def __init__(self):
+        self.stats = {}
+    
+    def get(self, athlete, metric):
+        """
+        Stats for an athlete's metric, created empty if missing.
+        
+        Args:
+            athlete (str): The athlete's name
+            metric (str): The metric name
+            
+        Returns:
+            RunningMetricStats: The running stats
+        """
+        key = (athlete, metric)
+        if key not in self.stats:
+            self.stats[key] = RunningMetricStats()
+        return self.stats[key]
+    
+    def update(self, athlete, metric, value):
+        """
+        Add one measurement.
+        
+        Args:
+            athlete (str): The athlete's name
+            metric (str): The metric name
+            value (float): The new measurement
+        """
+        self.get(athlete, metric).update(value)
+    
+    def update_from_dataframe(self, df, athlete=None):
+        """
+        Add every measurement in a wide performance DataFrame, in date order.
+        
+        Args:
+            df (pd.DataFrame): Performance data with an 'Athlete' column, or
+                a single athlete's data when athlete is given
+            athlete (str, optional): Athlete the rows belong to
+            
+        Returns:
+            int: Number of measurements added
+        """
+        if 'Date' in df.columns:
+            df = df.assign(Date=pd.to_datetime(df['Date'], errors='coerce')).sort_values('Date', kind='stable')
+        
+        metrics = [col for col in df.columns if col not in _NON_METRIC_COLUMNS]
+        if not metrics or df.empty:
+            return 0
+        
+        values = pd.DataFrame({metric: pd.to_numeric(df[metric], errors='coerce') for metric in metrics})
+        values.insert(0, 'athlete', df['Athlete'].to_numpy() if athlete is None else athlete)
+        long_df = values.melt(id_vars='athlete', var_name='metric', value_name='value').dropna(subset=['value'])
+        
+        for key, stats in batch_stats(long_df).items():
+            self.get(*key).merge(stats)
+        
+        return len(long_df)
+    
+    def athlete_summary(self, athlete):
+        """
+        Summaries for all of an athlete's metrics.
+        
+        Args:
+            athlete (str): The athlete's name
+            
+        Returns:
+            dict: Metric name -> summary dict
+        """
+        return {
+            metric: stats.summary()
+            for (name, metric), stats in self.stats.items()
+            if name == athlete
+        }
+    
+    def to_frame(self):
+        """
+        All summaries as a tidy DataFrame.
+        
+        Returns:
+            pd.DataFrame: One row per athlete and metric
+        """
+        rows = [
+            {'athlete': athlete, 'metric': metric, **stats.summary()}
+            for (athlete, metric), stats in self.stats.items()
+        ]
+        return pd.DataFrame(rows)
+
+
+def batch_stats(long_df):
+    """
+    Summarize a batch of measurements per (athlete, metric) with grouped array operations.
+    
+    Args:
+        long_df (pd.DataFrame): Rows with athlete, metric and value columns,
+            in measurement order
+            
+    Returns:
+        dict: (athlete, metric) -> RunningMetricStats of the batch
+    """
+    keys = ['athlete', 'metric']
+    long_df = long_df.assign(value=long_df['value'].astype(float))
+    grouped = long_df.groupby(keys, sort=False, observed=True)
+    
+    # Session index of each value within its (athlete, metric) series
+    x = grouped.cumcount().to_numpy(dtype=float)
+    stats = grouped['value'].agg(['count', 'mean', 'var', 'min', 'max', 'last'])
+    sum_xy = (long_df['value'] * x).groupby([long_df[k] for k in keys], sort=False, observed=True).sum()
+    
+    levels = [MEDIAN_QUANTILE / 2, MEDIAN_QUANTILE, (1 + MEDIAN_QUANTILE) / 2]
+    quantiles = grouped['value'].quantile(levels).unstack()
+    
+    counts = stats['count'].to_numpy()
+    means = stats['mean'].to_numpy()
+    m2 = np.nan_to_num(stats['var'].to_numpy() * (counts - 1))
+    c_xy = sum_xy.reindex(stats.index).to_numpy() - counts * (counts - 1) / 2 * means
+    
+    # Small groups keep their raw values for the median estimator
+    small = stats.index[counts < 5]
+    small_values = {}
+    if len(small):
+        is_small = pd.MultiIndex.from_frame(long_df[keys]).isin(small)
+        small_values = long_df[is_small].groupby(keys, sort=False, observed=True)['value'].agg(list).to_dict()
+    
+    quantile_rows = quantiles.reindex(stats.index).to_numpy()
+    results = {}
+    for i, key in enumerate(stats.index):
+        batch = RunningMetricStats()
+        batch.count = int(counts[i])
+        batch.mean = float(means[i])
+        batch.m2 = float(m2[i])
+        batch.min = float(stats['min'].iat[i])
+        batch.max = float(stats['max'].iat[i])
+        batch.recent = float(stats['last'].iat[i])
+        batch.c_xy = float(c_xy[i])
+        if batch.count < 5:
+            for value in sorted(small_values[key]):
+                batch.median_estimator.update(value)
+        else:
+            batch.median_estimator = StreamingQuantile.from_quantiles(
+                batch.count, [batch.min, *quantile_rows[i], batch.max]
+            )
+        results[key] = batch
+    
+    return results
@@ -0,0 +1,294 @@
+"""
+Cohort percentile index for ranking athletes across a squad.
+
+Keeps each athlete's most recent value of every metric in sorted arrays, one
+per (metric, cohort):
+
+- ('Speed', 'all', None): every athlete
+- ('Speed', 'sport', 'Sprint'): athletes of a sport
+- ('Speed', 'team', 'U18'): athletes of a team
+
+Rank and percentile queries are two binary searches on one array, O(log n)
+in the cohort size. New measurements only move the athletes they belong to:
+their old values are removed and the new ones inserted in sorted position,
+without rebuilding the cohort arrays.
+"""
+import threading
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from utils.performance_frame import NON_METRIC_COLUMNS, frame_data
+from utils.zscores import COHORT_COLUMNS
+
+# Cohorts an athlete can be ranked in; 'all' is the whole index
+COHORTS = ('all',) + tuple(COHORT_COLUMNS)
+
+_EMPTY = np.empty(0)
+
+
+def _remove_sorted(values, removed):
+    """Remove a multiset of values from a sorted array."""
+    removed = np.sort(removed)
+    # Equal values removed several times need consecutive positions
+    occurrence = np.arange(len(removed)) - np.searchsorted(removed, removed, side='left')
+    positions = np.searchsorted(values, removed, side='left') + occurrence
+    return np.delete(values, positions)
+
+
+def _insert_sorted(values, added):
+    """Insert values into a sorted array, keeping it sorted."""
+    added = np.sort(added)
+    return np.insert(values, np.searchsorted(values, added, side='left'), added)
+
+
+def _group_of(value):
+    """Cohort group name, or None for a missing sport/team."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return str(value)
+
+
+class CohortPercentileIndex:
+    """Sorted per-(metric, cohort) arrays of each athlete's most recent value."""
+
+    def __init__(self):
+        self._arrays = {}
+        self._latest = {}
+        self._groups = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dataframe(cls, data):
+        """
+        Build an index from wide performance data.
+
+        Args:
+            data (pd.DataFrame, PerformanceFrame or PerformanceStore): Rows with
+                Athlete and Date columns, optional Sport/Team columns and one
+                column per metric
+
+        Returns:
+            CohortPercentileIndex: The populated index
+        """
+        index = cls()
+        index.update_from_dataframe(data)
+        return index
+
+    def _keys(self, athlete, metric):
+        """Cohort array keys an athlete's metric value belongs to."""
+        keys = [(metric, 'all', None)]
+        for cohort, group in self._groups.get(athlete, {}).items():
+            if group is not None:
+                keys.append((metric, cohort, group))
+        return keys
+
+    def update_from_dataframe(self, data):
+        """
+        Fold wide performance rows into the index.
+
+        Args:
+            data (pd.DataFrame, PerformanceFrame or PerformanceStore): Performance rows
+        """
+        df = frame_data(data)
+        if 'Athlete' not in df.columns or df.empty:
+            return
+
+        metrics = [col for col in df.columns
+                   if col not in NON_METRIC_COLUMNS and pd.api.types.is_numeric_dtype(df[col])]
+        id_columns = ['Athlete'] + [col for col in ['Date', 'Sport', 'Team'] if col in df.columns]
+        long_df = df[id_columns + metrics].melt(id_vars=id_columns, var_name='metric', value_name='value')
+        long_df = long_df.rename(columns={'Athlete': 'athlete', 'Date': 'date', 'Sport': 'sport', 'Team': 'team'})
+        self.update(long_df)
+
+    def update(self, long_df):
+        """
+        Fold long (athlete, date, metric, value) rows into the index.
+
+        Only values at least as recent as the stored one replace it, so rows
+        can arrive in any order and re-stored rows replace their old value.
+        Optional sport/team columns set the athlete's cohorts; when they change,
+        the athlete moves to the new cohort arrays.
+
+        Args:
+            long_df (pd.DataFrame): Columns athlete, date, metric, value and
+                optionally sport and team
+        """
+        long_df = long_df.assign(value=pd.to_numeric(long_df['value'], errors='coerce'))
+        long_df = long_df.dropna(subset=['athlete', 'value'])
+        if long_df.empty:
+            return
+
+        if 'date' in long_df.columns:
+            long_df = long_df.assign(date=pd.to_datetime(long_df['date'], errors='coerce'))
+            long_df = long_df.sort_values('date', kind='stable', na_position='first')
+        else:
+            long_df = long_df.assign(date=pd.NaT)
+        latest = long_df.drop_duplicates(['athlete', 'metric'], keep='last')
+
+        removed = {}
+        added = {}
+
+        with self._lock:
+            # Athletes whose cohort changes leave all their old cohort arrays
+            cohort_rows = long_df.drop_duplicates('athlete', keep='last')
+            for row in cohort_rows.itertuples(index=False):
+                athlete = str(row.athlete)
+                old_groups = self._groups.get(athlete, {})
+                new_groups = {
+                    cohort: _group_of(getattr(row, cohort, None)) or old_groups.get(cohort)
+                    for cohort in COHORT_COLUMNS
+                }
+                if new_groups == old_groups:
+                    continue
+                athlete_values = self._latest.get(athlete, {})
+                for metric, (_, value) in athlete_values.items():
+                    for key in self._keys(athlete, metric):
+                        removed.setdefault(key, []).append(value)
+                self._groups[athlete] = new_groups
+                for metric, (_, value) in athlete_values.items():
+                    for key in self._keys(athlete, metric):
+                        added.setdefault(key, []).append(value)
+
+            for athlete, date, metric, value in zip(latest['athlete'].astype(str), latest['date'],
+                                                    latest['metric'].astype(str), latest['value'].astype(float)):
+                athlete_values = self._latest.setdefault(athlete, {})
+                previous = athlete_values.get(metric)
+                if previous is not None:
+                    previous_date, previous_value = previous
+                    if pd.notna(previous_date) and (pd.isna(date) or date < previous_date):
+                        continue
+                    for key in self._keys(athlete, metric):
+                        removed.setdefault(key, []).append(previous_value)
+                self._groups.setdefault(athlete, {cohort: None for cohort in COHORT_COLUMNS})
+                athlete_values[metric] = (date, value)
+                for key in self._keys(athlete, metric):
+                    added.setdefault(key, []).append(value)
+
+            for key in set(removed) | set(added):
+                # A value can be added and removed in one batch, e.g. when an
+                # athlete changes cohort and gets a new value; those cancel out
+                key_removed = Counter(removed.get(key, []))
+                key_added = Counter(added.get(key, []))
+                common = key_removed & key_added
+                key_removed -= common
+                key_added -= common
+
+                values = self._arrays.get(key, _EMPTY)
+                if key_removed:
+                    values = _remove_sorted(values, np.array(list(key_removed.elements()), dtype=float))
+                if key_added:
+                    values = _insert_sorted(values, np.array(list(key_added.elements()), dtype=float))
+                if len(values):
+                    self._arrays[key] = values
+                else:
+                    self._arrays.pop(key, None)
+
+    def remove_athlete(self, athlete):
+        """
+        Remove every value of an athlete from the index.
+
+        Args:
+            athlete (str): Athlete name
+        """
+        with self._lock:
+            for metric, (_, value) in self._latest.pop(athlete, {}).items():
+                for key in self._keys(athlete, metric):
+                    values = _remove_sorted(self._arrays[key], np.array([value]))
+                    if len(values):
+                        self._arrays[key] = values
+                    else:
+                        del self._arrays[key]
+            self._groups.pop(athlete, None)
+
+    def cohort_values(self, metric, cohort='all', group=None):
+        """
+        Sorted values of a cohort.
+
+        Args:
+            metric (str): Metric name
+            cohort (str): 'all', 'sport' or 'team'
+            group (str, optional): Sport or team name for those cohorts
+
+        Returns:
+            numpy.ndarray: Ascending values, one per athlete
+        """
+        if cohort not in COHORTS:
+            raise ValueError(f"Unknown cohort '{cohort}'. Use one of {COHORTS}")
+        key = (metric, 'all', None) if cohort == 'all' else (metric, cohort, group)
+        return self._arrays.get(key, _EMPTY)
+
+    def value_percentile(self, value, metric, cohort='all', group=None, higher_is_better=True):
+        """
+        Rank and percentile of a value within a cohort.
+
+        The percentile counts ties as half below, so the median athlete of a
+        cohort is at 50 whatever the direction of the metric.
+
+        Args:
+            value (float): Value to rank
+            metric (str): Metric name
+            cohort (str): 'all', 'sport' or 'team'
+            group (str, optional): Sport or team name for those cohorts
+            higher_is_better (bool): Whether larger values rank higher
+                (False for e.g. sprint times)
+
+        Returns:
+            dict: rank (1 is best), percentile (0-100), cohort_size, or None
+                if the cohort is empty
+        """
+        values = self.cohort_values(metric, cohort, group)
+        size = len(values)
+        if size == 0:
+            return None
+
+        below = int(np.searchsorted(values, value, side='left'))
+        ties = int(np.searchsorted(values, value, side='right')) - below
+        above = size - below - ties
+        if higher_is_better:
+            rank, percentile = above + 1, 100.0 * (below + 0.5 * ties) / size
+        else:
+            rank, percentile = below + 1, 100.0 * (above + 0.5 * ties) / size
+
+        return {'rank': rank, 'percentile': percentile, 'cohort_size': size}
+
+    def percentile(self, athlete, metric, cohort='all', higher_is_better=True):
+        """
+        Rank and percentile of an athlete's most recent value in their cohort.
+
+        Args:
+            athlete (str): Athlete name
+            metric (str): Metric name
+            cohort (str): 'all', 'sport' or 'team'
+            higher_is_better (bool): Whether larger values rank higher
+
+        Returns:
+            dict: value, group, rank, percentile and cohort_size, or None if
+                the athlete has no value of the metric or no such cohort
+        """
+        latest = self._latest.get(athlete, {}).get(metric)
+        if latest is None:
+            return None
+
+        group = None if cohort == 'all' else self._groups.get(athlete, {}).get(cohort)
+        if cohort != 'all' and group is None:
+            return None
+
+        result = self.value_percentile(latest[1], metric, cohort, group, higher_is_better)
+        return {'value': latest[1], 'group': group, **result}
+
+    def athlete_percentiles(self, athlete, cohort='all'):
+        """
+        Percentiles of every metric of an athlete.
+
+        Args:
+            athlete (str): Athlete name
+            cohort (str): 'all', 'sport' or 'team'
+
+        Returns:
+            dict: Metric name -> percentile result (higher values ranked higher)
+        """
+        metrics = sorted(self._latest.get(athlete, {}))
+        results = {metric: self.percentile(athlete, metric, cohort) for metric in metrics}
+        return {metric: result for metric, result in results.items() if result is not None}
@@ -0,0 +1,170 @@
+"""
+Parse-once, typed container for performance data.
+
+The analysis and plotting functions used to filter the Athlete column and
+parse dates on every call. A PerformanceFrame does both once, when data is
+uploaded or loaded from the database:
+
+- Athlete is categorical
+- Date is datetime64
+- numeric metrics are float32
+- rows are sorted by athlete and date, with an athlete -> row slice index,
+  so per-athlete access is a slice rather than a filtered copy
+"""
+import numpy as np
+import pandas as pd
+
+from utils.columnar_store import PerformanceStore
+
+# Columns that are never treated as metrics
+NON_METRIC_COLUMNS = ['Athlete', 'Date', 'Session', 'Notes', 'Sport', 'Team']
+
+
+def metric_columns(df):
+    """
+    Metric columns of a DataFrame, in column order.
+    
+    Args:
+        df (pd.DataFrame): Performance data
+        
+    Returns:
+        list: Numeric columns that are not in NON_METRIC_COLUMNS
+    """
+    return [col for col in df.columns
+            if col not in NON_METRIC_COLUMNS and pd.api.types.is_numeric_dtype(df[col])]
+
+
+class PerformanceFrame:
+    """Normalized performance data with a per-athlete row index."""
+    
+    def __init__(self, data, athlete=None):
+        """
+        Build the frame from raw performance data.
+        
+        Args:
+            data (pd.DataFrame): Performance data with one row per session
+            athlete (str, optional): Athlete the rows belong to, for data
+                without an 'Athlete' column (e.g. loaded from the database)
+        """
+        df = data.copy()
+        if 'Date' not in df.columns and 'date' in df.columns:
+            # Database loads use a lower-case date column
+            df = df.rename(columns={'date': 'Date'})
+        
+        if 'Athlete' not in df.columns:
+            if athlete is None:
+                raise ValueError("Data without an 'Athlete' column needs the athlete argument")
+            df.insert(0, 'Athlete', athlete)
+        
+        if 'Date' in df.columns:
+            df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+        
+        self.metrics = metric_columns(df)
+        if self.metrics:
+            df[self.metrics] = df[self.metrics].astype(np.float32)
+        
+        # Rows without an athlete cannot be looked up and are dropped
+        df = df[df['Athlete'].notna()]
+        df['Athlete'] = df['Athlete'].astype('category')
+        
+        # Contiguous rows per athlete, in date order within each athlete
+        sort_columns = ['Athlete', 'Date'] if 'Date' in df.columns else ['Athlete']
+        df = df.sort_values(sort_columns, kind='stable').reset_index(drop=True)
+        
+        codes = df['Athlete'].cat.codes.to_numpy()
+        categories = df['Athlete'].cat.categories
+        starts = np.searchsorted(codes, np.arange(len(categories)), side='left')
+        stops = np.searchsorted(codes, np.arange(len(categories)), side='right')
+        self._slices = {
+            name: slice(int(start), int(stop))
+            for name, start, stop in zip(categories, starts, stops)
+            if stop > start
+        }
+        
+        self.data = df
+    
+    @property
+    def athletes(self):
+        """Names of the athletes in the frame."""
+        return list(self._slices)
+    
+    @property
+    def columns(self):
+        """Columns of the underlying DataFrame."""
+        return self.data.columns
+    
+    def __len__(self):
+        return len(self.data)
+    
+    def __contains__(self, athlete):
+        return athlete in self._slices
+    
+    def athlete(self, athlete):
+        """
+        Rows of one athlete, in date order.
+        
+        Args:
+            athlete (str): The name of the athlete
+            
+        Returns:
+            pd.DataFrame: A slice of the frame (empty if the athlete is unknown)
+        """
+        return self.data.iloc[self._slices.get(athlete, slice(0, 0))]
+
+
+def as_performance_frame(data, athlete=None):
+    """
+    Wrap data in a PerformanceFrame unless it already is one.
+    
+    Args:
+        data (pd.DataFrame or PerformanceFrame): Performance data
+        athlete (str, optional): Athlete for data without an 'Athlete' column
+        
+    Returns:
+        PerformanceFrame: The normalized frame
+    """
+    if isinstance(data, PerformanceFrame):
+        return data
+    return PerformanceFrame(data, athlete=athlete)
+
+
+def athlete_rows(data, athlete):
+    """
+    One athlete's rows with parsed dates, sorted by date.
+    
+    A PerformanceFrame returns its precomputed slice, a PerformanceStore reads
+    only that athlete's partitions, and a plain DataFrame is filtered and
+    parsed as before.
+    
+    Args:
+        data (pd.DataFrame, PerformanceFrame or PerformanceStore): Performance data
+        athlete (str): The name of the athlete
+        
+    Returns:
+        pd.DataFrame: The athlete's rows
+    """
+    if isinstance(data, (PerformanceFrame, PerformanceStore)):
+        return data.athlete(athlete)
+    
+    athlete_data = data[data['Athlete'] == athlete].copy()
+    if 'Date' in athlete_data.columns:
+        athlete_data['Date'] = pd.to_datetime(athlete_data['Date'], errors='coerce')
+        athlete_data = athlete_data.sort_values('Date', kind='stable')
+    return athlete_data
+
+
+def frame_data(data):
+    """
+    The DataFrame behind data, which may be a PerformanceFrame or PerformanceStore.
+    
+    Args:
+        data (pd.DataFrame, PerformanceFrame or PerformanceStore): Performance data
+        
+    Returns:
+        pd.DataFrame: The underlying DataFrame
+    """
+    if isinstance(data, PerformanceFrame):
+        return data.data
+    if isinstance(data, PerformanceStore):
+        return data.read()
+    return data
@@ -0,0 +1,355 @@
+"""
+Pluggable pose-estimation backends for form analysis.
+
+A backend turns frames into keypoints in the JOINTS order of PoseSequence:
+
+- OpenCVPoseBackend runs a heatmap pose model (OpenPose COCO/MPI style, e.g.
+  an ONNX export) on the CPU with OpenCV DNN. Frames are batched into one
+  blob per forward pass, and the input resolution trades accuracy for
+  throughput.
+- HeuristicPoseBackend places the joints from the image size, as the demo
+  did before; it needs no model and is the fallback.
+
+get_pose_backend() picks the backend from the environment once per process:
+
+    POSE_BACKEND      'auto' (model if present), 'opencv' or 'heuristic'
+    POSE_MODEL_PATH   model file on disk (no downloads)
+    POSE_MODEL_CONFIG optional config file for the model (e.g. a .pbtxt)
+    POSE_INPUT_SIZE   network input, e.g. '368' or '456x256'
+    POSE_BATCH_SIZE   frames per forward pass in video analysis
+
+Loaded networks are cached per model file, so every backend instance and
+Streamlit session in the process shares one copy.
+"""
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+
+import cv2
+import numpy as np
+
+from utils.pose_sequence import JOINTS
+
+logger = logging.getLogger(__name__)
+
+# Backend selection and model location, overridable from the environment
+POSE_BACKEND = os.environ.get('POSE_BACKEND', 'auto')
+POSE_MODEL_PATH = os.environ.get('POSE_MODEL_PATH', os.path.join('models', 'pose', 'pose_model.onnx'))
+POSE_MODEL_CONFIG = os.environ.get('POSE_MODEL_CONFIG') or None
+POSE_INPUT_SIZE = os.environ.get('POSE_INPUT_SIZE', '368')
+POSE_BATCH_SIZE = int(os.environ.get('POSE_BATCH_SIZE', 8))
+
+# Heatmap channel of each joint. OpenPose COCO (18 parts, nose as head) and
+# MPI (15 parts) share the first 14 channels in this order.
+HEATMAP_CHANNELS = {
+    'head': 0, 'neck': 1,
+    'right_shoulder': 2, 'right_elbow': 3, 'right_wrist': 4,
+    'left_shoulder': 5, 'left_elbow': 6, 'left_wrist': 7,
+    'right_hip': 8, 'right_knee': 9, 'right_ankle': 10,
+    'left_hip': 11, 'left_knee': 12, 'left_ankle': 13
+}
+
+# Heatmap peaks below this score count as missing joints
+POSE_CONFIDENCE_THRESHOLD = 0.1
+
+_net_cache = {}
+_net_cache_lock = threading.Lock()
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def parse_input_size(value):
+    """
+    Parse a network input size.
+
+    Args:
+        value (str, int or tuple): '368', '456x256', 368 or (456, 256)
+
+    Returns:
+        tuple: (width, height)
+    """
+    if isinstance(value, (tuple, list)):
+        width, height = value
+    elif isinstance(value, str) and 'x' in value.lower():
+        width, height = value.lower().split('x')
+    else:
+        width = height = value
+    return int(width), int(height)
+
+
+def _load_net(model_path, config_path=None):
+    """
+    Load a network once per process and model file.
+
+    Args:
+        model_path (str): Model file
+        config_path (str, optional): Config file of the model
+
+    Returns:
+        tuple: (cv2.dnn.Net, threading.Lock serializing its forward passes)
+    """
+    key = (os.path.abspath(model_path), config_path)
+    with _net_cache_lock:
+        if key not in _net_cache:
+            net = cv2.dnn.readNet(model_path, config_path) if config_path else cv2.dnn.readNet(model_path)
+            net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+            net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+            _net_cache[key] = (net, threading.Lock())
+            logger.info(f"Loaded pose model {model_path}")
+        return _net_cache[key]
+
+
+def keypoints_to_dict(keypoints):
+    """
+    One frame of keypoints as a detect_pose style dict.
+
+    Args:
+        keypoints (numpy.ndarray): (14, 2) positions in JOINTS order, NaN when missing
+
+    Returns:
+        dict: Joint name -> (x, y) int pixel position for the detected joints
+    """
+    return {
+        name: (int(round(x)), int(round(y)))
+        for name, (x, y) in zip(JOINTS, keypoints)
+        if not (np.isnan(x) or np.isnan(y))
+    }
+
+
+class PoseBackend(ABC):
+    """Interface of pose backends: frames in, JOINTS-ordered keypoints out."""
+
+    name = 'base'
+
+    @abstractmethod
+    def estimate(self, frames, still=False):
+        """
+        Estimate the poses of a batch of frames.
+
+        Args:
+            frames (list): BGR images
+            still (bool): Whether the frames are photos rather than video
+
+        Returns:
+            tuple: (keypoints, confidence) as (N, 14, 2) float32 pixel
+                positions, NaN for missing joints, and (N, 14) float32 scores
+        """
+
+    def detect(self, frame, still=False):
+        """
+        Keypoints of one frame.
+
+        Args:
+            frame (numpy.ndarray): BGR image
+            still (bool): Whether the frame is a photo rather than video
+
+        Returns:
+            dict: Joint name -> (x, y) for the detected joints
+        """
+        keypoints, _ = self.estimate([frame], still=still)
+        return keypoints_to_dict(keypoints[0])
+
+    def detect_batch(self, frames):
+        """
+        Keypoints of several video frames, estimated together.
+
+        Args:
+            frames (list): BGR images
+
+        Returns:
+            list: One joint name -> (x, y) dict per frame
+        """
+        if not frames:
+            return []
+        keypoints, _ = self.estimate(frames)
+        return [keypoints_to_dict(frame_keypoints) for frame_keypoints in keypoints]
+
+    def estimate_batch(self, frames):
+        """
+        Keypoints and confidence of several video frames, estimated together.
+
+        Unlike detect_batch, the model's per-joint scores are kept, so a
+        PoseSequence built from the results has the backend's confidence.
+
+        Args:
+            frames (list): BGR images
+
+        Returns:
+            tuple: (keypoints, confidence) as returned by estimate
+        """
+        if not frames:
+            return (np.empty((0, len(JOINTS), 2), dtype=np.float32),
+                    np.empty((0, len(JOINTS)), dtype=np.float32))
+        return self.estimate(frames)
+
+
+class HeuristicPoseBackend(PoseBackend):
+    """Places the joints at fixed fractions of the image; no model needed."""
+
+    name = 'heuristic'
+
+    # +/- pixel jitter of each joint, simulating movement between video frames
+    _JITTER = {
+        'head': (5, 3), 'neck': (3, 3),
+        'right_shoulder': (5, 3), 'left_shoulder': (5, 3),
+        'right_elbow': (8, 5), 'left_elbow': (8, 5),
+        'right_wrist': (10, 8), 'left_wrist': (10, 8),
+        'right_hip': (3, 3), 'left_hip': (3, 3),
+        'right_knee': (5, 8), 'left_knee': (5, 8),
+        'right_ankle': (5, 5), 'left_ankle': (5, 5)
+    }
+
+    @staticmethod
+    def _layout(width, height):
+        """Joint positions of an upright figure centred in the image."""
+        return {
+            'head': (width // 2, height // 5),
+            'neck': (width // 2, height // 4),
+            'right_shoulder': (width // 2 - width // 8, height // 3),
+            'left_shoulder': (width // 2 + width // 8, height // 3),
+            'right_elbow': (width // 2 - width // 5, height // 2),
+            'left_elbow': (width // 2 + width // 5, height // 2),
+            'right_wrist': (width // 2 - width // 4, height // 2 + height // 8),
+            'left_wrist': (width // 2 + width // 4, height // 2 + height // 8),
+            'right_hip': (width // 2 - width // 10, height // 2 + height // 6),
+            'left_hip': (width // 2 + width // 10, height // 2 + height // 6),
+            'right_knee': (width // 2 - width // 8, height // 2 + height // 3),
+            'left_knee': (width // 2 + width // 8, height // 2 + height // 3),
+            'right_ankle': (width // 2 - width // 6, height - height // 8),
+            'left_ankle': (width // 2 + width // 6, height - height // 8),
+        }
+
+    def estimate(self, frames, still=False):
+        keypoints = np.empty((len(frames), len(JOINTS), 2), dtype=np.float32)
+        for i, frame in enumerate(frames):
+            height, width = frame.shape[:2]
+            layout = self._layout(width, height)
+            for j, name in enumerate(JOINTS):
+                x, y = layout[name]
+                if not still:
+                    jitter_x, jitter_y = self._JITTER[name]
+                    x += np.random.randint(-jitter_x, jitter_x)
+                    y += np.random.randint(-jitter_y, jitter_y)
+                keypoints[i, j] = (x, y)
+        return keypoints, np.ones(keypoints.shape[:2], dtype=np.float32)
+
+
+class OpenCVPoseBackend(PoseBackend):
+    """Heatmap pose model run on the CPU with OpenCV DNN."""
+
+    name = 'opencv'
+
+    def __init__(self, model_path=None, config_path=None, input_size=None,
+                 threshold=POSE_CONFIDENCE_THRESHOLD, batch_size=None):
+        """
+        Load (or reuse) the model.
+
+        Args:
+            model_path (str, optional): Model file; POSE_MODEL_PATH by default
+            config_path (str, optional): Config file; POSE_MODEL_CONFIG by default
+            input_size (str, int or tuple, optional): Network input size;
+                POSE_INPUT_SIZE by default. Smaller is faster and less accurate
+            threshold (float): Minimum heatmap peak of a detected joint
+            batch_size (int, optional): Frames per forward pass; POSE_BATCH_SIZE by default
+
+        Raises:
+            FileNotFoundError: If the model file does not exist
+            cv2.error: If OpenCV cannot load the model
+        """
+        self.model_path = model_path or POSE_MODEL_PATH
+        self.config_path = config_path or POSE_MODEL_CONFIG
+        self.input_size = parse_input_size(input_size or POSE_INPUT_SIZE)
+        self.threshold = threshold
+        self.batch_size = batch_size or POSE_BATCH_SIZE
+
+        if not os.path.exists(self.model_path):
+            raise FileNotFoundError(f"Pose model not found: {self.model_path}")
+        self._net, self._lock = _load_net(self.model_path, self.config_path)
+
+    def _forward(self, frames):
+        """Heatmaps of one batch, (N, channels, H, W)."""
+        blob = cv2.dnn.blobFromImages(frames, 1.0 / 255, self.input_size, (0, 0, 0), swapRB=False, crop=False)
+        # A Net is not safe to run from several threads at once
+        with self._lock:
+            self._net.setInput(blob)
+            return np.asarray(self._net.forward())
+
+    def estimate(self, frames, still=False):
+        channels = np.array([HEATMAP_CHANNELS[name] for name in JOINTS])
+        keypoints = np.full((len(frames), len(JOINTS), 2), np.nan, dtype=np.float32)
+        confidence = np.zeros((len(frames), len(JOINTS)), dtype=np.float32)
+
+        for start in range(0, len(frames), self.batch_size):
+            batch = frames[start:start + self.batch_size]
+            heatmaps = self._forward(batch)[:, channels]
+            count, joints, map_height, map_width = heatmaps.shape
+
+            # Peak of every joint's heatmap in one argmax over the flattened maps
+            flat = heatmaps.reshape(count, joints, -1)
+            peaks = flat.argmax(axis=2)
+            scores = np.take_along_axis(flat, peaks[..., None], axis=2)[..., 0]
+
+            # Heatmap cell centres scaled back to each frame's own size
+            sizes = np.array([frame.shape[1::-1] for frame in batch], dtype=np.float32)
+            cells = np.stack([peaks % map_width, peaks // map_width], axis=-1).astype(np.float32) + 0.5
+            positions = cells / np.array([map_width, map_height], dtype=np.float32) * sizes[:, None, :]
+
+            detected = scores >= self.threshold
+            keypoints[start:start + count] = np.where(detected[..., None], positions, np.nan)
+            confidence[start:start + count] = np.where(detected, scores, 0.0)
+
+        return keypoints, confidence
+
+
+def create_pose_backend(name=None):
+    """
+    Create a backend by name, falling back to the heuristic one.
+
+    Args:
+        name (str, optional): 'auto', 'opencv' or 'heuristic'; POSE_BACKEND by default
+
+    Returns:
+        PoseBackend: The backend
+    """
+    name = (name or POSE_BACKEND).lower()
+    if name not in ('auto', 'opencv', 'heuristic'):
+        raise ValueError(f"Unknown pose backend '{name}'. Use 'auto', 'opencv' or 'heuristic'")
+
+    if name in ('auto', 'opencv'):
+        try:
+            return OpenCVPoseBackend()
+        except (FileNotFoundError, cv2.error) as e:
+            # 'auto' without a model is the normal demo setup
+            log = logger.info if name == 'auto' else logger.warning
+            log(f"Using heuristic pose backend: {e}")
+
+    return HeuristicPoseBackend()
+
+
+def get_pose_backend():
+    """
+    The process-wide pose backend, created on first use.
+
+    Returns:
+        PoseBackend: The configured backend
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_pose_backend()
+        return _backend
+
+
+def set_pose_backend(backend):
+    """
+    Replace the process-wide pose backend.
+
+    Args:
+        backend (PoseBackend, optional): New backend; None to choose again
+            from the environment on next use
+    """
+    global _backend
+    with _backend_lock:
+        _backend = backend
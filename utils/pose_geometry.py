@@ -0,0 +1,139 @@
+"""
+Batched joint geometry kernels.
+
+All functions take keypoints as (..., joints, 2) arrays, typically
+(frames, 14, 2) from a PoseSequence, and compute every requested angle or
+length for every frame in one pass. There is one vectorized expression per
+quantity, and no per-joint Python calls.
+
+Missing joints are NaN and give NaN results, as do degenerate angles
+(a zero-length segment), without warnings.
+"""
+import numpy as np
+
+
+def _points(keypoints):
+    """Keypoints as a float64 array for the kernels."""
+    return np.asarray(keypoints, dtype=np.float64)
+
+
+def angles_from_points(a, b, c):
+    """
+    Angle at b between b -> a and b -> c, in degrees.
+
+    Args:
+        a, b, c (numpy.ndarray): (..., 2) point arrays of the same shape
+
+    Returns:
+        numpy.ndarray: Angles in [0, 180] with shape (...)
+    """
+    ba = _points(a) - b
+    bc = _points(c) - b
+    dot = ba[..., 0] * bc[..., 0] + ba[..., 1] * bc[..., 1]
+    # One square root for both norms
+    norms = np.sqrt((ba[..., 0] ** 2 + ba[..., 1] ** 2) * (bc[..., 0] ** 2 + bc[..., 1] ** 2))
+    # A zero-length segment gives 0 / 0 = NaN
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cosine = dot / norms
+    return np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+
+
+def vertical_angles_from_points(top, bottom):
+    """
+    Angle of the top -> bottom segment from the image vertical, in degrees.
+
+    The vertical is (0, 1) in image coordinates, so a segment pointing
+    straight down is 0 and a horizontal one is 90.
+
+    Args:
+        top, bottom (numpy.ndarray): (..., 2) point arrays
+
+    Returns:
+        numpy.ndarray: Angles in [0, 180] with shape (...)
+    """
+    delta = _points(bottom) - top
+    return np.degrees(np.abs(np.arctan2(delta[..., 0], delta[..., 1])))
+
+
+def lengths_from_points(start, end):
+    """
+    Euclidean length of start -> end segments.
+
+    Args:
+        start, end (numpy.ndarray): (..., 2) point arrays
+
+    Returns:
+        numpy.ndarray: Lengths with shape (...)
+    """
+    delta = _points(end) - start
+    return np.hypot(delta[..., 0], delta[..., 1])
+
+
+def joint_angles(keypoints, triplets):
+    """
+    Angles of many joint triplets over many frames.
+
+    Args:
+        keypoints (numpy.ndarray): (..., joints, 2) positions
+        triplets (array-like): (T, 3) joint indices (a, b, c); the angle is at b
+
+    Returns:
+        numpy.ndarray: (..., T) angles in degrees
+    """
+    points = _points(keypoints)
+    triplets = np.asarray(triplets, dtype=np.intp).reshape(-1, 3)
+    return angles_from_points(points[..., triplets[:, 0], :], points[..., triplets[:, 1], :],
+                              points[..., triplets[:, 2], :])
+
+
+def segment_vertical_angles(keypoints, segments):
+    """
+    Angles of many segments from the image vertical over many frames.
+
+    Args:
+        keypoints (numpy.ndarray): (..., joints, 2) positions
+        segments (array-like): (S, 2) joint indices (top, bottom)
+
+    Returns:
+        numpy.ndarray: (..., S) angles in degrees
+    """
+    points = _points(keypoints)
+    segments = np.asarray(segments, dtype=np.intp).reshape(-1, 2)
+    return vertical_angles_from_points(points[..., segments[:, 0], :], points[..., segments[:, 1], :])
+
+
+def segment_lengths(keypoints, segments):
+    """
+    Lengths of many segments over many frames.
+
+    Args:
+        keypoints (numpy.ndarray): (..., joints, 2) positions
+        segments (array-like): (S, 2) joint indices (start, end)
+
+    Returns:
+        numpy.ndarray: (..., S) lengths
+    """
+    points = _points(keypoints)
+    segments = np.asarray(segments, dtype=np.intp).reshape(-1, 2)
+    return lengths_from_points(points[..., segments[:, 0], :], points[..., segments[:, 1], :])
+
+
+def symmetry_index(left, right):
+    """
+    Left/right asymmetry as a percentage of the mean of both sides.
+
+    0 is perfectly symmetric; |left - right| / ((left + right) / 2) * 100.
+
+    Args:
+        left, right (numpy.ndarray): Matching arrays of angles or lengths
+
+    Returns:
+        numpy.ndarray: Asymmetry in percent, NaN where a side is missing or
+            both sides are 0
+    """
+    left = _points(left)
+    right = _points(right)
+    mean = (np.abs(left) + np.abs(right)) / 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        index = np.abs(left - right) / mean * 100
+    return np.where(mean > 0, index, np.nan)
@@ -0,0 +1,345 @@
+"""
+Array representation of pose keypoints over a video, and its analysis.
+
+detect_pose returns one dict of joint name -> (x, y) per frame. A
+PoseSequence stores a whole clip as one (frames, 14, 2) float32 array in the
+fixed JOINTS order, with a (frames, 14) confidence array and per-frame
+timestamps. Missing joints are NaN with confidence 0.
+
+analyze_pose_sequence applies the rules of analyze_keypoints to every frame
+at once with array operations, and summarize_pose_analysis turns the
+per-frame results into the insight lists shown on the Form Analysis page.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.pose_geometry import (
+    vertical_angles_from_points, joint_angles, segment_lengths,
+    segment_vertical_angles, symmetry_index
+)
+
+# Joint order of the keypoint arrays, as produced by detect_pose
+JOINTS = (
+    'head', 'neck',
+    'right_shoulder', 'left_shoulder',
+    'right_elbow', 'left_elbow',
+    'right_wrist', 'left_wrist',
+    'right_hip', 'left_hip',
+    'right_knee', 'left_knee',
+    'right_ankle', 'left_ankle'
+)
+
+JOINT_INDEX = {name: index for index, name in enumerate(JOINTS)}
+
+# Joint angles as (a, b, c) joint triplets; the angle is at b
+JOINT_ANGLES = {
+    'right_knee': ('right_hip', 'right_knee', 'right_ankle'),
+    'left_knee': ('left_hip', 'left_knee', 'left_ankle'),
+    'right_hip': ('right_shoulder', 'right_hip', 'right_knee'),
+    'left_hip': ('left_shoulder', 'left_hip', 'left_knee'),
+    'right_elbow': ('right_shoulder', 'right_elbow', 'right_wrist'),
+    'left_elbow': ('left_shoulder', 'left_elbow', 'left_wrist'),
+    'right_shoulder': ('right_elbow', 'right_shoulder', 'right_hip'),
+    'left_shoulder': ('left_elbow', 'left_shoulder', 'left_hip')
+}
+
+# Body segments as (start, end) joints, top to bottom
+SEGMENTS = {
+    'right_upper_arm': ('right_shoulder', 'right_elbow'),
+    'left_upper_arm': ('left_shoulder', 'left_elbow'),
+    'right_forearm': ('right_elbow', 'right_wrist'),
+    'left_forearm': ('left_elbow', 'left_wrist'),
+    'right_thigh': ('right_hip', 'right_knee'),
+    'left_thigh': ('left_hip', 'left_knee'),
+    'right_shin': ('right_knee', 'right_ankle'),
+    'left_shin': ('left_knee', 'left_ankle')
+}
+
+# Thresholds of analyze_keypoints
+LEVEL_TOLERANCE = 0.05          # fraction of image height
+SPINE_VERTICAL_DEGREES = 10.0
+KNEE_ANKLE_TOLERANCE = 0.1      # fraction of image width
+
+
+class PoseSequence:
+    """Keypoints of a clip as (frames, joints, 2) arrays."""
+
+    def __init__(self, keypoints, confidence=None, timestamps=None, image_shape=None):
+        """
+        Wrap keypoint arrays.
+
+        Args:
+            keypoints (numpy.ndarray): (frames, 14, 2) x/y positions in JOINTS
+                order, NaN for missing joints
+            confidence (numpy.ndarray, optional): (frames, 14) scores in [0, 1];
+                1 for every joint present by default
+            timestamps (numpy.ndarray, optional): (frames,) seconds; the frame
+                number by default
+            image_shape (tuple, optional): (height, width, ...) of the frames
+        """
+        keypoints = np.asarray(keypoints, dtype=np.float32).reshape(-1, len(JOINTS), 2)
+        if confidence is None:
+            confidence = (~np.isnan(keypoints).any(axis=2)).astype(np.float32)
+        if timestamps is None:
+            timestamps = np.arange(len(keypoints), dtype=np.float64)
+
+        self.keypoints = keypoints
+        self.confidence = np.asarray(confidence, dtype=np.float32)
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+        self.image_shape = tuple(image_shape) if image_shape is not None else None
+
+        if self.confidence.shape != keypoints.shape[:2] or self.timestamps.shape != keypoints.shape[:1]:
+            raise ValueError("confidence and timestamps must have one entry per frame and joint")
+
+    @classmethod
+    def from_keypoints(cls, keypoints_list, timestamps=None, image_shape=None):
+        """
+        Build a sequence from detect_pose dicts.
+
+        Args:
+            keypoints_list (list): One dict of joint name -> (x, y) per frame;
+                joints missing from a dict (or an empty dict) are NaN
+            timestamps (list, optional): Seconds per frame
+            image_shape (tuple, optional): Shape of the frames
+
+        Returns:
+            PoseSequence: The sequence
+        """
+        keypoints = np.full((len(keypoints_list), len(JOINTS), 2), np.nan, dtype=np.float32)
+        for frame, points in enumerate(keypoints_list):
+            for name, point in (points or {}).items():
+                index = JOINT_INDEX.get(name)
+                if index is not None:
+                    keypoints[frame, index] = point
+        return cls(keypoints, timestamps=timestamps, image_shape=image_shape)
+
+    @classmethod
+    def from_frame_results(cls, frame_results):
+        """
+        Build a sequence from VideoAnalysisPipeline frame results.
+
+        The pose model's scores are kept when every result has them;
+        otherwise present joints get confidence 1.
+
+        Args:
+            frame_results (list): FrameResult objects in clip order
+
+        Returns:
+            PoseSequence: The sequence
+        """
+        sequence = cls.from_keypoints(
+            [result.keypoints for result in frame_results],
+            timestamps=[result.timestamp for result in frame_results],
+            image_shape=frame_results[0].shape if frame_results else None
+        )
+        if frame_results and all(result.confidence is not None for result in frame_results):
+            confidence = np.stack([result.confidence for result in frame_results]).astype(np.float32)
+            # Joints the dicts leave out are missing, whatever their score
+            sequence.confidence = np.where(np.isnan(sequence.keypoints).any(axis=2), 0.0, confidence).astype(np.float32)
+        return sequence
+
+    def __len__(self):
+        return len(self.keypoints)
+
+    def joint(self, name):
+        """
+        Positions of one joint over the clip.
+
+        Args:
+            name (str): Joint name from JOINTS
+
+        Returns:
+            numpy.ndarray: (frames, 2) x/y positions
+        """
+        return self.keypoints[:, JOINT_INDEX[name]]
+
+    def frame_keypoints(self, frame):
+        """
+        Keypoints of one frame as a detect_pose style dict.
+
+        Args:
+            frame (int): Frame number within the sequence
+
+        Returns:
+            dict: Joint name -> (x, y) for the joints present in the frame
+        """
+        return {
+            name: (float(x), float(y))
+            for name, (x, y) in zip(JOINTS, self.keypoints[frame])
+            if not (np.isnan(x) or np.isnan(y))
+        }
+
+
+def _indices(definitions):
+    """Joint index array of named joint tuples."""
+    return np.array([[JOINT_INDEX[name] for name in joints] for joints in definitions.values()], dtype=np.intp)
+
+
+def analyze_pose_geometry(sequence):
+    """
+    Joint angles, segment geometry and left/right symmetry for every frame.
+
+    Args:
+        sequence (PoseSequence): Keypoints of the clip
+
+    Returns:
+        pd.DataFrame: One row per frame with timestamp, '<joint>_angle' for
+            JOINT_ANGLES, '<segment>_length' and '<segment>_vertical_angle' for
+            SEGMENTS, and '<name>_symmetry' (percent asymmetry) for every
+            right/left pair of those
+    """
+    angles = joint_angles(sequence.keypoints, _indices(JOINT_ANGLES))
+    lengths = segment_lengths(sequence.keypoints, _indices(SEGMENTS))
+    verticals = segment_vertical_angles(sequence.keypoints, _indices(SEGMENTS))
+
+    columns = {'timestamp': sequence.timestamps}
+    columns.update({f'{name}_angle': angles[:, i] for i, name in enumerate(JOINT_ANGLES)})
+    columns.update({f'{name}_length': lengths[:, i] for i, name in enumerate(SEGMENTS)})
+    columns.update({f'{name}_vertical_angle': verticals[:, i] for i, name in enumerate(SEGMENTS)})
+
+    for kind, names, values in [('angle', list(JOINT_ANGLES), angles), ('length', list(SEGMENTS), lengths)]:
+        for i, name in enumerate(names):
+            if name.startswith('right_'):
+                base = name[len('right_'):]
+                columns[f'{base}_{kind}_symmetry'] = symmetry_index(values[:, names.index(f'left_{base}')], values[:, i])
+
+    return pd.DataFrame(columns)
+
+
+def analyze_pose_sequence(sequence, image_shape=None):
+    """
+    Per-frame form metrics for a whole sequence in one vectorized pass.
+
+    Uses the rules of analyze_keypoints: shoulders and hips are level within 5%
+    of the image height, the neck to mid-hip line is vertical within 10
+    degrees, and knees are over the ankles within 10% of the image width.
+    Frames with missing joints get NaN angles and False checks.
+
+    Args:
+        sequence (PoseSequence): Keypoints of the clip
+        image_shape (tuple, optional): Frame shape; defaults to the sequence's
+
+    Returns:
+        pd.DataFrame: One row per frame with timestamp, spine_angle,
+            right_knee_angle, left_knee_angle and the boolean checks
+            spine_vertical, shoulders_level, hips_level, knees_over_ankles
+    """
+    image_shape = image_shape or sequence.image_shape
+    if image_shape is None:
+        raise ValueError("image_shape is required to apply the alignment thresholds")
+    height, width = image_shape[0], image_shape[1]
+
+    points = sequence.keypoints.astype(np.float64)
+    joint = lambda name: points[:, JOINT_INDEX[name]]
+
+    with np.errstate(invalid='ignore'):
+        shoulders_level = np.abs(joint('right_shoulder')[:, 1] - joint('left_shoulder')[:, 1]) < height * LEVEL_TOLERANCE
+        hips_level = np.abs(joint('right_hip')[:, 1] - joint('left_hip')[:, 1]) < height * LEVEL_TOLERANCE
+
+        # Integer midpoint, as analyze_keypoints computes it
+        mid_hip = np.floor((joint('right_hip') + joint('left_hip')) / 2)
+        spine_angle = vertical_angles_from_points(joint('neck'), mid_hip)
+
+        knees_over_ankles = (
+            (np.abs(joint('right_knee')[:, 0] - joint('right_ankle')[:, 0]) < width * KNEE_ANKLE_TOLERANCE)
+            & (np.abs(joint('left_knee')[:, 0] - joint('left_ankle')[:, 0]) < width * KNEE_ANKLE_TOLERANCE)
+        )
+
+        spine_vertical = spine_angle < SPINE_VERTICAL_DEGREES
+
+    knee_angles = joint_angles(points, _indices({name: JOINT_ANGLES[name] for name in ['right_knee', 'left_knee']}))
+
+    return pd.DataFrame({
+        'timestamp': sequence.timestamps,
+        'spine_angle': spine_angle,
+        'right_knee_angle': knee_angles[:, 0],
+        'left_knee_angle': knee_angles[:, 1],
+        'spine_vertical': spine_vertical,
+        'shoulders_level': shoulders_level,
+        'hips_level': hips_level,
+        'knees_over_ankles': knees_over_ankles
+    })
+
+
+def summarize_pose_analysis(frame_metrics):
+    """
+    Turn per-frame metrics into form insights for the whole clip.
+
+    Each check of analyze_keypoints passes when it holds in most frames; the
+    insights report how often it held and the angle ranges over the clip.
+
+    Args:
+        frame_metrics (pd.DataFrame): Output of analyze_pose_sequence
+
+    Returns:
+        dict: Category -> list of insight strings, with the categories of
+            analyze_keypoints plus "Movement Pattern"
+    """
+    analyzed = frame_metrics.dropna(subset=['spine_angle'])
+    if analyzed.empty:
+        return {
+            "Posture": ["No pose detected in the analyzed frames"],
+            "Alignment": ["No pose detected in the analyzed frames"],
+            "Balance": ["No pose detected in the analyzed frames"],
+            "Joint Angles": ["No pose detected in the analyzed frames"]
+        }
+
+    share = lambda column: analyzed[column].mean()
+    form_analysis = {
+        "Posture": [],
+        "Alignment": [],
+        "Balance": [],
+        "Joint Angles": [],
+        "Movement Pattern": []
+    }
+
+    # Posture analysis
+    spine = analyzed['spine_angle']
+    spine_range = f"{spine.min():.1f}°-{spine.max():.1f}°"
+    if share('spine_vertical') >= 0.5:
+        form_analysis["Posture"].append(
+            f"Good vertical spine alignment in {share('spine_vertical'):.0%} of frames ({spine_range})"
+        )
+    else:
+        form_analysis["Posture"].append(
+            f"Spine angle averages {spine.mean():.1f}° from vertical ({spine_range}) - consider improving posture"
+        )
+
+    # Alignment analysis
+    if share('shoulders_level') >= 0.5:
+        form_analysis["Alignment"].append(f"Good shoulder alignment in {share('shoulders_level'):.0%} of frames")
+    else:
+        form_analysis["Alignment"].append("Shoulders are not level in most frames - check for imbalances")
+
+    if share('hips_level') >= 0.5:
+        form_analysis["Alignment"].append(f"Good hip alignment in {share('hips_level'):.0%} of frames")
+    else:
+        form_analysis["Alignment"].append("Hips are not level in most frames - check for imbalances")
+
+    # Balance analysis
+    if share('knees_over_ankles') >= 0.5:
+        form_analysis["Balance"].append(
+            f"Good knee alignment over ankles in {share('knees_over_ankles'):.0%} of frames"
+        )
+    else:
+        form_analysis["Balance"].append("Knees not properly aligned with ankles - may affect stability")
+
+    # Joint angle analysis
+    for side in ['Right', 'Left']:
+        angles = analyzed[f'{side.lower()}_knee_angle']
+        form_analysis["Joint Angles"].append(
+            f"{side} knee angle: {angles.mean():.1f}° average ({angles.min():.1f}°-{angles.max():.1f}°)"
+        )
+
+    # Movement pattern: range of motion and steadiness over the clip
+    knee_range = (analyzed['right_knee_angle'].max() - analyzed['right_knee_angle'].min()
+                  + analyzed['left_knee_angle'].max() - analyzed['left_knee_angle'].min()) / 2
+    form_analysis["Movement Pattern"].append(f"Knee range of motion: {knee_range:.1f}° over {len(analyzed)} frames")
+    if spine.std(ddof=0) < 2.0:
+        form_analysis["Movement Pattern"].append("Consistent trunk position throughout the movement")
+    else:
+        form_analysis["Movement Pattern"].append(
+            f"Trunk angle varies by {spine.std(ddof=0):.1f}° - work on a steadier trunk"
+        )
+
+    return form_analysis
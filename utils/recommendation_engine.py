@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 import logging
+from utils.trend import series_trend
+from utils.performance_frame import athlete_rows, metric_columns
 # import openai
 # import os
 
@@ -61,22 +63,21 @@ def _generate_performance_recommendations(data, athlete):
     Generate recommendations based on performance data.
     
     Args:
-        data (pd.DataFrame): Performance data
+        data (pd.DataFrame, PerformanceFrame or PerformanceStore): Performance data
         athlete (str): Name of the athlete
         
     Returns:
         dict: Recommendations by category
     """
-    # Filter data for the selected athlete
-    athlete_data = data[data['Athlete'] == athlete].copy()
+    # The athlete's rows with parsed dates, in date order
+    athlete_data = athlete_rows(data, athlete)
     
     # Get the metrics (excluding non-metric columns)
-    metric_columns = [col for col in athlete_data.columns 
-                     if col not in ['Athlete', 'Date', 'Session', 'Notes']]
+    metrics = metric_columns(athlete_data)
     
     # Calculate statistics for each metric
     metric_stats = {}
-    for metric in metric_columns:
+    for metric in metrics:
         metric_data = athlete_data[metric].dropna()
         if len(metric_data) > 0:
             metric_stats[metric] = {
@@ -282,21 +283,8 @@ def _calculate_trend(data_series):
     Returns:
         str: 'increasing', 'decreasing', or 'stable'
     """
-    if len(data_series) < 3:
-        return 'insufficient_data'
-    
-    # Simple linear regression to find the slope
-    x = np.arange(len(data_series))
-    y = data_series.values
-    slope = np.polyfit(x, y, 1)[0]
-    
-    # Determine trend direction
-    if abs(slope) < 0.01 * data_series.mean():  # Less than 1% change on average
-        return 'stable'
-    elif slope > 0:
-        return 'increasing'
-    else:
-        return 'decreasing'
+    # Missing values are skipped rather than breaking the fit
+    return series_trend(np.asarray(data_series, dtype=float), min_points=3)
 
 def generate_recommendations_manual(performance_data=None, athlete=None, form_analysis=None):
     recommendations = {}
@@ -0,0 +1,279 @@
+"""
+Rolling-window and acute:chronic workload analytics.
+
+For every athlete and metric, and every day, computes:
+
+- rolling acute (7-day) and chronic (28-day) means of the daily values
+- exponentially weighted acute and chronic averages (EWMA, lambda = 2 / (N + 1))
+  and their ratio, the acute:chronic workload ratio (ACWR)
+- the week-over-week change of the acute rolling mean
+
+Daily values are the mean of that day's sessions; days without a session are
+missing and are skipped by the means and the EWMAs. compute_rolling_metrics
+processes a whole history in one vectorized pass over a (day, athlete, metric)
+array. The RollingWorkload it returns can then be advanced one day at a time
+with update(), without recomputing the history.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.performance_frame import frame_data
+
+ACUTE_WINDOW = 7
+CHRONIC_WINDOW = 28
+
+# Columns that are never treated as metrics
+_NON_METRIC_COLUMNS = ['Athlete', 'Date', 'Session', 'Notes', 'Sport', 'Team']
+
+ROLLING_COLUMNS = ['date', 'athlete', 'metric', 'acute_mean', 'chronic_mean',
+                   'acute_ewma', 'chronic_ewma', 'acwr', 'wow_delta']
+
+
+def _window_means(values, window):
+    """Trailing window means along axis 0, skipping NaN."""
+    valid = ~np.isnan(values)
+    zeros = np.zeros((1,) + values.shape[1:])
+    sums = np.concatenate([zeros, np.cumsum(np.where(valid, values, 0.0), axis=0)])
+    counts = np.concatenate([zeros, np.cumsum(valid, axis=0)])
+    
+    stop = np.arange(1, len(values) + 1)
+    start = np.maximum(stop - window, 0)
+    window_sums = sums[stop] - sums[start]
+    window_counts = counts[stop] - counts[start]
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(window_counts > 0, window_sums / window_counts, np.nan), window_sums, window_counts
+
+
+def _nan_mean(values):
+    """Mean along axis 0 skipping NaN; NaN (without a warning) where all are missing."""
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(counts > 0, np.where(valid, values, 0.0).sum(axis=0) / counts, np.nan)
+
+
+def _ewma_step(previous, values, alpha):
+    """One EWMA day: missing values keep the previous average, the first value starts it."""
+    valid = ~np.isnan(values)
+    updated = np.where(np.isnan(previous), values, alpha * values + (1 - alpha) * previous)
+    return np.where(valid, updated, previous)
+
+
+def _ratio(acute, chronic):
+    """Acute:chronic ratio, NaN where the chronic average is not positive."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(chronic > 0, acute / chronic, np.nan)
+
+
+class RollingWorkload:
+    """Rolling-window state of every athlete and metric, advanced one day at a time."""
+    
+    def __init__(self, athletes, metrics, acute=ACUTE_WINDOW, chronic=CHRONIC_WINDOW):
+        """
+        Args:
+            athletes (list): Athlete names
+            metrics (list): Metric names
+            acute (int): Acute window in days
+            chronic (int): Chronic window in days
+        """
+        if not 0 < acute <= chronic:
+            raise ValueError("Windows must satisfy 0 < acute <= chronic")
+        
+        self.athletes = list(athletes)
+        self.metrics = list(metrics)
+        self.acute = acute
+        self.chronic = chronic
+        self.last_date = None
+        
+        shape = (len(self.athletes), len(self.metrics))
+        # Daily values of the last `chronic` days, oldest first
+        self.days = np.full((chronic,) + shape, np.nan)
+        # Acute rolling means of the last `acute` + 1 days, for week-over-week deltas
+        self.acute_history = np.full((acute + 1,) + shape, np.nan)
+        self.acute_ewma = np.full(shape, np.nan)
+        self.chronic_ewma = np.full(shape, np.nan)
+    
+    def _grow(self, athletes, metrics):
+        """Add state for athletes or metrics seen for the first time."""
+        new_athletes = [name for name in athletes if name not in self.athletes]
+        new_metrics = [name for name in metrics if name not in self.metrics]
+        if not new_athletes and not new_metrics:
+            return
+        
+        pad = ((0, len(new_athletes)), (0, len(new_metrics)))
+        self.days = np.pad(self.days, ((0, 0),) + pad, constant_values=np.nan)
+        self.acute_history = np.pad(self.acute_history, ((0, 0),) + pad, constant_values=np.nan)
+        self.acute_ewma = np.pad(self.acute_ewma, pad, constant_values=np.nan)
+        self.chronic_ewma = np.pad(self.chronic_ewma, pad, constant_values=np.nan)
+        self.athletes += new_athletes
+        self.metrics += new_metrics
+    
+    def _advance(self, values):
+        """Roll the state forward by one day with that day's (athlete, metric) values."""
+        self.days = np.concatenate([self.days[1:], values[None]])
+        acute_mean = _nan_mean(self.days[-self.acute:])
+        
+        self.acute_history = np.concatenate([self.acute_history[1:], acute_mean[None]])
+        self.acute_ewma = _ewma_step(self.acute_ewma, values, 2 / (self.acute + 1))
+        self.chronic_ewma = _ewma_step(self.chronic_ewma, values, 2 / (self.chronic + 1))
+    
+    def update(self, day_data):
+        """
+        Advance the state with the sessions of one new day.
+        
+        Days skipped since the last update are treated as days without sessions.
+        
+        Args:
+            day_data (pd.DataFrame): Sessions of a single day, with Athlete,
+                Date and metric columns
+                
+        Returns:
+            pd.DataFrame: The new day's rolling metrics (ROLLING_COLUMNS)
+        """
+        df = frame_data(day_data)
+        dates = pd.to_datetime(df['Date'], errors='coerce').dt.normalize().dropna().unique()
+        if len(dates) != 1:
+            raise ValueError("update() expects the sessions of exactly one day")
+        date = pd.Timestamp(dates[0])
+        if self.last_date is not None and date <= self.last_date:
+            raise ValueError(f"Day {date.date()} is not after the last processed day {self.last_date.date()}")
+        
+        metrics = [col for col in df.columns
+                   if col not in _NON_METRIC_COLUMNS and pd.api.types.is_numeric_dtype(df[col])]
+        daily = df.groupby('Athlete', observed=True)[metrics].mean()
+        self._grow(daily.index, metrics)
+        
+        # Days without sessions between the last update and this one
+        if self.last_date is not None:
+            empty = np.full(self.acute_ewma.shape, np.nan)
+            for _ in range((date - self.last_date).days - 1):
+                self._advance(empty)
+        
+        values = np.full(self.acute_ewma.shape, np.nan)
+        rows = [self.athletes.index(name) for name in daily.index]
+        columns = [self.metrics.index(name) for name in metrics]
+        values[np.ix_(rows, columns)] = daily.to_numpy(dtype=float)
+        
+        self._advance(values)
+        self.last_date = date
+        return self.latest()
+    
+    def latest(self):
+        """
+        Rolling metrics of the last processed day.
+        
+        Returns:
+            pd.DataFrame: One row per athlete and metric with data in the chronic window
+        """
+        chronic_mean = _nan_mean(self.days)
+        
+        result = {
+            'acute_mean': self.acute_history[-1],
+            'chronic_mean': chronic_mean,
+            'acute_ewma': self.acute_ewma,
+            'chronic_ewma': self.chronic_ewma,
+            'acwr': _ratio(self.acute_ewma, self.chronic_ewma),
+            'wow_delta': self.acute_history[-1] - self.acute_history[0]
+        }
+        
+        athletes, metrics = np.meshgrid(np.arange(len(self.athletes)), np.arange(len(self.metrics)), indexing='ij')
+        frame = pd.DataFrame({
+            'date': self.last_date,
+            'athlete': np.asarray(self.athletes, dtype=object)[athletes.ravel()],
+            'metric': np.asarray(self.metrics, dtype=object)[metrics.ravel()],
+            **{name: np.broadcast_to(values, athletes.shape).ravel() for name, values in result.items()}
+        })
+        return frame[frame['chronic_mean'].notna()].reset_index(drop=True)[ROLLING_COLUMNS]
+    
+    def athlete_summary(self, athlete):
+        """
+        Latest rolling metrics of one athlete, keyed like process_performance_data's metrics.
+        
+        Args:
+            athlete (str): The athlete's name
+            
+        Returns:
+            dict: Metric name -> dict of rolling values
+        """
+        latest = self.latest()
+        latest = latest[latest['athlete'] == athlete].set_index('metric')
+        return latest.drop(columns=['date', 'athlete']).to_dict(orient='index')
+
+
+def compute_rolling_metrics(data, acute=ACUTE_WINDOW, chronic=CHRONIC_WINDOW):
+    """
+    Rolling metrics for every athlete, metric and day in one vectorized pass.
+    
+    Args:
+        data (pd.DataFrame, PerformanceFrame or PerformanceStore): Performance
+            data with Athlete and Date columns
+        acute (int): Acute window in days
+        chronic (int): Chronic window in days
+        
+    Returns:
+        tuple: (pd.DataFrame with ROLLING_COLUMNS for every day on which an
+            athlete has data in the chronic window, RollingWorkload positioned
+            at the last day for incremental updates)
+    """
+    df = frame_data(data)
+    metrics = [col for col in df.columns
+               if col not in _NON_METRIC_COLUMNS and pd.api.types.is_numeric_dtype(df[col])]
+    
+    dates = pd.to_datetime(df['Date'], errors='coerce').dt.normalize()
+    df = df.assign(Date=dates)[dates.notna() & df['Athlete'].notna()]
+    if df.empty or not metrics:
+        return pd.DataFrame(columns=ROLLING_COLUMNS), RollingWorkload([], metrics, acute, chronic)
+    
+    # Daily (athlete, metric) means on a dense day x athlete x metric grid
+    daily = df.groupby(['Date', 'Athlete'], observed=True)[metrics].mean()
+    day_index = daily.index.get_level_values('Date')
+    athlete_codes, athletes = pd.factorize(daily.index.get_level_values('Athlete'))
+    first_day = day_index.min()
+    day_codes = (day_index - first_day).days.to_numpy()
+    n_days = day_codes.max() + 1
+    
+    values = np.full((n_days, len(athletes), len(metrics)), np.nan)
+    values[day_codes, athlete_codes] = daily.to_numpy(dtype=float)
+    
+    acute_mean, _, _ = _window_means(values, acute)
+    chronic_mean, _, _ = _window_means(values, chronic)
+    wow_delta = np.full_like(acute_mean, np.nan)
+    wow_delta[acute:] = acute_mean[acute:] - acute_mean[:-acute]
+    
+    # The EWMA recursion runs over days, vectorized across athletes and metrics
+    acute_ewma = np.empty_like(values)
+    chronic_ewma = np.empty_like(values)
+    state_acute = np.full(values.shape[1:], np.nan)
+    state_chronic = np.full(values.shape[1:], np.nan)
+    for day in range(n_days):
+        state_acute = _ewma_step(state_acute, values[day], 2 / (acute + 1))
+        state_chronic = _ewma_step(state_chronic, values[day], 2 / (chronic + 1))
+        acute_ewma[day] = state_acute
+        chronic_ewma[day] = state_chronic
+    
+    grid = pd.MultiIndex.from_product(
+        [pd.date_range(first_day, periods=n_days, freq='D'), list(athletes), metrics],
+        names=['date', 'athlete', 'metric']
+    ).to_frame(index=False)
+    columns = {
+        'acute_mean': acute_mean, 'chronic_mean': chronic_mean,
+        'acute_ewma': acute_ewma, 'chronic_ewma': chronic_ewma,
+        'acwr': _ratio(acute_ewma, chronic_ewma), 'wow_delta': wow_delta
+    }
+    for name, array in columns.items():
+        grid[name] = array.ravel()
+    grid['athlete'] = grid['athlete'].astype(object)
+    result = grid[grid['chronic_mean'].notna()].reset_index(drop=True)
+    
+    # Final state for incremental updates
+    workload = RollingWorkload(list(athletes), metrics, acute, chronic)
+    tail = values[-chronic:]
+    workload.days[chronic - len(tail):] = tail
+    tail = acute_mean[-(acute + 1):]
+    workload.acute_history[acute + 1 - len(tail):] = tail
+    workload.acute_ewma = state_acute
+    workload.chronic_ewma = state_chronic
+    workload.last_date = first_day + pd.Timedelta(days=int(n_days - 1))
+    
+    return result[ROLLING_COLUMNS], workload
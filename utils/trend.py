@@ -0,0 +1,119 @@
+"""
+Shared trend kernel for performance metrics.
+
+Computes least-squares trend slopes for many series at once with the closed
+form solution instead of one np.polyfit call per series, and labels them with
+the trend rules used throughout the app.
+"""
+import numpy as np
+
+# A slope smaller than this fraction of the series mean counts as stable
+STABLE_SLOPE_FRACTION = 0.01
+
+
+def slopes_from_sums(n, sum_x, sum_y, sum_xy, sum_xx):
+    """
+    Closed-form least-squares slopes from per-series sums.
+    
+    Args:
+        n (array-like): Number of points in each series
+        sum_x, sum_y, sum_xy, sum_xx (array-like): Per-series sums of x, y, x*y and x*x
+        
+    Returns:
+        numpy.ndarray: Slope of each series, NaN where fewer than two distinct x values
+    """
+    n = np.asarray(n, dtype=float)
+    sum_x = np.asarray(sum_x, dtype=float)
+    
+    denominator = n * np.asarray(sum_xx, dtype=float) - sum_x ** 2
+    numerator = n * np.asarray(sum_xy, dtype=float) - sum_x * np.asarray(sum_y, dtype=float)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def batch_trend_slopes(values):
+    """
+    Least-squares slopes for every row of a (series x time) array.
+    
+    Missing values (NaN) are skipped; the remaining values keep their time
+    positions, so x is the column index.
+    
+    Args:
+        values (array-like): 2-D array with one series per row
+        
+    Returns:
+        tuple: (slopes, counts, means) arrays with one entry per series
+    """
+    y = np.atleast_2d(np.asarray(values, dtype=float))
+    valid = ~np.isnan(y)
+    counts = valid.sum(axis=1)
+    
+    x = np.broadcast_to(np.arange(y.shape[1], dtype=float), y.shape)
+    y_filled = np.where(valid, y, 0.0)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_mean = np.where(valid, x, 0.0).sum(axis=1) / counts
+        y_mean = y_filled.sum(axis=1) / counts
+        
+        # Centered sums are more accurate than raw sums for long series
+        dx = np.where(valid, x - x_mean[:, None], 0.0)
+        dy = np.where(valid, y_filled - y_mean[:, None], 0.0)
+        sxx = (dx * dx).sum(axis=1)
+        slopes = np.where(sxx > 0, (dx * dy).sum(axis=1) / sxx, np.nan)
+    
+    return slopes, counts, y_mean
+
+
+def classify_trends(slopes, means, counts, min_points=2):
+    """
+    Label slopes as 'increasing', 'decreasing', 'stable' or 'insufficient_data'.
+    
+    Args:
+        slopes (array-like): Trend slope of each series
+        means (array-like): Mean of each series
+        counts (array-like): Number of values in each series
+        min_points (int): Fewest values needed to report a trend
+        
+    Returns:
+        numpy.ndarray: Trend label for each series
+    """
+    slopes = np.asarray(slopes, dtype=float)
+    means = np.asarray(means, dtype=float)
+    counts = np.asarray(counts)
+    
+    return np.select(
+        [counts < min_points, np.abs(slopes) < STABLE_SLOPE_FRACTION * means, slopes > 0],
+        ['insufficient_data', 'stable', 'increasing'],
+        default='decreasing'
+    )
+
+
+def batch_trends(values, min_points=2):
+    """
+    Slopes and trend labels for every row of a (series x time) array.
+    
+    Args:
+        values (array-like): 2-D array with one series per row, NaN for missing values
+        min_points (int): Fewest values needed to report a trend
+        
+    Returns:
+        tuple: (slopes, labels) arrays with one entry per series
+    """
+    slopes, counts, means = batch_trend_slopes(values)
+    return slopes, classify_trends(slopes, means, counts, min_points=min_points)
+
+
+def series_trend(values, min_points=2):
+    """
+    Trend label for a single series.
+    
+    Args:
+        values (array-like): The series values, NaN for missing values
+        min_points (int): Fewest values needed to report a trend
+        
+    Returns:
+        str: 'increasing', 'decreasing', 'stable' or 'insufficient_data'
+    """
+    _, labels = batch_trends(np.asarray(values, dtype=float)[None, :], min_points=min_points)
+    return str(labels[0])
@@ -0,0 +1,266 @@
+"""
+Pipelined video analysis: decode -> pose -> analysis -> ordered results.
+
+Decoding runs on its own thread and feeds a bounded queue. A thread pool runs
+detect_pose and analyze_keypoints on each frame; OpenCV and NumPy release the
+GIL for the heavy work, so frames are processed in parallel across cores.
+Results are collected in frame order on the calling thread, which can report
+progress as each frame completes:
+
+    pipeline = VideoAnalysisPipeline(workers=4)
+    result = pipeline.run(VideoFrameSource(path, target_fps=10))
+    result.stats['pose']['fps']
+
+At most queue_size decoded frames wait for a worker and at most
+workers + queue_size are in flight, so memory does not grow with the clip.
+
+With a pose_batch_fn, workers take batch_size frames at a time, so a pose
+model runs one forward pass per batch instead of one per frame. A
+pose_estimate_fn does the same and also keeps the model's per-joint scores
+in each FrameResult's confidence:
+
+    backend = get_pose_backend()
+    pipeline = VideoAnalysisPipeline(pose_estimate_fn=backend.estimate_batch, batch_size=8)
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.image_analyzer import analyze_keypoints, detect_pose
+from utils.pose_backends import keypoints_to_dict
+
+logger = logging.getLogger(__name__)
+
+# Worker threads for pose detection and analysis, overridable from the environment
+VIDEO_PIPELINE_WORKERS = int(os.environ.get('VIDEO_PIPELINE_WORKERS', os.cpu_count() or 1))
+
+# Decoded frames allowed to wait for a worker
+VIDEO_PIPELINE_QUEUE_SIZE = int(os.environ.get('VIDEO_PIPELINE_QUEUE_SIZE', 16))
+
+# Pipeline stages with their own timing
+STAGES = ('decode', 'pose', 'analyze')
+
+# Result of one analyzed frame; confidence is the (14,) joint scores when the
+# pose stage provides them
+FrameResult = namedtuple('FrameResult', ['index', 'timestamp', 'shape', 'keypoints', 'analysis', 'confidence'],
+                         defaults=[None])
+
+# Marks the end of the decoded frames
+_END = object()
+
+
+class VideoAnalysisResult:
+    """Ordered frame results of a pipeline run with per-stage throughput."""
+
+    def __init__(self, frames, stats):
+        """
+        Collect the results of a pipeline run.
+
+        Args:
+            frames (list): FrameResult per analyzed frame, in clip order
+            stats (dict): Stage name -> dict with frames, seconds and fps
+        """
+        self.frames = frames
+        self.stats = stats
+
+    def __len__(self):
+        return len(self.frames)
+
+    @property
+    def keypoints(self):
+        """Detected keypoints of every frame, in clip order."""
+        return [frame.keypoints for frame in self.frames]
+
+
+class _StageTimer:
+    """Thread-safe busy time and frame counter of one stage."""
+
+    def __init__(self):
+        self.frames = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, seconds, frames=1):
+        with self._lock:
+            self.frames += frames
+            self.seconds += seconds
+
+    def summary(self):
+        # fps is per busy second of the stage, summed over its threads
+        return {
+            'frames': self.frames,
+            'seconds': self.seconds,
+            'fps': self.frames / self.seconds if self.seconds > 0 else 0.0
+        }
+
+
+class VideoAnalysisPipeline:
+    """Runs pose detection and form analysis over a video with a worker pool."""
+
+    def __init__(self, workers=VIDEO_PIPELINE_WORKERS, queue_size=VIDEO_PIPELINE_QUEUE_SIZE,
+                 pose_fn=detect_pose, analyze_fn=analyze_keypoints, pose_batch_fn=None, batch_size=1,
+                 pose_estimate_fn=None):
+        """
+        Configure the pipeline.
+
+        Args:
+            workers (int): Threads running pose detection and analysis
+            queue_size (int): Decoded frames that may wait for a worker
+            pose_fn (callable): frame -> keypoints, detect_pose by default
+            analyze_fn (callable, optional): (keypoints, shape) -> analysis,
+                analyze_keypoints by default; None to skip per-frame analysis
+            pose_batch_fn (callable, optional): list of frames -> list of
+                keypoints; replaces pose_fn when given
+            batch_size (int): Frames per worker task, passed together to
+                pose_batch_fn or pose_estimate_fn
+            pose_estimate_fn (callable, optional): list of frames ->
+                (keypoints, confidence) arrays, e.g. PoseBackend.estimate_batch;
+                replaces pose_fn and pose_batch_fn and keeps the scores
+        """
+        if workers < 1 or queue_size < 1 or batch_size < 1:
+            raise ValueError("workers, queue_size and batch_size must be at least 1")
+
+        self.workers = workers
+        self.queue_size = queue_size
+        self.pose_fn = pose_fn
+        self.analyze_fn = analyze_fn
+        self.pose_batch_fn = pose_batch_fn
+        self.batch_size = batch_size
+        self.pose_estimate_fn = pose_estimate_fn
+
+    def _decode(self, frames, frame_queue, stop, timer, errors):
+        """Decode stage: move frames from the source into the bounded queue."""
+        try:
+            iterator = iter(frames)
+            while not stop.is_set():
+                start = time.perf_counter()
+                frame = next(iterator, _END)
+                if frame is _END:
+                    break
+                timer.add(time.perf_counter() - start)
+                # Block while the queue is full, but give up once the run stops
+                while not stop.is_set():
+                    try:
+                        frame_queue.put(frame, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+        except Exception as e:
+            errors.append(e)
+        finally:
+            close = getattr(frames, 'close', None)
+            if close is not None:
+                close()
+            frame_queue.put(_END)
+
+    def _process(self, batch, pose_timer, analyze_timer):
+        """Worker stage: pose detection and analysis of a batch of frames."""
+        start = time.perf_counter()
+        batch_confidence = [None] * len(batch)
+        if self.pose_estimate_fn is not None:
+            points, batch_confidence = self.pose_estimate_fn([frame.image for frame in batch])
+            batch_keypoints = [keypoints_to_dict(frame_points) for frame_points in points]
+        elif self.pose_batch_fn is not None:
+            batch_keypoints = self.pose_batch_fn([frame.image for frame in batch])
+        else:
+            batch_keypoints = [self.pose_fn(frame.image) for frame in batch]
+        pose_timer.add(time.perf_counter() - start, len(batch))
+
+        results = []
+        for frame, keypoints, confidence in zip(batch, batch_keypoints, batch_confidence):
+            analysis = None
+            if self.analyze_fn is not None and keypoints:
+                start = time.perf_counter()
+                analysis = self.analyze_fn(keypoints, frame.image.shape)
+                analyze_timer.add(time.perf_counter() - start)
+            results.append(FrameResult(frame.index, frame.timestamp, frame.image.shape, keypoints, analysis, confidence))
+        return results
+
+    def run(self, frames, on_result=None):
+        """
+        Analyze every frame of a source.
+
+        Args:
+            frames (iterable): VideoFrame objects, e.g. a VideoFrameSource
+            on_result (callable, optional): Called on the calling thread with
+                each FrameResult, in clip order, as soon as it is ready
+
+        Returns:
+            VideoAnalysisResult: Ordered frame results and per-stage stats
+
+        Raises:
+            Exception: Errors from decoding or from a worker are re-raised
+        """
+        timers = {stage: _StageTimer() for stage in STAGES}
+        frame_queue = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        errors = []
+        results = []
+
+        started = time.perf_counter()
+        decoder = threading.Thread(
+            target=self._decode, args=(frames, frame_queue, stop, timers['decode'], errors),
+            name='video-decode', daemon=True
+        )
+        decoder.start()
+
+        in_flight = deque()
+        # Batches in flight, so at most about workers + queue_size frames wait
+        max_in_flight = self.workers + max(1, self.queue_size // self.batch_size)
+        batch = []
+
+        def submit():
+            in_flight.append(pool.submit(self._process, list(batch), timers['pose'], timers['analyze']))
+            batch.clear()
+
+        def collect(future):
+            for result in future.result():
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='video-pose')
+        try:
+            while True:
+                frame = frame_queue.get()
+                if frame is _END:
+                    break
+                batch.append(frame)
+                if len(batch) < self.batch_size:
+                    continue
+                submit()
+                # Ordered aggregation: wait on the oldest batch once enough are in flight
+                while len(in_flight) >= max_in_flight or (in_flight and in_flight[0].done()):
+                    collect(in_flight.popleft())
+            if batch:
+                submit()
+            while in_flight:
+                collect(in_flight.popleft())
+        finally:
+            stop.set()
+            # Frames not yet started are dropped if the run failed
+            pool.shutdown(wait=True, cancel_futures=True)
+            # Unblock the decoder if it is waiting to put the end marker
+            while decoder.is_alive():
+                try:
+                    frame_queue.get_nowait()
+                except queue.Empty:
+                    decoder.join(timeout=0.1)
+
+        if errors:
+            raise errors[0]
+
+        elapsed = time.perf_counter() - started
+        stats = {stage: timer.summary() for stage, timer in timers.items()}
+        stats['total'] = {
+            'frames': len(results),
+            'seconds': elapsed,
+            'fps': len(results) / elapsed if elapsed > 0 else 0.0
+        }
+        logger.info(f"Analyzed {len(results)} frames at {stats['total']['fps']:.1f} fps "
+                    f"with {self.workers} workers")
+        return VideoAnalysisResult(results, stats)
@@ -0,0 +1,160 @@
+"""
+Sequential video frame source for form analysis.
+
+Seeking with cap.set(cv2.CAP_PROP_POS_FRAMES, idx) makes the decoder restart
+at the previous keyframe for every sampled frame, so sampling a long-GOP MP4
+costs O(frames x GOP). The source instead walks the clip once: every frame is
+grab()bed (demuxed and decoded without conversion), and only the frames kept
+for the target analysis rate are retrieve()d into BGR images.
+
+Frames are yielded one at a time, so memory does not grow with the clip:
+
+    with VideoFrameSource(path, target_fps=5) as source:
+        for frame in source:
+            keypoints = detect_pose(frame.image)
+"""
+import logging
+import os
+from collections import namedtuple
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+# Frames per second analyzed by default, overridable from the environment
+DEFAULT_ANALYSIS_FPS = float(os.environ.get('VIDEO_ANALYSIS_FPS', 5.0))
+
+# Upper bound on the frames yielded from one clip (0 for no limit)
+MAX_ANALYSIS_FRAMES = int(os.environ.get('VIDEO_MAX_ANALYSIS_FRAMES', 3000))
+
+# A decoded frame with its position in the clip
+VideoFrame = namedtuple('VideoFrame', ['index', 'timestamp', 'image'])
+
+
+class VideoFrameSource:
+    """Decodes a video once, front to back, yielding frames at a target rate."""
+
+    def __init__(self, path, target_fps=DEFAULT_ANALYSIS_FPS, max_frames=MAX_ANALYSIS_FRAMES):
+        """
+        Open a video file.
+
+        Args:
+            path (str): Path of the video file
+            target_fps (float, optional): Frames per second to yield; None or a
+                rate at or above the clip's rate yields every frame
+            max_frames (int, optional): Stop after this many frames; None or 0
+                for the whole clip
+
+        Raises:
+            ValueError: If the video cannot be opened or target_fps is not positive
+        """
+        if target_fps is not None and target_fps <= 0:
+            raise ValueError("target_fps must be positive")
+
+        self.path = path
+        self.target_fps = target_fps
+        self.max_frames = max_frames or None
+
+        self._capture = cv2.VideoCapture(path)
+        if not self._capture.isOpened():
+            self._capture.release()
+            raise ValueError(f"Could not open video: {path}")
+
+        self.fps = self._capture.get(cv2.CAP_PROP_FPS) or 0.0
+        self.frame_count = int(self._capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        self.width = int(self._capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self._capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.frames_decoded = 0
+        self._started = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __iter__(self):
+        return self.frames()
+
+    @property
+    def duration(self):
+        """Length of the clip in seconds, or None if the container does not say."""
+        if self.fps > 0 and self.frame_count > 0:
+            return self.frame_count / self.fps
+        return None
+
+    @property
+    def step(self):
+        """Source frames per yielded frame (1.0 when every frame is yielded)."""
+        if self.target_fps is None or self.fps <= 0 or self.target_fps >= self.fps:
+            return 1.0
+        return self.fps / self.target_fps
+
+    @property
+    def expected_frames(self):
+        """Number of frames the source will yield, if the frame count is known."""
+        if self.frame_count <= 0:
+            return None
+        count = int(-(-self.frame_count // self.step))
+        return min(count, self.max_frames) if self.max_frames else count
+
+    def frames(self):
+        """
+        Yield the sampled frames of the clip in order.
+
+        The source can only be iterated once, since it never seeks.
+
+        Yields:
+            VideoFrame: index in the clip, timestamp in seconds and BGR image
+        """
+        if self._started:
+            raise RuntimeError("A VideoFrameSource can only be iterated once")
+        self._started = True
+
+        step = self.step
+        next_sample = 0.0
+        yielded = 0
+        index = 0
+        try:
+            while self.max_frames is None or yielded < self.max_frames:
+                # grab() decodes without the costly conversion to an image
+                if not self._capture.grab():
+                    break
+                self.frames_decoded += 1
+
+                if index >= next_sample:
+                    ok, image = self._capture.retrieve()
+                    if not ok:
+                        logger.warning(f"Could not retrieve frame {index} of {self.path}")
+                    else:
+                        if self.fps > 0:
+                            timestamp = index / self.fps
+                        else:
+                            timestamp = self._capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+                        yield VideoFrame(index, timestamp, image)
+                        yielded += 1
+                    # Fractional steps keep the average rate exact, e.g. 30 -> 4 fps
+                    next_sample += step
+                index += 1
+        finally:
+            self.close()
+
+    def close(self):
+        """Release the decoder."""
+        self._capture.release()
+
+
+def iter_video_frames(path, target_fps=DEFAULT_ANALYSIS_FPS, max_frames=MAX_ANALYSIS_FRAMES):
+    """
+    Yield the frames of a video at a target rate, decoding it sequentially.
+
+    Args:
+        path (str): Path of the video file
+        target_fps (float, optional): Frames per second to yield
+        max_frames (int, optional): Stop after this many frames
+
+    Yields:
+        VideoFrame: index in the clip, timestamp in seconds and BGR image
+    """
+    with VideoFrameSource(path, target_fps=target_fps, max_frames=max_frames) as source:
+        yield from source
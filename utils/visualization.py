@@ -1,34 +1,35 @@
+from io import BytesIO
+
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 from matplotlib.ticker import MaxNLocator
+from utils.performance_frame import athlete_rows, metric_columns
 
 def create_performance_radar(data, athlete, figsize=(10, 8)):
     """
     Create a radar chart of the athlete's performance metrics.
     
     Args:
-        data (pd.DataFrame): The performance data
+        data (pd.DataFrame, PerformanceFrame or PerformanceStore): The performance data
         athlete (str): The name of the athlete
         figsize (tuple): Figure size (width, height)
         
     Returns:
         matplotlib.figure.Figure: The radar chart figure
     """
-    # Filter data for the selected athlete
-    athlete_data = data[data['Athlete'] == athlete].copy()
+    # The athlete's rows with parsed dates
+    athlete_data = athlete_rows(data, athlete)
     
     # Get the most recent values for metrics
     if 'Date' in athlete_data.columns:
-        athlete_data['Date'] = pd.to_datetime(athlete_data['Date'], errors='coerce')
         latest_date = athlete_data['Date'].max()
         latest_data = athlete_data[athlete_data['Date'] == latest_date].iloc[0]
     else:
         latest_data = athlete_data.iloc[-1]
     
     # Get the metrics (excluding non-metric columns)
-    metrics = [col for col in athlete_data.columns 
-              if col not in ['Athlete', 'Date', 'Session', 'Notes']]
+    metrics = metric_columns(athlete_data)
     
     # Extract values for the metrics
     values = [latest_data[metric] for metric in metrics]
@@ -70,7 +71,7 @@ def plot_trend_analysis(data, athlete, metric, figsize=(10, 6)):
     Create a trend analysis plot for a specific metric.
     
     Args:
-        data (pd.DataFrame): The performance data
+        data (pd.DataFrame, PerformanceFrame or PerformanceStore): The performance data
         athlete (str): The name of the athlete
         metric (str): The metric to plot
         figsize (tuple): Figure size (width, height)
@@ -78,13 +79,10 @@ def plot_trend_analysis(data, athlete, metric, figsize=(10, 6)):
     Returns:
         matplotlib.figure.Figure: The trend analysis figure
     """
-    # Filter data for the selected athlete
-    athlete_data = data[data['Athlete'] == athlete].copy()
+    # The athlete's rows with parsed dates, in date order
+    athlete_data = athlete_rows(data, athlete)
     
-    # Sort by date if available
     if 'Date' in athlete_data.columns:
-        athlete_data['Date'] = pd.to_datetime(athlete_data['Date'], errors='coerce')
-        athlete_data = athlete_data.sort_values('Date')
         x_values = athlete_data['Date']
         x_label = 'Date'
     else:
@@ -131,7 +129,7 @@ def plot_comparison(data, athlete1, athlete2, figsize=(12, 8)):
     Create a comparison plot between two athletes.
     
     Args:
-        data (pd.DataFrame): The performance data
+        data (pd.DataFrame, PerformanceFrame or PerformanceStore): The performance data
         athlete1 (str): The name of the first athlete
         athlete2 (str): The name of the second athlete
         figsize (tuple): Figure size (width, height)
@@ -140,16 +138,15 @@ def plot_comparison(data, athlete1, athlete2, figsize=(12, 8)):
         matplotlib.figure.Figure: The comparison figure
     """
     # Filter data for both athletes
-    athlete1_data = data[data['Athlete'] == athlete1]
-    athlete2_data = data[data['Athlete'] == athlete2]
+    athlete1_data = athlete_rows(data, athlete1)
+    athlete2_data = athlete_rows(data, athlete2)
     
-    # Get metrics (excluding non-metric columns)
-    metrics = [col for col in data.columns 
-              if col not in ['Athlete', 'Date', 'Session', 'Notes']]
+    # Get metrics (excluding non-metric columns) recorded for either athlete
+    metrics = list(dict.fromkeys(metric_columns(athlete1_data) + metric_columns(athlete2_data)))
     
     # Calculate mean values for each metric for both athletes
-    athlete1_means = [athlete1_data[metric].mean() for metric in metrics]
-    athlete2_means = [athlete2_data[metric].mean() for metric in metrics]
+    athlete1_means = [athlete1_data[metric].mean() if metric in athlete1_data else np.nan for metric in metrics]
+    athlete2_means = [athlete2_data[metric].mean() if metric in athlete2_data else np.nan for metric in metrics]
     
     # Create the comparison chart
     fig, ax = plt.subplots(figsize=figsize)
@@ -174,3 +171,24 @@ def plot_comparison(data, athlete1, athlete2, figsize=(12, 8)):
     fig.tight_layout()
     
     return fig
+
+def figure_to_png(fig, dpi=100):
+    """
+    Render a figure to PNG bytes and close it.
+    
+    Figures are mutable and drawing them is not thread-safe, so charts shared
+    between Streamlit sessions are cached as the rendered image instead.
+    
+    Args:
+        fig (matplotlib.figure.Figure): The figure to render
+        dpi (int): Resolution of the image
+        
+    Returns:
+        bytes: The PNG image
+    """
+    buffer = BytesIO()
+    try:
+        fig.savefig(buffer, format='png', dpi=dpi)
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
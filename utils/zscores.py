@@ -0,0 +1,127 @@
+"""
+Vectorized z-score engine for strengths and weaknesses.
+
+Scores each athlete's most recent value of every metric against a baseline in
+one array operation:
+
+- 'pooled': the athlete's own values pooled across all metrics
+- 'metric': the athlete's own history of that metric
+- 'team' / 'sport': every value of that metric recorded in the athlete's
+  team or sport (the 'Team' / 'Sport' column)
+
+Missing values are skipped everywhere; a baseline without spread gives NaN.
+"""
+import numpy as np
+import pandas as pd
+
+# |z| above which a metric counts as a strength or weakness
+ZSCORE_THRESHOLD = 0.75
+
+# Baselines that compare an athlete against a cohort column
+COHORT_COLUMNS = {'team': 'Team', 'sport': 'Sport'}
+
+BASELINES = ('pooled', 'metric') + tuple(COHORT_COLUMNS)
+
+
+def _metric_matrix(data, metrics):
+    """Metric columns as a float array, non-numeric entries as NaN."""
+    return np.column_stack([
+        pd.to_numeric(data[metric], errors='coerce').to_numpy(dtype=float)
+        for metric in metrics
+    ]) if metrics else np.empty((len(data), 0))
+
+
+def _group_mean_std(values, codes, groups):
+    """Per-group mean and population std of each column, skipping NaN."""
+    frame = pd.DataFrame(values)
+    grouped = frame.groupby(codes)
+    means = grouped.mean().reindex(range(groups)).to_numpy()
+    stds = grouped.std(ddof=0).reindex(range(groups)).to_numpy()
+    return means, stds
+
+
+def compute_zscores(data, metrics, baseline='pooled', athlete_column='Athlete'):
+    """
+    Z-scores of every athlete's most recent value of each metric.
+    
+    Args:
+        data (pd.DataFrame): Performance data; rows are ordered by 'Date' when
+            present, otherwise taken in their current order
+        metrics (list): Metric columns to score
+        baseline (str): 'pooled', 'metric', 'team' or 'sport'
+        athlete_column (str): Column identifying athletes; if missing, all
+            rows belong to one athlete
+            
+    Returns:
+        pd.DataFrame: One row per athlete, one column per metric
+    """
+    if baseline not in BASELINES:
+        raise ValueError(f"Unknown baseline '{baseline}', expected one of {BASELINES}")
+    
+    metrics = list(metrics)
+    if 'Date' in data.columns:
+        order = pd.to_datetime(data['Date'], errors='coerce').argsort(kind='stable')
+        data = data.iloc[order]
+    
+    if athlete_column in data.columns:
+        codes, athletes = pd.factorize(data[athlete_column])
+    else:
+        codes, athletes = np.zeros(len(data), dtype=np.intp), pd.Index([None])
+    
+    values = _metric_matrix(data, metrics)
+    groups = len(athletes)
+    
+    # Most recent non-missing value of each metric per athlete
+    recent = pd.DataFrame(values).groupby(codes).last().reindex(range(groups)).to_numpy()
+    
+    if baseline == 'pooled':
+        valid = ~np.isnan(values)
+        filled = np.where(valid, values, 0.0)
+        counts = np.bincount(codes, weights=valid.sum(axis=1), minlength=groups)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means = np.bincount(codes, weights=filled.sum(axis=1), minlength=groups) / counts
+            deviations = np.where(valid, values - means[codes][:, None], 0.0)
+            stds = np.sqrt(np.bincount(codes, weights=(deviations ** 2).sum(axis=1), minlength=groups) / counts)
+        means, stds = means[:, None], stds[:, None]
+    elif baseline == 'metric':
+        means, stds = _group_mean_std(values, codes, groups)
+    else:
+        column = COHORT_COLUMNS[baseline]
+        if column not in data.columns:
+            raise ValueError(f"The '{baseline}' baseline needs a '{column}' column")
+        cohort_codes, cohorts = pd.factorize(data[column])
+        cohort_means, cohort_stds = _group_mean_std(values, cohort_codes, len(cohorts))
+        
+        # Each athlete is compared with the cohort of their latest row
+        athlete_cohort = pd.Series(cohort_codes).groupby(codes).last().reindex(range(groups)).to_numpy()
+        missing = athlete_cohort < 0
+        athlete_cohort = np.where(missing, 0, athlete_cohort)
+        means = np.where(missing[:, None], np.nan, cohort_means[athlete_cohort])
+        stds = np.where(missing[:, None], np.nan, cohort_stds[athlete_cohort])
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        zscores = np.where(stds > 0, (recent - means) / stds, np.nan)
+    
+    return pd.DataFrame(zscores, index=athletes, columns=metrics)
+
+
+def classify_zscores(zscores, threshold=ZSCORE_THRESHOLD):
+    """
+    Strengths and weaknesses of every athlete from a z-score table.
+    
+    Args:
+        zscores (pd.DataFrame): Output of compute_zscores
+        threshold (float): |z| above which a metric is a strength or weakness
+        
+    Returns:
+        dict: Athlete -> (strengths, weaknesses) lists, in metric column order
+    """
+    metrics = np.asarray(zscores.columns)
+    values = zscores.to_numpy(dtype=float)
+    is_strength = values > threshold
+    is_weakness = values < -threshold
+    
+    return {
+        athlete: (list(metrics[is_strength[i]]), list(metrics[is_weakness[i]]))
+        for i, athlete in enumerate(zscores.index)
+    }